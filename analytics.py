@@ -0,0 +1,196 @@
+# used to read analytics settings from environment variables
+import os
+
+# used for the background flush task and message rate windows
+import asyncio
+import datetime
+import time
+
+# run blocking DB writes without freezing the event loop
+from starlette.concurrency import run_in_threadpool
+
+# database session + attendance table
+from database import SessionLocal
+from models import AttendanceEvent
+
+# counters for written/dropped attendance events
+import metrics
+
+
+# =====================================
+# ANALYTICS SETTINGS
+# =====================================
+
+# Message rates are measured over this many seconds
+RATE_WINDOW_SECONDS = 60
+
+# "0" = don't record join/leave events in the database
+ATTENDANCE_LOG_ENABLED = os.getenv("ATTENDANCE_LOG_ENABLED", "1") == "1"
+
+# Attendance events are written together every N seconds...
+ATTENDANCE_FLUSH_SECONDS = float(os.getenv("ATTENDANCE_FLUSH_SECONDS", "5"))
+
+# ...or as soon as this many are waiting
+ATTENDANCE_BATCH_SIZE = int(os.getenv("ATTENDANCE_BATCH_SIZE", "500"))
+
+# If the database is down, keep at most this many events (oldest are dropped)
+ATTENDANCE_MAX_PENDING = int(os.getenv("ATTENDANCE_MAX_PENDING", "50000"))
+
+
+def utcnow():
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+# =====================================
+# LIVE ROOM COUNTERS
+# =====================================
+
+class RateWindow:
+    """
+    Counts events in one-second buckets over the last RATE_WINDOW_SECONDS.
+    Adding is O(1); reading sums a fixed number of buckets.
+    """
+
+    __slots__ = ("counts", "seconds")
+
+    def __init__(self):
+        self.counts = [0] * RATE_WINDOW_SECONDS
+        self.seconds = [0] * RATE_WINDOW_SECONDS
+
+    def add(self, now: float):
+        second = int(now)
+        i = second % RATE_WINDOW_SECONDS
+        # Bucket still holds an older second → start it over
+        if self.seconds[i] != second:
+            self.seconds[i] = second
+            self.counts[i] = 0
+        self.counts[i] += 1
+
+    def per_minute(self, now: float) -> float:
+        oldest = int(now) - RATE_WINDOW_SECONDS
+        total = sum(c for c, s in zip(self.counts, self.seconds) if s > oldest)
+        return total * 60 / RATE_WINDOW_SECONDS
+
+
+class RoomStats:
+    """
+    Counters of one live room, updated when users enter/leave and per message
+    (see ConnectionManager._track). Reading them never scans the room.
+    """
+
+    __slots__ = (
+        "started_at", "started", "peers", "waiting", "peak_peers",
+        "viewers", "peak_viewers", "joins", "messages", "chat_messages", "message_rate", "chat_rate"
+    )
+
+    def __init__(self):
+        self.started_at = utcnow()          # when the first user arrived
+        self.started = time.monotonic()     # same moment, for durations
+        self.peers = 0
+        self.waiting = 0
+        self.peak_peers = 0
+        self.viewers = 0                    # webinar attendees (watch only)
+        self.peak_viewers = 0
+        self.joins = 0
+        self.messages = 0
+        self.chat_messages = 0
+        self.message_rate = RateWindow()
+        self.chat_rate = RateWindow()
+
+    def record_message(self, msg_type):
+        now = time.monotonic()
+        self.messages += 1
+        self.message_rate.add(now)
+        if msg_type == "chat-message":
+            self.chat_messages += 1
+            self.chat_rate.add(now)
+
+    def to_dict(self) -> dict:
+        now = time.monotonic()
+        return {
+            "peers": self.peers,
+            "waiting": self.waiting,
+            "peak_peers": self.peak_peers,
+            "viewers": self.viewers,
+            "peak_viewers": self.peak_viewers,
+            "joins": self.joins,
+            "started_at": self.started_at,
+            "duration_seconds": int(now - self.started),
+            "messages": self.messages,
+            "messages_per_minute": self.message_rate.per_minute(now),
+            "chat_messages": self.chat_messages,
+            "chat_per_minute": self.chat_rate.per_minute(now)
+        }
+
+
+# =====================================
+# ATTENDANCE LOG (batched DB writes)
+# =====================================
+
+def write_attendance(batch: list):
+    # Insert many events in one transaction (blocking → call through run_in_threadpool)
+    db = SessionLocal()
+    try:
+        db.bulk_insert_mappings(AttendanceEvent, batch)
+        db.commit()
+    finally:
+        db.close()
+
+
+class AttendanceLog:
+    """
+    Join/leave events are kept in memory (no DB call on the WebSocket path)
+    and written in batches by a background task (started in main.py).
+    """
+
+    def __init__(self):
+        self.pending = []
+        # Set when a batch is full so the writer doesn't wait for the timer
+        self.wakeup: asyncio.Event = None
+
+    def record(self, meeting_id: int, user_email: str, event: str):
+        if not ATTENDANCE_LOG_ENABLED or meeting_id is None:
+            return
+        self.pending.append({
+            "meeting_id": meeting_id,
+            "user_email": user_email,
+            "event": event,
+            "at": utcnow()
+        })
+        if len(self.pending) >= ATTENDANCE_BATCH_SIZE and self.wakeup is not None:
+            self.wakeup.set()
+
+    async def flush(self) -> int:
+        # Write everything waiting right now; returns how many events were written
+        if not self.pending:
+            return 0
+        batch, self.pending = self.pending, []
+        try:
+            await run_in_threadpool(write_attendance, batch)
+        except Exception as e:
+            # Keep the events for the next try (new ones stay after them)
+            print(f"Attendance log write failed: {e}")
+            pending = batch + self.pending
+            dropped = max(0, len(pending) - ATTENDANCE_MAX_PENDING)
+            if dropped:
+                metrics.inc("attendance.dropped", dropped)
+            self.pending = pending[dropped:]
+            return 0
+        metrics.inc("attendance.written", len(batch))
+        metrics.inc("attendance.batches")
+        return len(batch)
+
+    async def run(self):
+        # Background task: flush every ATTENDANCE_FLUSH_SECONDS (or when a batch is full)
+        self.wakeup = asyncio.Event()
+        while True:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=ATTENDANCE_FLUSH_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+            await self.flush()
+
+
+# Global attendance log used by the signaling manager
+attendance_log = AttendanceLog()
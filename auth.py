@@ -1,9 +1,16 @@
 import os
 # Used to read environment variables (like SECRET_KEY)
 
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 # Used for time calculations (token expiry)
 
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+# time → expiry of cached tokens; hashlib → password fingerprint in refresh tokens
+# threading + OrderedDict → cache of verified access tokens (also used from threads)
+
 from typing import Optional
 # Optional → means a value may or may not be provided
 
@@ -14,6 +21,13 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 # Used to hash and verify passwords securely
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+# bcrypt runs in its own small pool (see run_bcrypt)
+
+import metrics
+# bcrypt time is tracked apart from other CPU ("auth.bcrypt.*")
+
 from fastapi import Depends, HTTPException, status
 # Depends → FastAPI automatically provides things (user, db etc.)
 # HTTPException → used to throw errors
@@ -25,11 +39,11 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 # Database session
 
-from database import get_db
-# Function that gives database connection
+from database import SessionLocal
+# Database sessions (only refresh and tokens issued before claims had "uid" need one)
 
-from models import User
-# User table model
+from models import User, UserRole
+# User table model, UserRole → roles enum
 
 
 # ================================
@@ -40,11 +54,29 @@ from models import User
 # IMPORTANT: Change this in production
 SECRET_KEY = os.getenv("SECRET_KEY", "your-super-secret-key-change-this-in-production")
 
+# Signing keys for rotation: "kid:secret,kid:secret,..."
+# The FIRST key signs new tokens, the others are only accepted (tokens carry their
+# "kid" in the header). Rotate: put a new key first, keep the old one until
+# REFRESH_TOKEN_EXPIRE_DAYS have passed, then remove it.
+# Empty → one key, SECRET_KEY (kid "default")
+JWT_KEYS = dict(
+    entry.strip().split(":", 1) for entry in os.getenv("JWT_KEYS", "").split(",") if entry.strip()
+) or {"default": SECRET_KEY}
+SIGNING_KID = next(iter(JWT_KEYS))
+
 # Algorithm used to sign JWT
 ALGORITHM = "HS256"
 
-# Token validity time (30 minutes)
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Access tokens are short-lived: they carry id and role, so requests don't look
+# the user up; a deleted user or changed role takes effect within this time
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15"))
+
+# Refresh tokens get a new access token without the password (POST /auth/refresh)
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+
+# Verified access tokens kept in memory (decoding + checking the signature is
+# the expensive part of a request's auth; the same token comes back many times)
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
 
 
 # ================================
@@ -64,35 +96,225 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 # Check if entered password matches stored hashed password
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    with metrics.timer("auth.bcrypt"):
+        return pwd_context.verify(plain_password, hashed_password)
+
+
+# Same cost as verify_password, for logins with an unknown email
+# (answering faster would tell which emails have an account)
+def dummy_verify_password():
+    with metrics.timer("auth.bcrypt"):
+        pwd_context.dummy_verify()
+    return False
 
 
 # Convert plain password into hashed password
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    with metrics.timer("auth.bcrypt"):
+        return pwd_context.hash(password)
+
+
+# ================================
+# BCRYPT POOL
+# ================================
+
+# Each verify is ~0.25 s of CPU. Logins get their own threads, fewer than the
+# CPUs, so a burst of logins can't take every core or the threadpool the
+# database calls use
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+
+# Logins waiting for a bcrypt thread; more → 503 right away instead of a growing queue
+BCRYPT_MAX_WAITING = int(os.getenv("BCRYPT_MAX_WAITING", "32"))
+
+_bcrypt_pool = ThreadPoolExecutor(BCRYPT_WORKERS, thread_name_prefix="bcrypt")
+_bcrypt_waiting = 0
+
+
+class BcryptBusy(Exception):
+    pass
+
+
+async def run_bcrypt(func, *args):
+    # Run a bcrypt call (verify_password, dummy_verify_password) in the bcrypt pool
+    global _bcrypt_waiting
+    if _bcrypt_waiting >= BCRYPT_MAX_WAITING:
+        metrics.inc("auth.bcrypt.busy")
+        raise BcryptBusy()
+    _bcrypt_waiting += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_bcrypt_pool, func, *args)
+    finally:
+        _bcrypt_waiting -= 1
 
 
 # ================================
-# CREATE JWT TOKEN
+# SIGN / CHECK JWT TOKENS
+# ================================
+
+def encode_token(claims: dict) -> str:
+    # Sign with the current key; the header says which one ("kid")
+    return jwt.encode(claims, JWT_KEYS[SIGNING_KID], algorithm=ALGORITHM, headers={"kid": SIGNING_KID})
+
+
+def decode_token(token: str) -> dict:
+    # Check signature + expiry with the key named in the header
+    # Tokens without "kid" (issued before rotation) are checked with the current key
+    # Raises JWTError if the token is invalid
+    kid = jwt.get_unverified_header(token).get("kid", SIGNING_KID)
+    key = JWT_KEYS.get(kid)
+    if key is None:
+        raise JWTError("unknown signing key")
+    return jwt.decode(token, key, algorithms=[ALGORITHM])
+
+
+# ================================
+# CREATE JWT TOKENS
 # ================================
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
-    # Copy the data (like email, role)
+    # Copy the data (email as "sub", "uid", "role")
     to_encode = data.copy()
     
     if expires_delta:
         # If custom expiry provided
-        expire = datetime.utcnow() + expires_delta
+        expire = datetime.now(timezone.utc) + expires_delta
     else:
         # Default expiry = 15 minutes
-        expire = datetime.utcnow() + timedelta(minutes=15)
+        expire = datetime.now(timezone.utc) + timedelta(minutes=15)
     
-    # Add expiry time into token payload
-    to_encode.update({"exp": expire})
+    # Add expiry time and token type into token payload
+    to_encode.update({"exp": expire, "typ": "access"})
     
-    # Create JWT token using secret key
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+    # Create JWT token using the current signing key
+    return encode_token(to_encode)
+
+
+def password_fingerprint(hashed_password: str) -> str:
+    # Changes when the password changes → refresh tokens issued before stop working
+    return hashlib.sha256(hashed_password.encode()).hexdigest()[:16]
+
+
+def create_tokens(user: User) -> dict:
+    # Access + refresh token for a user (login and refresh return the same shape)
+    access_token = create_access_token(
+        data={
+            "sub": user.email,  # Store user email inside token
+            "uid": user.id,     # User id → no database lookup per request
+            "role": user.role.value if isinstance(user.role, UserRole) else user.role
+        },
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    refresh_token = encode_token({
+        "typ": "refresh",
+        "sub": user.email,
+        "uid": user.id,
+        "pwd": password_fingerprint(user.password),
+        "exp": datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    })
+    return {
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    }
+
+
+def user_for_refresh(refresh_token: str, db: Session) -> Optional[User]:
+    # The user a refresh token belongs to, if it is still valid: the user exists
+    # and the password hasn't changed since it was issued (one primary-key lookup)
+    try:
+        claims = decode_token(refresh_token)
+    except JWTError:
+        return None
+    if claims.get("typ") != "refresh":
+        return None
+    user = db.get(User, claims.get("uid"))
+    if user is None or claims.get("pwd") != password_fingerprint(user.password):
+        return None
+    return user
+
+
+# ================================
+# FIND USER FROM JWT TOKEN
+# ================================
+
+class TokenUser:
+    # The logged-in user as the access token describes it (no database row)
+    # Has what endpoints use: id, email, role
+
+    __slots__ = ("id", "email", "role")
+
+    def __init__(self, id: int, email: str, role: UserRole):
+        self.id = id
+        self.email = email
+        self.role = role
+
+
+class TokenCache:
+    # token → (TokenUser, expires at); the token string itself is what is signed,
+    # so a cached token is as good as a freshly checked one until it expires
+    def __init__(self, maxsize: int = TOKEN_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[TokenUser]:
+        entry = self.entries.get(token)
+        if entry is None:
+            return None
+        user, expires = entry
+        if expires <= time.time():
+            with self._lock:
+                self.entries.pop(token, None)
+            return None
+        return user
+
+    def put(self, token: str, user: TokenUser, expires: float):
+        with self._lock:
+            self.entries[token] = (user, expires)
+            # Drop the oldest tokens first
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+
+token_cache = TokenCache()
+
+
+def get_user_from_token(token: Optional[str]) -> Optional[TokenUser]:
+    # Returns the user the access token belongs to, or None if the token is invalid
+    if not token:
+        return None
+
+    user = token_cache.get(token)
+    if user is not None:
+        return user
+
+    try:
+        # Decode JWT token
+        payload = decode_token(token)
+    except JWTError:
+        # Token expired, tampered or signed with a removed key
+        return None
+
+    # Only access tokens (not refresh or meeting resume tokens)
+    if payload.get("typ") not in (None, "access") or payload.get("sub") is None:
+        return None
+
+    if "uid" in payload:
+        user = TokenUser(payload["uid"], payload["sub"], UserRole(payload["role"]))
+    else:
+        # Token from before ids were in the claims: look the user up once
+        db = SessionLocal()
+        try:
+            row = db.query(User).filter(User.email == payload["sub"]).first()
+        finally:
+            db.close()
+        if row is None:
+            return None
+        user = TokenUser(row.id, row.email, row.role)
+
+    token_cache.put(token, user, payload["exp"])
+    return user
 
 
 # ================================
@@ -100,8 +322,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
 # ================================
 
 async def get_current_user(
-    token: str = Depends(oauth2_scheme),  # Get token from header
-    db: Session = Depends(get_db)         # Get DB connection
+    token: str = Depends(oauth2_scheme)  # Get token from header
 ):
     # Error to throw if token invalid
     credentials_exception = HTTPException(
@@ -110,25 +331,10 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    try:
-        # Decode JWT token
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-
-        # Get email stored inside token
-        email: str = payload.get("sub")
-
-        # If email missing → invalid token
-        if email is None:
-            raise credentials_exception
-
-    except JWTError:
-        # Token expired or tampered
-        raise credentials_exception
-    
-    # Find user in database using email
-    user = db.query(User).filter(User.email == email).first()
+    # Check the token (same check is used for WebSockets); no database query
+    user = get_user_from_token(token)
 
-    # If user not found → invalid
+    # If token invalid → invalid
     if user is None:
         raise credentials_exception
 
@@ -142,7 +348,7 @@ async def get_current_user(
 
 def check_role(roles: list):
     # This function returns another function (dependency)
-    async def role_checker(current_user: User = Depends(get_current_user)):
+    async def role_checker(current_user: TokenUser = Depends(get_current_user)):
 
         # If user's role is not allowed
         if current_user.role not in roles:
@@ -0,0 +1,104 @@
+# Benchmark: what authenticating a request costs, before and after id/role claims.
+#   before: decode the JWT + look the user up by email on every request
+#   after:  decode once, then the token cache (no database at all)
+# Also compares getting a new access token by logging in again (bcrypt) with
+# POST /auth/refresh (one primary-key lookup), and checks that a token signed
+# with the previous key is still accepted after a key rotation.
+# Calls the functions directly on an in-memory database (no HTTP).
+#
+# Run from the project root:
+#   python benchmarks/bench_auth.py
+
+import os
+import sys
+import time
+import importlib
+
+# Make the project modules importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jose import jwt
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import auth
+from database import Base
+from models import User
+
+
+USERS = 1_000
+REQUESTS = 5_000
+LOGINS = 5
+
+
+def setup_db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    password = auth.get_password_hash("benchpassword")
+    db.add_all([User(email=f"user{i}@example.com", password=password, role="student") for i in range(USERS)])
+    db.commit()
+    return db
+
+
+def old_style_user(token: str, db):
+    # What get_current_user did before: decode, then find the user by email
+    payload = jwt.decode(token, auth.SECRET_KEY, algorithms=[auth.ALGORITHM])
+    return db.query(User).filter(User.email == payload["sub"]).first()
+
+
+def per_call(func, count: int) -> float:
+    # Microseconds per call
+    start = time.perf_counter()
+    for i in range(count):
+        func(i)
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def main():
+    db = setup_db()
+    users = db.query(User).all()
+    tokens = [auth.create_tokens(user) for user in users]
+    access = [t["access_token"] for t in tokens]
+
+    old = per_call(lambda i: old_style_user(access[i % USERS], db), REQUESTS)
+    auth.token_cache.entries.clear()
+    cold = per_call(lambda i: auth.get_user_from_token(access[i]), USERS)
+    cached = per_call(lambda i: auth.get_user_from_token(access[i % USERS]), REQUESTS)
+
+    print(f"auth per request ({USERS:,} users, {REQUESTS:,} requests)")
+    print(f"  before (decode + user query):  {old:8.1f} us")
+    print(f"  after, first use (decode):     {cold:8.1f} us")
+    print(f"  after, cached:                 {cached:8.1f} us")
+
+    user = users[0]
+    login = per_call(lambda i: auth.verify_password("benchpassword", user.password) and auth.create_tokens(user), LOGINS)
+    refresh_token = tokens[0]["refresh_token"]
+    refresh = per_call(lambda i: auth.create_tokens(auth.user_for_refresh(refresh_token, db)), 200)
+    print("new access token")
+    print(f"  log in again (bcrypt):         {login / 1e3:8.1f} ms")
+    print(f"  refresh token:                 {refresh / 1e3:8.2f} ms")
+
+    # Rotation: a new key signs, the old one ("default") is still accepted
+    os.environ["JWT_KEYS"] = f"next:another-secret,default:{auth.SECRET_KEY}"
+    importlib.reload(auth)
+    new_token = auth.create_tokens(user)["access_token"]
+    problems = []
+    if auth.get_user_from_token(access[0]) is None:
+        problems.append("token signed with the previous key rejected")
+    if jwt.get_unverified_header(new_token)["kid"] != "next":
+        problems.append("new tokens not signed with the first key")
+    # Old key removed → its tokens stop working
+    os.environ["JWT_KEYS"] = "next:another-secret"
+    importlib.reload(auth)
+    if auth.get_user_from_token(access[0]) is not None:
+        problems.append("token signed with a removed key accepted")
+    if auth.user_for_refresh(refresh_token, db) is not None:
+        problems.append("refresh token signed with a removed key accepted")
+    print("key rotation:", "FAIL " + "; ".join(problems) if problems else "PASS")
+    db.close()
+    raise SystemExit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# Benchmark: what a student dashboard loads, before and after enrollment feeds.
+#   before: GET /courses/ + GET /meetings/ (whole catalog, filtered in the browser)
+#   after:  GET /users/me/courses + GET /users/me/meetings (one indexed query each)
+# The student is enrolled in the same few courses at every catalog size, so the
+# feeds should stay flat while the full lists grow with the catalog.
+# Calls the route functions directly on an in-memory database (no HTTP).
+#
+# Run from the project root:
+#   python benchmarks/bench_feeds.py
+
+import os
+import sys
+import time
+import uuid
+import datetime
+
+# Make the project modules importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models import User, Course, Enrollment, Meeting
+from routers.courses import read_all_courses
+from routers.meetings import read_all_meetings
+from routers.users import read_my_courses, read_my_meetings
+
+
+CATALOG_SIZES = [100, 1_000, 10_000]   # courses
+MEETINGS_PER_COURSE = 5
+ENROLLED = 5                           # courses the student takes
+REPEAT = 5
+
+
+def setup_db(courses: int):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    admin = User(email="admin@example.com", password="x", role="admin")
+    student = User(email="student@example.com", password="x", role="student")
+    db.add_all([admin, student])
+    db.flush()
+
+    # Bulk inserts (core) so big catalogs build quickly
+    start = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+    db.execute(Course.__table__.insert(), [
+        {"id": i + 1, "title": f"Course {i}", "description": "An introduction to something"}
+        for i in range(courses)
+    ])
+    db.execute(Meeting.__table__.insert(), [
+        {"title": f"Lecture {i}.{j}", "room_id": str(uuid.uuid4()), "created_by": admin.id,
+         "created_at": start + datetime.timedelta(minutes=i * MEETINGS_PER_COURSE + j),
+         "media_mode": "mesh", "room_mode": "meeting", "course_id": i + 1}
+        for i in range(courses) for j in range(MEETINGS_PER_COURSE)
+    ])
+    # Spread over the catalog (first, last and in between)
+    db.execute(Enrollment.__table__.insert(), [
+        {"user_id": student.id, "course_id": 1 + k * (courses - 1) // (ENROLLED - 1)}
+        for k in range(ENROLLED)
+    ])
+    db.commit()
+    return engine, db, student
+
+
+def measure(call) -> tuple:
+    # Best time of REPEAT runs (query + encoding) and the response size
+    best = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        response = call()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(response.body)
+
+
+def query_plan(engine, call) -> list:
+    # EXPLAIN QUERY PLAN of the statement the route runs
+    statements = []
+    listener = lambda conn, cursor, statement, parameters, context, many: statements.append((statement, parameters))
+    event.listen(engine, "before_cursor_execute", listener)
+    call()
+    event.remove(engine, "before_cursor_execute", listener)
+    statement, parameters = statements[-1]
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+    return [row[-1] for row in rows]
+
+
+def main():
+    print(f"student enrolled in {ENROLLED} courses, {MEETINGS_PER_COURSE} meetings per course, best of {REPEAT}")
+    print(f"  {'courses':>8}  {'full lists ms':>13}  {'full lists bytes':>16}  {'feeds ms':>9}  {'feeds bytes':>11}")
+    for size in CATALOG_SIZES:
+        engine, db, student = setup_db(size)
+
+        courses_time, courses_bytes = measure(lambda: read_all_courses(db=db, admin_user=student))
+        meetings_time, meetings_bytes = measure(lambda: read_all_meetings(db=db, current_user=student))
+        my_courses_time, my_courses_bytes = measure(lambda: read_my_courses(db=db, current_user=student))
+        my_meetings_time, my_meetings_bytes = measure(lambda: read_my_meetings(limit=50, db=db, current_user=student))
+
+        print(f"  {size:>8,}  {(courses_time + meetings_time) * 1e3:>13.2f}  {courses_bytes + meetings_bytes:>16,}"
+              f"  {(my_courses_time + my_meetings_time) * 1e3:>9.2f}  {my_courses_bytes + my_meetings_bytes:>11,}")
+
+        if size == CATALOG_SIZES[-1]:
+            print("query plans (largest catalog):")
+            for name, call in (("/users/me/courses", lambda: read_my_courses(db=db, current_user=student)),
+                               ("/users/me/meetings", lambda: read_my_meetings(limit=50, db=db, current_user=student))):
+                print(f"  {name}")
+                for step in query_plan(engine, call):
+                    print(f"    {step}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# Benchmark: /auth/login under a credential-stuffing burst and a reload loop.
+# For each profile a server runs against a fresh, migrated database:
+#   1. reload loop: one user logs in RELOADS times with the right password
+#   2. timing: wrong password for existing vs unknown emails (should match)
+#   3. burst: CONCURRENCY clients send wrong passwords for BURST_SECONDS while
+#      a probe measures GET / latency (is the server still answering others?)
+# bcrypt calls and CPU come from the server's own counters (GET /metrics/).
+#
+# Run from the project root:
+#   python benchmarks/bench_login.py [app root]
+# "app root" runs the server from another checkout (e.g. a git worktree of an
+# older commit) to compare with this one; the counters are then unavailable.
+
+import os
+import sys
+import time
+import asyncio
+import statistics
+import subprocess
+import tempfile
+import urllib.request
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PORT = 8791
+BASE = f"http://127.0.0.1:{PORT}"
+RELOADS = 50
+KNOWN_USERS = 8
+CONCURRENCY = 16
+BURST_SECONDS = 10
+
+PROFILES = {
+    "guard off": {"LOGIN_THROTTLE_ENABLED": "0", "LOGIN_CACHE_SECONDS": "0"},
+    "guard on": {},
+}
+
+CREATE_USERS = f"""
+from database import SessionLocal
+from models import User, UserRole
+from auth import get_password_hash
+db = SessionLocal()
+password = get_password_hash("benchpassword")
+db.add(User(email="admin@example.com", password=password, role=UserRole.ADMIN))
+for i in range({KNOWN_USERS}):
+    db.add(User(email=f"user{{i}}@example.com", password=password, role=UserRole.STUDENT))
+db.commit()
+"""
+
+
+async def login(client, email: str, password: str) -> tuple:
+    start = time.perf_counter()
+    response = await client.post(f"{BASE}/auth/login", data={"username": email, "password": password})
+    return response.status_code, time.perf_counter() - start, response
+
+
+async def bcrypt_counters(client, token: str) -> dict:
+    response = await client.get(f"{BASE}/metrics/", params={"prefix": "auth.bcrypt."},
+                                headers={"Authorization": f"Bearer {token}"})
+    return response.json() if response.status_code == 200 else {}
+
+
+async def measure() -> dict:
+    result = {}
+    async with httpx.AsyncClient(timeout=60) as client:
+        _, _, response = await login(client, "admin@example.com", "benchpassword")
+        token = response.json()["access_token"]
+
+        # 1. Reload loop with the right password
+        before = await bcrypt_counters(client, token)
+        start = time.perf_counter()
+        for _ in range(RELOADS):
+            await login(client, "user0@example.com", "benchpassword")
+        result["reload_seconds"] = time.perf_counter() - start
+        after = await bcrypt_counters(client, token)
+        result["reload_bcrypt"] = after.get("auth.bcrypt.count", 0) - before.get("auth.bcrypt.count", 0) if after else None
+
+        # 2. Wrong password: existing vs unknown email (one attempt per email)
+        known = [(await login(client, f"user{i}@example.com", "wrong"))[1] for i in range(1, KNOWN_USERS)]
+        unknown = [(await login(client, f"nobody{i}@example.com", "wrong"))[1] for i in range(1, KNOWN_USERS)]
+        result["known_ms"] = statistics.median(known) * 1e3
+        result["unknown_ms"] = statistics.median(unknown) * 1e3
+
+        # 3. Burst of wrong passwords + latency probe
+        before = await bcrypt_counters(client, token)
+        deadline = time.perf_counter() + BURST_SECONDS
+        statuses = {}
+
+        async def attacker(n: int):
+            i = 0
+            while time.perf_counter() < deadline:
+                status, _, _ = await login(client, f"victim{n}.{i}@example.com", "guess")
+                statuses[status] = statuses.get(status, 0) + 1
+                i += 1
+
+        async def probe() -> list:
+            latencies = []
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                await client.get(f"{BASE}/")
+                latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.05)
+            return latencies
+
+        *_, latencies = await asyncio.gather(*(attacker(n) for n in range(CONCURRENCY)), probe())
+        after = await bcrypt_counters(client, token)
+        result["statuses"] = dict(sorted(statuses.items()))
+        result["probe_p50_ms"] = statistics.median(latencies) * 1e3
+        result["probe_max_ms"] = max(latencies) * 1e3
+        if after:
+            result["burst_bcrypt"] = after.get("auth.bcrypt.count", 0) - before.get("auth.bcrypt.count", 0)
+            result["burst_bcrypt_cpu"] = after.get("auth.bcrypt.cpu_seconds", 0) - before.get("auth.bcrypt.cpu_seconds", 0)
+    return result
+
+
+def wait_until_up():
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(f"{BASE}/")
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+def main():
+    app_root = os.path.abspath(sys.argv[1]) if len(sys.argv) > 1 else ROOT
+    profiles = PROFILES if app_root == ROOT else {"app root": {}}
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        base_env = dict(os.environ, PYTHONPATH=app_root, ATTENDANCE_LOG_ENABLED="0", HTTP_COMPRESSION="0")
+        # The database URL is relative → the server runs inside the temp folder
+        subprocess.run([sys.executable, os.path.join(app_root, "manage.py"), "migrate"], cwd=folder, env=base_env,
+                       check=True, capture_output=True)
+        subprocess.run([sys.executable, "-c", CREATE_USERS], cwd=folder, env=base_env, check=True)
+
+        for name, settings in profiles.items():
+            env = dict(base_env, **settings)
+            command = [sys.executable, "-m", "uvicorn", "main:app", "--port", str(PORT), "--no-access-log",
+                       "--log-level", "warning"]
+            server = subprocess.Popen(command, cwd=folder, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                wait_until_up()
+                results[name] = asyncio.run(measure())
+            finally:
+                server.terminate()
+                server.wait()
+
+    print(f"{RELOADS} reloads; burst: {CONCURRENCY} clients for {BURST_SECONDS}s, GET / probed every 50 ms")
+    for name, r in results.items():
+        print(f"{name}")
+        reload_bcrypt = "?" if r["reload_bcrypt"] is None else f"{r['reload_bcrypt']:.0f}"
+        print(f"  reload loop:  {r['reload_seconds']:6.2f} s, {reload_bcrypt} bcrypt calls")
+        print(f"  wrong password, median: existing email {r['known_ms']:.0f} ms, unknown email {r['unknown_ms']:.0f} ms")
+        print(f"  burst: responses {r['statuses']}")
+        if "burst_bcrypt" in r:
+            print(f"         {r['burst_bcrypt']:.0f} bcrypt calls, {r['burst_bcrypt_cpu']:.1f} s bcrypt CPU")
+        print(f"         GET / during burst: median {r['probe_p50_ms']:.1f} ms, max {r['probe_max_ms']:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
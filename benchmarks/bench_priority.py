@@ -0,0 +1,46 @@
+# Benchmark: cost of one stream-priority update (audio level report + new hint)
+# for rooms of growing size. The hint must stay cheap in big rooms.
+#
+# Run from the project root:
+#   python benchmarks/bench_priority.py
+
+import os
+import sys
+import time
+import random
+
+# Make the project modules importable (priority)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from priority import SpeakerRanking, PRIORITY_VIDEO_SLOTS
+
+
+UPDATES = 20_000
+SIZES = (10, 100, 1_000, 10_000)
+
+
+def run(size: int) -> float:
+    # A room of "size" peers where random people start/stop talking
+    peers = {f"user{i}@example.com": {} for i in range(size)}
+    ids = list(peers)
+    speakers = SpeakerRanking()
+    rng = random.Random(size)
+    presenter = ids[0]
+
+    start = time.perf_counter()
+    for _ in range(UPDATES):
+        # A few people talk a lot, the rest rarely (like a class)
+        peer_id = ids[rng.randrange(min(size, 20))] if rng.random() < 0.9 else rng.choice(ids)
+        level = rng.random() * 0.5
+        if speakers.report(peer_id, level):
+            hint = speakers.hint(presenter, peers)
+    elapsed = time.perf_counter() - start
+
+    assert len(hint["video"]) == min(size, PRIORITY_VIDEO_SLOTS)
+    return elapsed / UPDATES
+
+
+if __name__ == "__main__":
+    print(f"{UPDATES:,} audio level reports per room size, {PRIORITY_VIDEO_SLOTS} video slots")
+    for size in SIZES:
+        print(f"{size:>7,} peers: {run(size) * 1e6:6.2f} µs per report")
@@ -0,0 +1,167 @@
+# Benchmark: the production server profile (python server.py) against a bare
+# "uvicorn main:app" as installed from requirements.txt (asyncio loop, h11 parser).
+# For each: HTTP requests/second (keep-alive connections) on GET / (no database)
+# and GET /meetings/, and chat messages/second delivered to a room of WebSocket
+# clients. The clients run on the same machine, so leave a CPU free for them.
+# Runs against a fresh, migrated database in a temporary folder.
+#
+# Needs: pip install websockets (client); uvloop + httptools for the fast profile
+# Run from the project root:
+#   python benchmarks/bench_server.py [seconds]
+
+import os
+import sys
+import json
+import time
+import asyncio
+import subprocess
+import tempfile
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import websockets
+
+PORT = 8790
+HTTP_CONNECTIONS = 32
+ROOM_SIZE = 8
+CHATTY = 4    # clients sending chat messages
+WINDOW = 8    # chat messages each of them keeps in flight
+
+PROFILES = {
+    "uvicorn defaults": [sys.executable, "-m", "uvicorn", "main:app", "--port", str(PORT),
+                         "--loop", "asyncio", "--http", "h11", "--no-access-log", "--log-level", "warning"],
+    "server.py": [sys.executable, os.path.join(ROOT, "server.py")],
+}
+
+# Users for the WebSocket room (admins skip the waiting room)
+CREATE_USERS = f"""
+from database import SessionLocal
+from models import User, UserRole
+from auth import get_password_hash
+db = SessionLocal()
+password = get_password_hash("benchpassword")
+for i in range({ROOM_SIZE}):
+    db.add(User(email=f"bench{{i}}@example.com", password=password, role=UserRole.ADMIN))
+db.commit()
+"""
+
+
+def login(email: str, password: str) -> str:
+    data = f"username={email}&password={password}".encode()
+    with urllib.request.urlopen(f"http://127.0.0.1:{PORT}/auth/login", data=data) as response:
+        return json.load(response)["access_token"]
+
+
+def create_meeting(token: str) -> str:
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{PORT}/meetings/", data=json.dumps({"title": "bench"}).encode(),
+        headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"})
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)["room_id"]
+
+
+async def http_client(path: str, token: str, deadline: float) -> int:
+    # One keep-alive connection sending requests one after another
+    reader, writer = await asyncio.open_connection("127.0.0.1", PORT)
+    request = (f"GET {path} HTTP/1.1\r\nHost: bench\r\nAuthorization: Bearer {token}\r\n"
+               "Accept-Encoding: identity\r\n\r\n").encode()
+    done = 0
+    while time.perf_counter() < deadline:
+        writer.write(request)
+        headers = await reader.readuntil(b"\r\n\r\n")
+        length = int(next(line.split(b":")[1] for line in headers.split(b"\r\n")
+                          if line.lower().startswith(b"content-length")))
+        await reader.readexactly(length)
+        done += 1
+    writer.close()
+    return done
+
+
+async def ws_client(room_id: str, email: str, token: str, chatty: bool, ready: asyncio.Event, deadline: float) -> int:
+    # Joins the room and counts the chat messages it receives. Chatty clients keep
+    # WINDOW of their own messages in flight (a new one when their own comes back),
+    # so the server is kept busy without building an endless backlog.
+    received = 0
+    async with websockets.connect(f"ws://127.0.0.1:{PORT}/ws/{room_id}?token={token}", close_timeout=1) as ws:
+        await ws.send(json.dumps({"type": "join", "username": "bench"}))
+        await ready.wait()
+        chat = json.dumps({"type": "chat-message", "message": "x" * 64})
+        if chatty:
+            for _ in range(WINDOW):
+                await ws.send(chat)
+        while time.perf_counter() < deadline:
+            try:
+                message = json.loads(await asyncio.wait_for(ws.recv(), deadline - time.perf_counter()))
+            except asyncio.TimeoutError:
+                break
+            if message.get("type") == "chat-message":
+                received += 1
+                if chatty and message.get("sender_id") == email:
+                    await ws.send(chat)
+    return received
+
+
+async def measure(seconds: float) -> tuple:
+    admin = login("bench0@example.com", "benchpassword")
+    for _ in range(20):
+        create_meeting(admin)
+
+    # "/" is the frontend fallback (no database): mostly server overhead
+    rates = []
+    for path in ("/", "/meetings/"):
+        deadline = time.perf_counter() + seconds
+        done = await asyncio.gather(*(http_client(path, admin, deadline) for _ in range(HTTP_CONNECTIONS)))
+        rates.append(sum(done) / seconds)
+
+    room_id = create_meeting(admin)
+    tokens = [login(f"bench{i}@example.com", "benchpassword") for i in range(ROOM_SIZE)]
+    ready = asyncio.Event()
+    deadline = time.perf_counter() + 1 + seconds
+    clients = [asyncio.ensure_future(ws_client(room_id, f"bench{i}@example.com", token, i < CHATTY, ready, deadline))
+               for i, token in enumerate(tokens)]
+    await asyncio.sleep(1)
+    ready.set()
+    delivered = sum(await asyncio.gather(*clients))
+    return rates[0], rates[1], delivered / seconds
+
+
+def wait_until_up():
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{PORT}/metrics/")
+        except urllib.error.HTTPError:
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    env = dict(os.environ, PYTHONPATH=ROOT, SERVER_PORT=str(PORT), RATE_LIMIT_ENABLED="0",
+               ATTENDANCE_LOG_ENABLED="0", HTTP_COMPRESSION="0")
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        # The database URL is relative → the server runs inside the temp folder
+        subprocess.run([sys.executable, os.path.join(ROOT, "manage.py"), "migrate"], cwd=folder, env=env, check=True, capture_output=True)
+        subprocess.run([sys.executable, "-c", CREATE_USERS], cwd=folder, env=env, check=True)
+
+        for name, command in PROFILES.items():
+            server = subprocess.Popen(command, cwd=folder, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                wait_until_up()
+                results[name] = asyncio.run(measure(seconds))
+            finally:
+                server.terminate()
+                server.wait()
+
+    print(f"{seconds:g}s each, {HTTP_CONNECTIONS} HTTP connections, room of {ROOM_SIZE} ({CHATTY} sending)")
+    print(f"  {'':<18}  {'GET / req/s':>12}  {'GET /meetings/ req/s':>20}  {'chat delivered/s':>16}")
+    for name, (plain, meetings, delivered) in results.items():
+        print(f"  {name:<18}  {plain:>12,.0f}  {meetings:>20,.0f}  {delivered:>16,.0f}")
+
+
+if __name__ == "__main__":
+    main()
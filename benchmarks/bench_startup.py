@@ -0,0 +1,96 @@
+# Benchmark: cold start of one worker (new interpreter → startup done), and what
+# the old startup path cost on top of it (create_all() at import + seeding).
+# Runs against a fresh, migrated database in a temporary folder.
+#
+# Run from the project root:
+#   python benchmarks/bench_startup.py [runs]
+
+import os
+import sys
+import time
+import statistics
+import subprocess
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# One worker: import the app and run its startup (and shutdown) events
+WORKER = """
+import time
+started = time.perf_counter()
+import asyncio
+import main
+async def boot():
+    await main.startup_event()
+    ready = time.perf_counter()
+    await main.shutdown_event()
+    return ready
+print(asyncio.run(boot()) - started)
+"""
+
+# What every worker used to do before serving: create_all() + seed_users()
+OLD_STEPS = """
+import time
+import main
+from database import Base, engine, SessionLocal
+from models import User
+from auth import get_password_hash
+emails = ["admin@gmail.com", "tutor@gmail.com", "student@gmail.com"]
+
+start = time.perf_counter()
+Base.metadata.create_all(bind=engine)
+create_all = time.perf_counter() - start
+
+start = time.perf_counter()
+db = SessionLocal()
+for email in emails:
+    db.query(User).filter(User.email == email).first()
+db.close()
+seed_queries = time.perf_counter() - start
+
+start = time.perf_counter()
+for email in emails:
+    get_password_hash("password")
+seed_hashes = time.perf_counter() - start
+print(create_all, seed_queries, seed_hashes)
+"""
+
+
+def run(code: str, cwd: str) -> list:
+    env = dict(os.environ, PYTHONPATH=ROOT, ATTENDANCE_LOG_ENABLED="0")
+    result = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env,
+                            capture_output=True, text=True, check=True)
+    # The numbers are on the last line (the app prints its own log lines before)
+    return [float(value) for value in result.stdout.strip().splitlines()[-1].split()]
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    with tempfile.TemporaryDirectory() as folder:
+        # The database URL is relative → every command runs inside the temp folder
+        subprocess.run([sys.executable, os.path.join(ROOT, "manage.py"), "migrate"], cwd=folder, check=True, capture_output=True)
+        subprocess.run([sys.executable, os.path.join(ROOT, "manage.py"), "seed"], cwd=folder, check=True, capture_output=True)
+
+        # Interpreter start is included (what a process manager waits for)
+        totals = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            startup, = run(WORKER, folder)
+            totals.append((time.perf_counter() - start, startup))
+        process = statistics.median(total for total, _ in totals)
+        startup = statistics.median(inner for _, inner in totals)
+
+        create_all, seed_queries, seed_hashes = (statistics.median(values) for values in
+                                                 zip(*(run(OLD_STEPS, folder) for _ in range(runs))))
+
+    print(f"median of {runs} runs")
+    print(f"  worker process (interpreter → startup done → exit): {process * 1e3:8.1f} ms")
+    print(f"  import main + startup event:                         {startup * 1e3:8.1f} ms")
+    print("removed from every worker's startup:")
+    print(f"  create_all() on an up-to-date database:              {create_all * 1e3:8.1f} ms")
+    print(f"  seed_users() when the users exist (3 queries):       {seed_queries * 1e3:8.1f} ms")
+    print(f"  seed_users() on a new database (3 bcrypt hashes):    {seed_hashes * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# Benchmark: messages sent while a lecture fills up, normal meeting vs webinar.
+# Meeting: every admitted student is a peer → each join updates everyone (O(N²) total).
+# Webinar: students are viewers → joins send nothing, one "audience" update per interval.
+#
+# Run from the project root:
+#   python benchmarks/bench_webinar.py
+
+import os
+import sys
+import time
+import asyncio
+
+# No database writes from the attendance log; short audience interval for the run
+os.environ.setdefault("ATTENDANCE_LOG_ENABLED", "0")
+os.environ.setdefault("AUDIENCE_INTERVAL", "0.05")
+
+# Make the project modules importable (signaling)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from signaling import ConnectionManager, AUDIENCE_INTERVAL
+
+
+SIZES = (100, 300, 1_000)
+HOSTS = 2
+
+
+class CountingSocket:
+    """Counts what it receives (no network)."""
+
+    sent = 0
+
+    async def send_json(self, message: dict):
+        CountingSocket.sent += 1
+
+    async def close(self, code: int = 1000):
+        pass
+
+
+async def fill(room_mode: str, students: int) -> tuple:
+    manager = ConnectionManager()
+    room_id = f"{room_mode}-{students}"
+    manager.ensure_room(room_id, {"id": 1, "room_id": room_id, "media_mode": "sfu", "room_mode": room_mode})
+    for i in range(HOSTS):
+        await manager.add_to_peers(room_id, f"host{i}@example.com", CountingSocket(), f"Host {i}", "admin")
+
+    CountingSocket.sent = 0
+    start = time.perf_counter()
+    for i in range(students):
+        user_id = f"student{i}@example.com"
+        if room_mode == "webinar":
+            await manager.add_viewer(room_id, user_id, CountingSocket(), f"Student {i}")
+        else:
+            # Same as an admin approving each student from the waiting room
+            await manager.move_to_waiting(room_id, user_id, CountingSocket(), f"Student {i}", "student")
+            await manager.admit(room_id, [user_id])
+    elapsed = time.perf_counter() - start
+
+    # Let the coalesced updates (stream priority, audience) go out
+    await asyncio.sleep(max(AUDIENCE_INTERVAL, 0.05) * 2)
+    return CountingSocket.sent, elapsed
+
+
+async def main():
+    print(f"{HOSTS} hosts, students join one after another")
+    for students in SIZES:
+        for room_mode in ("meeting", "webinar"):
+            sent, elapsed = await fill(room_mode, students)
+            print(f"{students:>6,} students, {room_mode:<8}: {sent:>10,} messages sent, "
+                  f"{elapsed / students * 1e6:8.1f} µs per join")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+# Check: read/write routing with a local SQLite copy as the read replica.
+#   1. reads go to the replica (a change on the primary is not visible there yet)
+#   2. the client that wrote reads from the primary for DB_STICKY_SECONDS
+#   3. after "replication" (python manage.py replica) everyone sees the change
+#   4. a broken replica fails one request, then reads fall back to the primary
+#   5. the health check puts the repaired replica back into rotation
+# Runs in a temporary folder with its own migrated database.
+#
+# Run from the project root:
+#   python benchmarks/check_replicas.py
+
+import os
+import sys
+import subprocess
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHECK = """
+import os
+import time
+from fastapi.testclient import TestClient
+import main, metrics, database
+
+def replicate():
+    import manage
+    manage.copy_replica("replica.db")
+
+problems = []
+def expect(name, condition):
+    print(("  ok    " if condition else "  FAIL  ") + name)
+    if not condition:
+        problems.append(name)
+
+with TestClient(main.app, raise_server_exceptions=False) as client:
+    def login(email, password):
+        token = client.post("/auth/login", data={"username": email, "password": password}).json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+
+    admin = login("admin@gmail.com", "adminpassword")
+    student = login("student@gmail.com", "studentpassword")
+    titles = lambda headers: [c["title"] for c in client.get("/courses/", headers=headers).json()]
+
+    client.post("/courses/", json={"title": "Replicated"}, headers=admin)
+    expect("writer reads its own write (sticky to the primary)", "Replicated" in titles(admin))
+    expect("other clients read the replica (not replicated yet)", "Replicated" not in titles(student))
+    time.sleep(database.DB_STICKY_SECONDS + 0.1)
+    expect("writer is back on the replica after the sticky window", "Replicated" not in titles(admin))
+
+    replicate()
+    expect("everyone sees the change after replication", "Replicated" in titles(student))
+
+    # Break the replica file in place (pooled connections keep using it)
+    with open("replica.db", "r+b") as file:
+        file.write(b"not a database" * 100)
+    failed = client.get("/courses/", headers=student).status_code
+    expect("the request that hits the broken replica fails", failed == 500)
+    expect("next reads fall back to the primary", "Replicated" in titles(student) and not database.read_router.healthy)
+
+    os.remove("replica.db")
+    replicate()
+    time.sleep(database.DB_REPLICA_CHECK_SECONDS + 0.5)
+    expect("the health check puts the repaired replica back", len(database.read_router.healthy) == 1)
+    before = metrics.counters["db.reads.replica"]
+    titles(student)
+    expect("reads use the replica again", metrics.counters["db.reads.replica"] == before + 1)
+
+print("reads:", {name: int(value) for name, value in metrics.snapshot("db.").items()})
+print("FAIL" if problems else "PASS")
+raise SystemExit(1 if problems else 0)
+"""
+
+
+def main():
+    with tempfile.TemporaryDirectory() as folder:
+        env = dict(os.environ, PYTHONPATH=ROOT, ATTENDANCE_LOG_ENABLED="0", RATE_LIMIT_ENABLED="0",
+                   DATABASE_REPLICA_URLS="sqlite:///file:replica.db?mode=ro&uri=true",
+                   DB_STICKY_SECONDS="1", DB_REPLICA_CHECK_SECONDS="0.5")
+        manage = os.path.join(ROOT, "manage.py")
+        # The database URLs are relative → every command runs inside the temp folder
+        for command in (["migrate"], ["seed"], ["replica", "replica.db"]):
+            subprocess.run([sys.executable, manage, *command], cwd=folder, env=env, check=True, capture_output=True)
+        sys.exit(subprocess.run([sys.executable, "-c", CHECK], cwd=folder, env=env).returncode)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+# Replays signaling traffic recorded with TRAFFIC_RECORDING=1 (see traffic.py)
+# against a fresh ConnectionManager in this process, through the same message
+# handlers as the server. Use it to compare an optimization on real lecture traffic.
+#
+# Every recorded connection gets a fake socket that counts what it is sent.
+# Each connection's frames are handled in order, connections run concurrently
+# (like the server). Timers (resume window, grace period ...) run in real time,
+# so at high speeds they fire "later" in the lecture than they did live.
+#
+# Run from the project root:
+#   python benchmarks/replay_traffic.py traffic/<room_id>.jsonl.gz [more files] [--speed 10]
+#   --speed 1 = as recorded, 10 = ten times faster, 0 = as fast as possible
+#   SFU messages are skipped (they need live media) unless --include-sfu is given.
+#   Set RATE_LIMIT_ENABLED=0 to replay fast without the limiter dropping frames.
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import datetime
+
+# No database writes from the attendance log
+os.environ.setdefault("ATTENDANCE_LOG_ENABLED", "0")
+
+# Make the project modules importable (signaling, routers.signaling, traffic)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from traffic import read_traffic, OPEN, MESSAGE, CLOSE
+from signaling import manager
+from routers.signaling import Connection, handle_message, handle_disconnect
+import metrics
+
+
+class ReplaySocket:
+    """Stands in for a client's WebSocket: counts what the server sends it."""
+
+    sent = 0
+
+    def __init__(self):
+        self.closed = False
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, message: dict):
+        if self.closed:
+            raise RuntimeError("socket is closed")
+        ReplaySocket.sent += 1
+
+    async def close(self, code: int = 1000):
+        self.closed = True
+
+
+def load(paths: list, include_sfu: bool) -> tuple:
+    # All events of all files in time order: (time, connection ID, kind, payload)
+    events, skipped = [], 0
+    for path in paths:
+        for at, connection_id, kind, payload in read_traffic(path):
+            if kind == MESSAGE and not include_sfu and str(payload.get("type", "")).startswith("sfu-"):
+                skipped += 1
+                continue
+            events.append((at, connection_id, kind, payload))
+    events.sort(key=lambda event: event[0])
+    return events, skipped
+
+
+def restore_meeting(meeting: dict) -> dict:
+    # Dates come back from JSON as text
+    for key in ("scheduled_start", "scheduled_end"):
+        if meeting.get(key):
+            meeting[key] = datetime.datetime.fromisoformat(meeting[key].replace("Z", "+00:00"))
+    return meeting
+
+
+async def run_connection(queue: asyncio.Queue):
+    # One client: open → frames in order → close (like the WebSocket route)
+    connection = None
+    while True:
+        kind, payload = await queue.get()
+        if kind == OPEN:
+            meeting = restore_meeting(payload["meeting"])
+            socket = ReplaySocket()
+            temp_peer_id = await manager.connect(meeting["room_id"], socket, meeting)
+            connection = Connection(socket, meeting["room_id"], meeting, payload["identity"], temp_peer_id)
+        elif connection is None:
+            # Recording started while this connection was already open
+            if kind == CLOSE:
+                return
+        elif kind == MESSAGE:
+            try:
+                await handle_message(connection, payload)
+            except Exception as e:
+                # Same as the server's error path
+                print(f"replay error ({payload.get('type')}): {e}")
+                manager.disconnect(connection.room_id, connection.peer_id, connection.websocket)
+                return
+        else:
+            connection.websocket.closed = True
+            await handle_disconnect(connection)
+            return
+
+
+async def replay(events: list, speed: float) -> float:
+    queues, workers = {}, []
+    loop = asyncio.get_running_loop()
+    first = events[0][0]
+    start = loop.time()
+
+    for at, connection_id, kind, payload in events:
+        if speed > 0:
+            delay = (at - first) / speed - (loop.time() - start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        queue = queues.get(connection_id)
+        if queue is None:
+            queue = queues[connection_id] = asyncio.Queue()
+            workers.append(asyncio.ensure_future(run_connection(queue)))
+        queue.put_nowait((kind, payload))
+        if speed <= 0:
+            # Let the connection handle it before the next event, so frames of
+            # different connections keep their recorded order
+            await asyncio.sleep(0)
+
+    # Connections still open when the recording ended (a worker that already
+    # closed never reads this)
+    for queue in queues.values():
+        queue.put_nowait((CLOSE, None))
+    await asyncio.gather(*workers)
+    return loop.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded signaling traffic")
+    parser.add_argument("files", nargs="+", help="recordings (traffic/<room_id>.jsonl.gz)")
+    parser.add_argument("--speed", type=float, default=1.0, help="1 = as recorded, 0 = as fast as possible")
+    parser.add_argument("--include-sfu", action="store_true", help="also replay sfu-* messages")
+    args = parser.parse_args()
+
+    events, skipped = load(args.files, args.include_sfu)
+    if not events:
+        print("No events in these recordings")
+        return 1
+    messages = sum(1 for event in events if event[2] == MESSAGE)
+    connections = len({event[1] for event in events})
+    recorded = events[-1][0] - events[0][0]
+    print(f"{messages:,} frames from {connections:,} connections over {recorded:.1f}s "
+          f"({skipped:,} SFU frames skipped), speed {'max' if args.speed <= 0 else f'{args.speed:g}x'}")
+
+    cpu = time.process_time()
+    elapsed = asyncio.run(replay(events, args.speed))
+    cpu = time.process_time() - cpu
+
+    print(f"replayed in {elapsed:.2f}s, CPU {cpu:.2f}s, {ReplaySocket.sent:,} messages sent to clients")
+    # "signaling.handler.<type>.<count|seconds|cpu_seconds>" → one row per type
+    prefix = "signaling.handler."
+    rows = {}
+    for name, value in metrics.snapshot(prefix).items():
+        message_type, field = name[len(prefix):].rsplit(".", 1)
+        rows.setdefault(message_type, {})[field] = value
+    print(f"\n{'message type':<20}{'count':>8}{'ms total':>11}{'CPU ms':>9}{'µs each':>10}")
+    for message_type, row in sorted(rows.items(), key=lambda item: -item[1].get("seconds", 0)):
+        count = row.get("count", 0)
+        print(f"{message_type:<20}{int(count):>8,}{row.get('seconds', 0) * 1e3:>11.2f}"
+              f"{row.get('cpu_seconds', 0) * 1e3:>9.2f}{row.get('seconds', 0) / max(count, 1) * 1e6:>10.1f}")
+
+    dropped = sum(value for name, value in metrics.counters.items() if name.startswith("ratelimit."))
+    invalid = metrics.counters.get("signaling.invalid", 0)
+    print(f"\n{int(dropped):,} frames over the rate limit, {int(invalid):,} invalid frames")
+
+    problems = manager.check_consistency()
+    print(f"\nroom state: {len(problems)} problems")
+    for problem in problems[:10]:
+        print("   ", problem)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+# Loopback check of the SFU with synthetic media (no browser needed).
+# N fake participants publish aiortc test tracks (video frames + silence),
+# connect to the in-process SFU over localhost, and report what each one receives:
+# every other participant, the presenter in the high layer, the rest in the low layer.
+# Optional webinar viewers only receive (like the browser, with recvonly transceivers).
+#
+# Run from the project root (needs aiortc):
+#   pip install aiortc
+#   python benchmarks/sfu_loopback.py [participants] [seconds] [viewers]
+
+import os
+import sys
+import time
+import asyncio
+
+# Localhost only: no STUN lookups
+os.environ.setdefault("SFU_STUN_SERVERS", "")
+
+# Make the project modules importable (sfu, metrics)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiortc import RTCPeerConnection, RTCConfiguration, RTCSessionDescription, VideoStreamTrack, AudioStreamTrack
+from aiortc.mediastreams import MediaStreamError
+
+from sfu import sfu, SFU_LOW_LAYER_HEIGHT
+import metrics
+
+
+ROOM_ID = "loopback"
+PRESENTER = "user0"
+
+
+class FakeClient:
+    """One participant: publishes synthetic tracks and answers the SFU like the browser does."""
+
+    def __init__(self, peer_id: str, publish: bool = True):
+        self.peer_id = peer_id
+        self.publish = publish
+        self.pc = RTCPeerConnection(RTCConfiguration(iceServers=[]))
+        if publish:
+            self.pc.addTrack(AudioStreamTrack())
+            self.pc.addTrack(VideoStreamTrack())
+        else:
+            self.pc.addTransceiver("audio", direction="recvonly")
+            self.pc.addTransceiver("video", direction="recvonly")
+        # Messages from the SFU (a queue, like a WebSocket)
+        self.inbox = asyncio.Queue()
+        # { mid: {"publisher", "kind"} } from the SFU
+        self.tracks = {}
+        # { track: [frames, last frame height] }
+        self.stats = {}
+
+        @self.pc.on("track")
+        def on_track(track):
+            self.stats[track] = [0, None]
+            asyncio.ensure_future(self.consume(track))
+
+    async def send(self, message: dict):
+        await self.inbox.put(message)
+
+    async def consume(self, track):
+        stats = self.stats[track]
+        try:
+            while True:
+                frame = await track.recv()
+                stats[0] += 1
+                if track.kind == "video":
+                    stats[1] = frame.height
+        except MediaStreamError:
+            pass
+
+    async def join(self):
+        await self.pc.setLocalDescription(await self.pc.createOffer())
+        await sfu.offer(ROOM_ID, self.peer_id, self.pc.localDescription.sdp, send=self.send, publish=self.publish)
+
+    async def run(self):
+        while True:
+            message = await self.inbox.get()
+            if "tracks" in message:
+                self.tracks = message["tracks"]
+            if message["type"] == "sfu-answer":
+                await self.pc.setRemoteDescription(RTCSessionDescription(sdp=message["sdp"], type="answer"))
+            elif message["type"] == "sfu-offer":
+                await self.pc.setRemoteDescription(RTCSessionDescription(sdp=message["sdp"], type="offer"))
+                await self.pc.setLocalDescription(await self.pc.createAnswer())
+                await sfu.answer(ROOM_ID, self.peer_id, self.pc.localDescription.sdp)
+
+    def received(self) -> dict:
+        # { publisher: {"audio": frames, "video": frames, "height": px} }
+        result = {}
+        for transceiver in self.pc.getTransceivers():
+            info = self.tracks.get(transceiver.mid)
+            if info is None:
+                continue
+            frames, height = self.stats.get(transceiver.receiver.track, [0, None])
+            entry = result.setdefault(info["publisher"], {})
+            entry[info["kind"]] = frames
+            if info["kind"] == "video":
+                entry["height"] = height
+        return result
+
+
+async def main(participants: int, seconds: float, viewers: int = 0):
+    clients = [FakeClient(f"user{i}") for i in range(participants)]
+    clients += [FakeClient(f"viewer{i}", publish=False) for i in range(viewers)]
+    tasks = [asyncio.ensure_future(client.run()) for client in clients]
+
+    # Join one after another (like a class filling up), user0 presents
+    for client in clients:
+        await client.join()
+        await asyncio.sleep(0.5)
+    sfu.set_presenter(ROOM_ID, PRESENTER)
+
+    start_cpu = time.process_time()
+    await asyncio.sleep(seconds)
+    cpu = time.process_time() - start_cpu
+
+    ok = True
+    for client in clients:
+        received = client.received()
+        # Viewers publish nothing, so nobody may receive them
+        others = [c.peer_id for c in clients if c is not client and c.publish]
+        ok = ok and not set(received) - set(others)
+        for publisher in others:
+            entry = received.get(publisher, {})
+            expected_low = publisher != PRESENTER
+            height = entry.get("height")
+            good = (
+                entry.get("audio", 0) > 0
+                and entry.get("video", 0) > 0
+                and height is not None
+                and (height <= SFU_LOW_LAYER_HEIGHT) == expected_low
+            )
+            ok = ok and good
+            print(f"{client.peer_id} ← {publisher}: audio {entry.get('audio', 0):5d} frames, "
+                  f"video {entry.get('video', 0):4d} frames at {height}p {'ok' if good else 'MISMATCH'}")
+
+    print(f"\n{participants} participants + {viewers} viewers, {seconds:.0f}s, process CPU {cpu:.1f}s "
+          f"(clients + SFU), renegotiations: {int(metrics.counters['sfu.renegotiations'])}")
+    print("PASS" if ok else "FAIL")
+
+    for task in tasks:
+        task.cancel()
+    for client in clients:
+        await sfu.remove(ROOM_ID, client.peer_id)
+        await client.pc.close()
+    return ok
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    viewer_count = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    sys.exit(0 if asyncio.run(main(count, duration, viewer_count)) else 1)
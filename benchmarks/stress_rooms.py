@@ -0,0 +1,196 @@
+# Stress check of the room state under concurrent joins, approvals, kicks,
+# drops/resumes, tab replacements and webinar stage changes (no browser or server needed).
+# Fake sockets wait a random few milliseconds on every send/close, so the
+# operations interleave at every await - like many handlers running at once.
+# After every round the manager's state must pass check_consistency(), and
+# no open tab may be left outside the roster.
+#
+# Run from the project root:
+#   python benchmarks/stress_rooms.py [rounds] [users] [rooms]
+
+import os
+import sys
+import random
+import asyncio
+
+# No database writes from the attendance log
+os.environ.setdefault("ATTENDANCE_LOG_ENABLED", "0")
+
+# Make the project modules importable (signaling)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from signaling import ConnectionManager
+
+
+OPS_PER_ROUND = 400
+
+
+class FakeSocket:
+    """Records what a tab receives; every send/close yields to other tasks."""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.closed = False
+        self.messages = []
+
+    async def send_json(self, message: dict):
+        await asyncio.sleep(self.rng.random() * 0.002)
+        if self.closed:
+            raise RuntimeError("socket is closed")
+        self.messages.append(message)
+
+    async def close(self, code: int = 1000):
+        await asyncio.sleep(self.rng.random() * 0.002)
+        self.closed = True
+
+
+class Stress:
+    def __init__(self, users: int, rooms: int, seed: int = 1):
+        self.rng = random.Random(seed)
+        self.manager = ConnectionManager()
+        self.users = [f"user{i}@example.com" for i in range(users)]
+        self.admins = set(self.users[:max(1, users // 10)])
+        self.room_ids = [f"room-{i}" for i in range(rooms)]
+        # Every second room is a webinar (students join as viewers)
+        for i, room_id in enumerate(self.room_ids):
+            room_mode = "webinar" if i % 2 else "meeting"
+            self.manager.ensure_room(room_id, {"id": i, "room_id": room_id, "media_mode": "mesh", "room_mode": room_mode})
+        # Tabs the script still considers open: socket → (room_id, user)
+        self.open = {}
+
+    # ---------- what the WebSocket handlers do ----------
+
+    async def handle(self, socket: FakeSocket, room_id: str, user: str, step):
+        # Like the WebSocket route: an error on our own socket → disconnect this tab
+        try:
+            await step
+        except RuntimeError:
+            self.open.pop(socket, None)
+            self.manager.disconnect(room_id, user, socket)
+
+    async def join(self):
+        user, room_id = self.rng.choice(self.users), self.rng.choice(self.room_ids)
+        socket = FakeSocket(self.rng)
+        self.open[socket] = (room_id, user)
+        await self.handle(socket, room_id, user, self._join(socket, room_id, user))
+
+    async def _join(self, socket: FakeSocket, room_id: str, user: str):
+        if user in self.admins or user in self.manager.rooms[room_id]["peers"]:
+            await self.manager.add_to_peers(room_id, user, socket, user, "admin" if user in self.admins else "student")
+            if self.manager.holds_slot(room_id, user, socket) and not self.manager.is_viewer(room_id, user):
+                await socket.send_json({"type": "resume-token", "resumeToken": self.manager.issue_resume_token(room_id, user)})
+        elif self.manager.is_webinar(room_id):
+            await self.manager.add_viewer(room_id, user, socket, user)
+            if self.manager.holds_slot(room_id, user, socket):
+                await socket.send_json(self.manager.audience_message(room_id))
+        else:
+            await self.manager.move_to_waiting(room_id, user, socket, user, "student")
+
+    async def admit(self):
+        room_id = self.rng.choice(self.room_ids)
+        waiting = list(self.manager.rooms[room_id]["waiting"])
+        if waiting:
+            await self.manager.admit(room_id, self.rng.sample(waiting, self.rng.randint(1, len(waiting))))
+
+    async def promote(self):
+        room_id = self.rng.choice(self.room_ids)
+        viewers = list(self.manager.rooms[room_id]["viewers"])
+        if viewers:
+            await self.manager.promote(room_id, self.rng.choice(viewers))
+
+    async def demote(self):
+        room_id = self.rng.choice(self.room_ids)
+        peers = list(self.manager.rooms[room_id]["peers"])
+        if peers and self.manager.is_webinar(room_id):
+            await self.manager.demote(room_id, self.rng.choice(peers))
+
+    async def kick(self):
+        room_id = self.rng.choice(self.room_ids)
+        room = self.manager.rooms[room_id]
+        users = list(room["peers"]) + list(room["waiting"]) + list(room["viewers"])
+        if users:
+            user = self.rng.choice(users)
+            if await self.manager.kick_user(room_id, user):
+                await self.manager.announce_leave(room_id, user)
+
+    async def reject(self):
+        room_id = self.rng.choice(self.room_ids)
+        waiting = list(self.manager.rooms[room_id]["waiting"])
+        if waiting:
+            await self.manager.reject(room_id, self.rng.sample(waiting, self.rng.randint(1, len(waiting))))
+
+    async def leave(self):
+        # A tab closes: the handler's disconnect path (detach first, like routers/signaling.py)
+        if not self.open:
+            return
+        socket = self.rng.choice(list(self.open))
+        room_id, user = self.open.pop(socket)
+        socket.closed = True
+        if self.manager.is_viewer(room_id, user):
+            self.manager.disconnect(room_id, user, socket)
+        elif not self.manager.detach(room_id, user, socket):
+            if self.manager.disconnect(room_id, user, socket):
+                await self.manager.announce_leave(room_id, user)
+
+    async def resume(self):
+        # A dropped tab comes back with its resume token
+        room_id = self.rng.choice(self.room_ids)
+        dropped = [(user, info) for user, info in self.manager.rooms[room_id]["peers"].items() if info["socket"] is None]
+        if not dropped:
+            return
+        user, info = self.rng.choice(dropped)
+        # The last token the dropped tab received
+        token = self.manager.issue_resume_token(room_id, user)
+        socket = FakeSocket(self.rng)
+        self.open[socket] = (room_id, user)
+        await self.handle(socket, room_id, user, self._resume(socket, room_id, user, token))
+
+    async def _resume(self, socket: FakeSocket, room_id: str, user: str, token: str):
+        if not await self.manager.resume(room_id, user, socket, token):
+            await self.manager.add_to_peers(room_id, user, socket, user, "student")
+
+    async def present(self):
+        room_id = self.rng.choice(self.room_ids)
+        peers = list(self.manager.rooms[room_id]["peers"])
+        self.manager.set_presenter(room_id, self.rng.choice(peers) if peers else None)
+
+    # ---------- checks ----------
+
+    def orphaned_tabs(self) -> list:
+        # Open tabs that are not the user's session any more, but were never told (kicked/replaced/closed)
+        orphans = []
+        for socket, (room_id, user) in list(self.open.items()):
+            if socket.closed:
+                del self.open[socket]
+            elif not self.manager.holds_slot(room_id, user, socket):
+                orphans.append(f"{user} in {room_id}")
+        return orphans
+
+    async def run(self, rounds: int) -> bool:
+        ops = [self.join] * 4 + [
+            self.admit, self.kick, self.reject, self.leave, self.leave, self.resume, self.present,
+            self.promote, self.demote
+        ]
+        ok = True
+        for round_number in range(rounds):
+            await asyncio.gather(*(self.rng.choice(ops)() for _ in range(OPS_PER_ROUND)))
+            # Let the last closes/sends finish
+            await asyncio.sleep(0.01)
+            problems = self.manager.check_consistency() + [f"orphaned tab: {o}" for o in self.orphaned_tabs()]
+            peers = sum(len(self.manager.rooms[r]["peers"]) for r in self.room_ids)
+            waiting = sum(len(self.manager.rooms[r]["waiting"]) for r in self.room_ids)
+            viewers = sum(len(self.manager.rooms[r]["viewers"]) for r in self.room_ids)
+            print(f"round {round_number + 1}: {peers} peers, {waiting} waiting, {viewers} viewers, {len(problems)} problems")
+            for problem in problems[:10]:
+                print("   ", problem)
+            ok = ok and not problems
+        return ok
+
+
+if __name__ == "__main__":
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    rooms = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+    ok = asyncio.run(Stress(users, rooms).run(rounds))
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,278 @@
+# used to read compression settings from environment variables
+import os
+
+# used for gzip compression (built into Python)
+import zlib
+
+# used to measure CPU time spent compressing
+import time
+
+# Headers → read request headers, MutableHeaders → change response headers
+from starlette.datastructures import Headers, MutableHeaders
+
+# counters for bytes in/out and CPU time
+import metrics
+
+# shared Accept-Encoding parser (also used for static files)
+from static_files import accepted_encodings
+
+# Brotli is optional: if it is not installed we only use gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# permessage-deflate tuning needs the "websockets" package (used by uvicorn)
+# The reason it can't be used is kept so the server can say why on start
+try:
+    from websockets.extensions.permessage_deflate import PerMessageDeflate, ServerPerMessageDeflateFactory
+    from websockets.frames import Opcode, CTRL_OPCODES
+    from uvicorn.protocols.websockets.websockets_impl import WebSocketProtocol
+    WEBSOCKET_TUNING_ERROR = None
+except ImportError as e:
+    WebSocketProtocol = None
+    WEBSOCKET_TUNING_ERROR = e
+
+
+# =====================================
+# HTTP COMPRESSION SETTINGS
+# =====================================
+
+# Turn HTTP response compression on/off ("1" = on)
+HTTP_COMPRESSION = os.getenv("HTTP_COMPRESSION", "1") == "1"
+
+# Allow brotli when the browser supports it ("1" = on)
+HTTP_BROTLI = os.getenv("HTTP_BROTLI", "1") == "1"
+
+# Responses smaller than this (bytes) are sent uncompressed
+HTTP_COMPRESSION_MIN_SIZE = int(os.getenv("HTTP_COMPRESSION_MIN_SIZE", "1024"))
+
+# gzip level 1 (fast) .. 9 (small). 6 is a good balance for JSON
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+
+# brotli quality 0 (fast) .. 11 (small). 4 is cheap and beats gzip on JSON
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+
+# =====================================
+# WEBSOCKET (permessage-deflate) SETTINGS
+# =====================================
+
+# Turn permessage-deflate on/off ("1" = on)
+WS_DEFLATE = os.getenv("WS_DEFLATE", "1") == "1"
+
+# Messages smaller than this (bytes) are sent uncompressed (ICE candidates, mic-status ...)
+WS_DEFLATE_MIN_SIZE = int(os.getenv("WS_DEFLATE_MIN_SIZE", "256"))
+
+# "1" = reset the compressor after every message (less memory per socket, worse ratio)
+WS_SERVER_NO_CONTEXT_TAKEOVER = os.getenv("WS_SERVER_NO_CONTEXT_TAKEOVER", "0") == "1"
+WS_CLIENT_NO_CONTEXT_TAKEOVER = os.getenv("WS_CLIENT_NO_CONTEXT_TAKEOVER", "0") == "1"
+
+# Compression window (9..15). Smaller = less memory per socket
+WS_MAX_WINDOW_BITS = int(os.getenv("WS_MAX_WINDOW_BITS", "15"))
+
+# zlib memLevel (1..9). Smaller = less memory per socket
+WS_MEM_LEVEL = int(os.getenv("WS_MEM_LEVEL", "8"))
+
+
+def is_compressible(content_type: str) -> bool:
+    # Only text-like responses benefit from compression
+    # (event streams are excluded because compression would delay each event)
+    if content_type.startswith("text/event-stream"):
+        return False
+    return (
+        content_type.startswith("text/")
+        or "json" in content_type
+        or "javascript" in content_type
+        or "xml" in content_type
+    )
+
+
+# =====================================
+# STREAMING COMPRESSOR (gzip or brotli)
+# =====================================
+
+class Compressor:
+    """Small wrapper so gzip and brotli can be used the same way."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._obj = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            # 16 + MAX_WBITS → write gzip header/trailer
+            self._obj = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        # Compress one chunk and record bytes + CPU time
+        start = time.thread_time()
+        if self.encoding == "br":
+            out = self._obj.process(data)
+            if final:
+                out += self._obj.finish()
+        else:
+            out = self._obj.compress(data)
+            if final:
+                out += self._obj.flush()
+        name = "compression.http." + self.encoding
+        metrics.inc(name + ".cpu_seconds", time.thread_time() - start)
+        metrics.inc(name + ".bytes_in", len(data))
+        metrics.inc(name + ".bytes_out", len(out))
+        return out
+
+
+# =====================================
+# HTTP COMPRESSION MIDDLEWARE
+# =====================================
+
+class CompressionMiddleware:
+    """
+    Compresses HTTP responses with brotli or gzip (whatever the browser accepts).
+    - skips small responses (below HTTP_COMPRESSION_MIN_SIZE)
+    - skips responses that are already compressed (precompressed static files)
+    - skips WebSocket connections (those use permessage-deflate instead)
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Pick the best encoding the browser supports
+        accepted = accepted_encodings(Headers(scope=scope))
+        if HTTP_BROTLI and brotli is not None and "br" in accepted:
+            encoding = "br"
+        elif "gzip" in accepted:
+            encoding = "gzip"
+        else:
+            await self.app(scope, receive, send)
+            return
+
+        await self.app(scope, receive, CompressedSend(send, encoding))
+
+
+class CompressedSend:
+    """Wraps the ASGI "send" function and compresses the body on the way out."""
+
+    def __init__(self, send, encoding: str):
+        self.send = send
+        self.encoding = encoding
+        self.start_message = None
+        self.compressor = None
+        self.passthrough = False
+
+    async def __call__(self, message):
+        # Hold back the headers until we know if we will compress
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        # First body chunk → decide
+        if self.compressor is None:
+            headers = MutableHeaders(scope=self.start_message)
+            content_type = headers.get("content-type", "")
+
+            if (
+                "content-encoding" in headers
+                or not is_compressible(content_type)
+                or (not more_body and len(body) < HTTP_COMPRESSION_MIN_SIZE)
+            ):
+                # Send unchanged
+                self.passthrough = True
+                metrics.inc("compression.http.skipped")
+                await self.send(self.start_message)
+                await self.send(message)
+                return
+
+            self.compressor = Compressor(self.encoding)
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if "content-length" in headers:
+                del headers["content-length"]
+
+            # Whole body in one piece → we know the final length
+            if not more_body:
+                data = self.compressor.compress(body, final=True)
+                headers["Content-Length"] = str(len(data))
+                await self.send(self.start_message)
+                await self.send({"type": "http.response.body", "body": data})
+                return
+
+            # Streaming body → no Content-Length (chunked)
+            await self.send(self.start_message)
+
+        data = self.compressor.compress(body, final=not more_body)
+        await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+
+# =====================================
+# WEBSOCKET permessage-deflate TUNING
+# =====================================
+
+if WebSocketProtocol is not None:
+
+    class MinSizePerMessageDeflate(PerMessageDeflate):
+        """permessage-deflate that leaves small messages uncompressed."""
+
+        def encode(self, frame):
+            # Control frames (ping, pong, close) are never compressed
+            if frame.opcode in CTRL_OPCODES:
+                return frame
+
+            # RFC 7692 allows sending any single message uncompressed (RSV1 not set)
+            if (
+                frame.opcode is not Opcode.CONT
+                and frame.fin
+                and len(frame.data) < WS_DEFLATE_MIN_SIZE
+            ):
+                metrics.inc("compression.ws.skipped")
+                return frame
+
+            start = time.thread_time()
+            encoded = super().encode(frame)
+            metrics.inc("compression.ws.cpu_seconds", time.thread_time() - start)
+            metrics.inc("compression.ws.bytes_in", len(frame.data))
+            metrics.inc("compression.ws.bytes_out", len(encoded.data))
+            return encoded
+
+    class TunedPerMessageDeflateFactory(ServerPerMessageDeflateFactory):
+        def process_request_params(self, params, accepted_extensions):
+            response_params, extension = super().process_request_params(params, accepted_extensions)
+            # Same extension object, but with our "skip small messages" encode()
+            extension.__class__ = MinSizePerMessageDeflate
+            return response_params, extension
+
+    class DeflateWebSocketProtocol(WebSocketProtocol):
+        """uvicorn WebSocket protocol using the tuned permessage-deflate settings."""
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.available_extensions = []
+            if WS_DEFLATE:
+                self.available_extensions.append(TunedPerMessageDeflateFactory(
+                    server_no_context_takeover=WS_SERVER_NO_CONTEXT_TAKEOVER,
+                    client_no_context_takeover=WS_CLIENT_NO_CONTEXT_TAKEOVER,
+                    server_max_window_bits=WS_MAX_WINDOW_BITS if WS_MAX_WINDOW_BITS < 15 else None,
+                    compress_settings={"memLevel": WS_MEM_LEVEL}
+                ))
+
+
+def websocket_protocol():
+    # Value for uvicorn's "ws" option
+    # Uses our tuned protocol when the "websockets" package is installed
+    if WebSocketProtocol is not None:
+        return "compression:DeflateWebSocketProtocol"
+    # Don't drop the WS_* settings silently
+    print(f"WARNING: WebSocket compression tuning is off (WS_DEFLATE_MIN_SIZE, context takeover, "
+          f"window bits, memLevel are ignored): {WEBSOCKET_TUNING_ERROR}")
+    return "auto"
@@ -1,5 +1,22 @@
-from sqlalchemy import create_engine
+import os
+# Used to read pool settings from environment variables
+
+# used for replica health checks and read-your-writes windows
+import time
+import threading
+import asyncio
+import itertools
+
+from sqlalchemy import create_engine, event, text
 # create_engine → creates a connection to the database
+# event → hooks on sessions (read-only guard, remembering writes)
+# text → raw SQL for replica health checks
+
+from sqlalchemy.exc import DBAPIError
+# DBAPIError → a replica that fails mid-request is taken out of rotation
+
+from starlette.requests import HTTPConnection
+# HTTPConnection → who made the request (read-your-writes is per client)
 
 from sqlalchemy.ext.declarative import declarative_base
 # declarative_base → base class that all DB models will inherit from
@@ -7,6 +24,9 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 # sessionmaker → used to create database sessions (connections)
 
+import metrics
+# metrics → counts reads per engine ("db.reads.primary/replica/sticky")
+
 
 # =====================================
 # DATABASE URL
@@ -14,19 +34,43 @@ from sqlalchemy.orm import sessionmaker
 
 # This points to a SQLite database file named "course_era.db"
 # SQLite stores data in a single file (simple and lightweight DB)
-SQLALCHEMY_DATABASE_URL = "sqlite:///./course_era.db"
+# This is the PRIMARY: every write goes here
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./course_era.db")
+
+# Read replicas, comma separated (empty = reads also go to the primary)
+# Local stand-in: python manage.py replica course_era_replica.db, then
+#   DATABASE_REPLICA_URLS=sqlite:///file:course_era_replica.db?mode=ro&uri=true
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
 
 
 # =====================================
 # DATABASE ENGINE
 # =====================================
 
-# Engine is the main connection manager to the database
-# connect_args allows multiple threads to access SQLite safely
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False}
-)
+# Connections kept open for reuse
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+
+# Extra connections allowed when all pooled ones are busy (-1 = no limit)
+# When all are in use, a request waits for a free one. Endpoints that query are
+# plain "def" (they run in the threadpool) or call the database through
+# run_in_threadpool, so only that thread waits, never the event loop
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+
+def make_engine(url: str):
+    # connect_args allows multiple threads to access SQLite safely
+    return create_engine(
+        url,
+        connect_args={"check_same_thread": False} if url.startswith("sqlite") else {},
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW
+    )
+
+
+# Engine is the main connection manager to the database (the primary)
+engine = make_engine(SQLALCHEMY_DATABASE_URL)
+
+# One engine per read replica
+replica_engines = [make_engine(url) for url in DATABASE_REPLICA_URLS]
 
 
 # =====================================
@@ -42,6 +86,119 @@ SessionLocal = sessionmaker(
 )
 
 
+# Sessions for read-only endpoints (bound per request: a replica or the primary)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+
+@event.listens_for(ReadSessionLocal, "before_flush")
+def _refuse_writes(session, flush_context, instances):
+    # A GET handler that tries to write would write to a replica (or be lost)
+    raise RuntimeError("This session is read-only: use get_db for endpoints that write")
+
+
+# =====================================
+# READ ROUTING (PRIMARY + REPLICAS)
+# =====================================
+
+# Seconds a client keeps reading from the primary after it wrote something,
+# so it sees its own change even if the replicas are behind (read-your-writes)
+DB_STICKY_SECONDS = float(os.getenv("DB_STICKY_SECONDS", "5"))
+
+# Seconds between replica health checks (a failing replica is skipped until it passes)
+DB_REPLICA_CHECK_SECONDS = float(os.getenv("DB_REPLICA_CHECK_SECONDS", "5"))
+
+
+class ReadRouter:
+    # Picks the engine for read-only sessions:
+    # - no replicas, or the client wrote in the last DB_STICKY_SECONDS → primary
+    # - otherwise the next healthy replica (round robin)
+    # - no healthy replica → primary
+
+    def __init__(self, replicas: list):
+        self.replicas = replicas
+        self.healthy = list(replicas)
+        self._next = itertools.count()
+        # client key → time until which its reads go to the primary
+        self.sticky = {}
+        self._lock = threading.Lock()
+
+    def wrote(self, key: str):
+        # Called after a commit made by this client
+        if not self.replicas or not key:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self.sticky[key] = now + DB_STICKY_SECONDS
+            # Keep the table small: drop expired entries now and then
+            if len(self.sticky) > 10_000:
+                self.sticky = {k: until for k, until in self.sticky.items() if until > now}
+
+    def engine_for(self, key: str):
+        healthy = self.healthy
+        if not healthy:
+            metrics.inc("db.reads.primary")
+            return engine
+        until = self.sticky.get(key)
+        if until is not None and until > time.monotonic():
+            metrics.inc("db.reads.sticky")
+            return engine
+        metrics.inc("db.reads.replica")
+        return healthy[next(self._next) % len(healthy)]
+
+    def mark_failed(self, replica):
+        # Taken out of rotation until the next health check passes
+        with self._lock:
+            if replica in self.healthy:
+                self.healthy = [r for r in self.healthy if r is not replica]
+                metrics.inc("db.replica.failed")
+                print(f"Read replica {replica.url!r} failed, reading from the primary")
+        # Broken connections aren't reused; the health check opens new ones
+        replica.dispose()
+
+    def check(self):
+        # Blocking: a replica is healthy if it answers and has the current schema
+        from migrations import LATEST_VERSION
+
+        healthy = []
+        for replica in self.replicas:
+            try:
+                with replica.connect() as conn:
+                    version = conn.execute(text("SELECT version FROM schema_version")).scalar()
+                if version is not None and version >= LATEST_VERSION:
+                    healthy.append(replica)
+            except DBAPIError:
+                replica.dispose()
+        with self._lock:
+            if len(healthy) != len(self.healthy):
+                print(f"Read replicas healthy: {len(healthy)}/{len(self.replicas)}")
+            self.healthy = healthy
+        metrics.counters["db.replicas.healthy"] = len(healthy)
+
+    async def run_health_checks(self):
+        # Background task (started in main.py), only when replicas are configured
+        if not self.replicas:
+            return
+        while True:
+            await asyncio.to_thread(self.check)
+            await asyncio.sleep(DB_REPLICA_CHECK_SECONDS)
+
+
+read_router = ReadRouter(replica_engines)
+
+
+def client_key(connection: HTTPConnection) -> str:
+    # Same client = same token (header, or ?token= for streams), else same address
+    return (connection.headers.get("authorization")
+            or connection.query_params.get("token")
+            or (connection.client.host if connection.client else ""))
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _remember_write(session):
+    # Commits made for a request send that client's next reads to the primary
+    read_router.wrote(session.info.get("client_key"))
+
+
 # =====================================
 # BASE MODEL CLASS
 # =====================================
@@ -55,9 +212,10 @@ Base = declarative_base()
 # GET DATABASE CONNECTION (DEPENDENCY)
 # =====================================
 
-def get_db():
-    # Create a new database session
+def get_db(connection: HTTPConnection):
+    # Create a new database session (on the primary: reads and writes)
     db = SessionLocal()
+    db.info["client_key"] = client_key(connection)
 
     try:
         # Give this DB session to the API endpoint using it
@@ -65,4 +223,27 @@ def get_db():
 
     finally:
         # Always close DB connection after request finishes
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# =====================================
+# GET READ-ONLY DATABASE CONNECTION (DEPENDENCY)
+# =====================================
+
+# For GET endpoints that only read: uses a replica when one is configured
+# Data can be a few seconds old, except for a client's own recent writes
+def get_read_db(connection: HTTPConnection):
+    bind = read_router.engine_for(client_key(connection))
+    db = ReadSessionLocal(bind=bind)
+
+    try:
+        yield db
+
+    except DBAPIError:
+        # The replica broke during the request: next requests skip it
+        if bind is not engine:
+            read_router.mark_failed(bind)
+        raise
+
+    finally:
+        db.close()
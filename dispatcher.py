@@ -0,0 +1,79 @@
+# per-type handler timing (count, seconds, CPU seconds) and invalid message counters
+import metrics
+
+
+# =====================================
+# MESSAGE FIELD CHECKS
+# =====================================
+
+# Field is allowed to be missing (or null)
+def optional(*types) -> tuple:
+    return types + (type(None),)
+
+
+def compile_fields(fields: dict) -> tuple:
+    # { "target_id": str, "layer": optional(str) } → (("target_id", (str,)), ("layer", (str, NoneType)))
+    # Done once when the handler is registered, so checking a message is a few isinstance() calls
+    return tuple(
+        (name, types if isinstance(types, tuple) else (types,))
+        for name, types in fields.items()
+    )
+
+
+class MessageDispatcher:
+    """
+    Table of handlers for JSON messages keyed by their "type" field.
+
+        dispatcher = MessageDispatcher("signaling")
+
+        @dispatcher.on("chat-message", message=str)
+        async def chat(connection, data): ...
+
+    Finding the handler is one dict lookup. Each type's field checks are compiled
+    when it is registered, and messages with missing or wrongly-typed fields are
+    dropped before any handler runs. Any module can register more types.
+    Every handler is timed under "<name>.handler.<type>" (see metrics.timed).
+    Its seconds include the time spent awaiting sends; its cpu_seconds only
+    count the handler's own code, not other tasks that run meanwhile.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        # type → (handler, compiled field checks, metrics name)
+        self.routes = {}
+        # Used for types nobody registered (None = drop them)
+        self.fallback = None
+
+    def on(self, *msg_types: str, **fields):
+        # Register a handler for one or more message types (with required field types)
+        checks = compile_fields(fields)
+
+        def register(handler):
+            for msg_type in msg_types:
+                if msg_type in self.routes:
+                    raise ValueError(f"Handler for '{msg_type}' is already registered")
+                self.routes[msg_type] = (handler, checks, f"{self.name}.handler.{msg_type}")
+            return handler
+        return register
+
+    def default(self, handler):
+        # Handler for every other type (one shared metrics name, so clients can't create counters)
+        self.fallback = (handler, (), f"{self.name}.handler.other")
+        return handler
+
+    def route(self, data):
+        # Handler for this message, or None if the message is malformed
+        msg_type = data.get("type") if isinstance(data, dict) else None
+        route = self.routes.get(msg_type, self.fallback) if isinstance(msg_type, str) else None
+        if route is None:
+            metrics.inc(f"{self.name}.invalid")
+            return None
+        for field, types in route[1]:
+            if not isinstance(data.get(field), types):
+                metrics.inc(f"{self.name}.invalid")
+                return None
+        return route
+
+    async def run(self, route, connection, data):
+        handler, _, timer_name = route
+        await metrics.timed(timer_name, handler(connection, data))
@@ -0,0 +1,217 @@
+# used for subscriber queues and the occupancy background task
+import asyncio
+
+# used to read settings from environment variables
+import os
+
+# used for the shared (SQLite) event log read by every worker
+import sqlite3
+import threading
+import time
+
+# fast JSON encoding (orjson when installed)
+import serializers
+
+# counters for dropped/resynced subscribers
+import metrics
+
+
+# =====================================
+# LIVE UPDATE SETTINGS
+# =====================================
+
+# Max events waiting for one slow subscriber before it is told to resync
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "100"))
+
+# How often live room occupancy is checked (only sent when it changed)
+OCCUPANCY_INTERVAL = float(os.getenv("OCCUPANCY_INTERVAL", "5"))
+
+# Keep-alive comment so proxies/tunnels don't close idle streams
+HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+
+# Where course/meeting change events go:
+#   "memory"             → only the /events/ streams of this worker (default)
+#   "sqlite:<file path>" → the streams of every worker on this machine (server.py
+#                          uses it when it runs several workers); a local stand-in
+#                          for a shared pub/sub (Redis etc.)
+EVENTS_STORE = os.getenv("EVENTS_STORE", "memory")
+
+# How often each worker reads new events from the shared store
+EVENTS_POLL_SECONDS = float(os.getenv("EVENTS_POLL_SECONDS", "0.5"))
+
+# Shared events older than this are deleted (a worker that fell further behind resyncs)
+EVENTS_KEEP_SECONDS = 60
+
+
+def format_event(event_type: str, data) -> str:
+    # Server-Sent Events wire format
+    return f"event: {event_type}\ndata: {serializers.dumps(data).decode('utf-8')}\n\n"
+
+
+def call_on_loop(loop, func, *args):
+    # Run func on "loop" (asyncio objects may only be used from their event loop)
+    # Endpoints declared with "def" run in worker threads → hand the call over
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if loop is None or loop is running or loop.is_closed():
+        func(*args)
+    else:
+        loop.call_soon_threadsafe(func, *args)
+
+
+def public_occupancy(rooms: dict) -> dict:
+    # What students see: head count only (no presenter, waiting room or viewers)
+    return {room_id: {"peers": room["peers"]} for room_id, room in rooms.items()}
+
+
+# =====================================
+# SHARED EVENT LOG (SEVERAL WORKERS)
+# =====================================
+
+class SQLiteEventLog:
+    # Encoded events in a SQLite file every worker process opens:
+    # publish() adds them, each worker's run_shared_events() reads the new ones
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._added = 0
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS live_events ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, at REAL NOT NULL, "
+            "message TEXT NOT NULL, staff_message TEXT NOT NULL)")
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread (sqlite3 connections aren't shared across threads)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def add(self, message: str, staff_message: str):
+        conn = self._connection()
+        now = time.time()
+        conn.execute("INSERT INTO live_events (at, message, staff_message) VALUES (?, ?, ?)",
+                     (now, message, staff_message))
+        self._added += 1
+        if self._added % 100 == 0:
+            conn.execute("DELETE FROM live_events WHERE at < ?", (now - EVENTS_KEEP_SECONDS,))
+
+    def last_id(self) -> int:
+        return self._connection().execute("SELECT COALESCE(MAX(id), 0) FROM live_events").fetchone()[0]
+
+    def since(self, last_id: int) -> list:
+        # [(id, message, staff_message), ...] oldest first
+        return self._connection().execute(
+            "SELECT id, message, staff_message FROM live_events WHERE id > ? ORDER BY id", (last_id,)).fetchall()
+
+
+def _make_store():
+    if EVENTS_STORE.startswith("sqlite:"):
+        return SQLiteEventLog(EVENTS_STORE[len("sqlite:"):])
+    return None
+
+
+# =====================================
+# IN-PROCESS EVENT BROKER
+# =====================================
+
+class EventBroker:
+    """
+    Fan-out of change events to every open dashboard stream.
+    Each event is encoded ONCE and the same text is queued for all subscribers
+    (or once per audience when staff get more detail than students).
+    With a shared store, events go through it so every worker's streams get them.
+    """
+
+    def __init__(self, store=None):
+        # Shared event log (None = this worker only)
+        self.store = store
+        # One queue per open /events/ stream
+        self.subscribers = set()
+        # The queues of admins and tutors (a subset of subscribers)
+        self.staff = set()
+        # Event loop the queues belong to
+        self.loop = None
+
+    def subscribe(self, staff: bool = False) -> asyncio.Queue:
+        self.loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+        self.subscribers.add(queue)
+        if staff:
+            self.staff.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self.subscribers.discard(queue)
+        self.staff.discard(queue)
+
+    def publish(self, event_type: str, data, staff_data=None, local: bool = False):
+        # Called after a DB change, from route handlers (worker threads) or the event loop
+        # staff_data → sent to admins/tutors instead of data
+        # local → only this worker's streams, even with a shared store (occupancy)
+        shared = self.store is not None and not local
+        if not shared and not self.subscribers:
+            return
+        # Encoded here (in the caller's thread), queued on the event loop
+        message = format_event(event_type, data)
+        staff_message = message if staff_data is None else format_event(event_type, staff_data)
+        if shared:
+            # Delivered by run_shared_events in every worker (this one too)
+            self.store.add(message, staff_message)
+        else:
+            call_on_loop(self.loop, self._deliver, message, staff_message)
+
+    def _deliver(self, message: str, staff_message: str):
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(staff_message if queue in self.staff else message)
+            except asyncio.QueueFull:
+                # Subscriber is too slow → throw away its backlog and ask it to reload
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(format_event("resync", {}))
+                metrics.inc("events.resync")
+
+    async def run_occupancy(self, manager):
+        # Background task (started in main.py): push live room occupancy when it changes
+        last = None
+        while True:
+            await asyncio.sleep(OCCUPANCY_INTERVAL)
+            if not self.subscribers:
+                continue
+            current = manager.occupancy()
+            if current != last:
+                # Rooms live in this worker → its own streams only
+                self.publish("occupancy", public_occupancy(current), staff_data=current, local=True)
+                last = current
+
+    async def run_shared_events(self):
+        # Background task (started in main.py), only with a shared EVENTS_STORE:
+        # delivers the events published by every worker to this worker's streams
+        if self.store is None:
+            return
+        last_id = None
+        while True:
+            try:
+                if last_id is None:
+                    # Start after what is already there (older events are stale)
+                    last_id = await asyncio.to_thread(self.store.last_id)
+                rows = await asyncio.to_thread(self.store.since, last_id)
+                if rows and rows[0][0] != last_id + 1:
+                    # Events were deleted before this worker read them → streams reload
+                    resync = format_event("resync", {})
+                    self._deliver(resync, resync)
+                    metrics.inc("events.resync")
+                for event_id, message, staff_message in rows:
+                    self._deliver(message, staff_message)
+                    last_id = event_id
+            except sqlite3.Error as e:
+                print(f"Shared event store error: {e}")
+            await asyncio.sleep(EVENTS_POLL_SECONDS)
+
+
+# Global broker used by the routers
+broker = EventBroker(_make_store())
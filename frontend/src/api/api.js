@@ -27,17 +27,56 @@ api.interceptors.request.use(
     }
 );
 
+// Save the tokens returned by /auth/login and /auth/refresh
+export const saveTokens = ({ access_token, refresh_token }) => {
+    localStorage.setItem('token', access_token);
+    if (refresh_token) localStorage.setItem('refresh_token', refresh_token);
+};
+
+// Get a new access token with the refresh token (no password, no bcrypt on the server)
+// Several requests failing at once share ONE refresh call
+let refreshing = null;
+export const refreshTokens = () => {
+    if (!refreshing) {
+        const refreshToken = localStorage.getItem('refresh_token');
+        refreshing = (refreshToken
+            ? axios.post(`${api.defaults.baseURL}/auth/refresh`, { refresh_token: refreshToken })
+            : Promise.reject(new Error('No refresh token')))
+            .then((response) => {
+                saveTokens(response.data);
+                return response.data.access_token;
+            })
+            .finally(() => { refreshing = null; });
+    }
+    return refreshing;
+};
+
 // RESPONSE INTERCEPTOR: Runs after every response from the API
 // Purpose: Handle authentication errors (like expired tokens)
 api.interceptors.response.use(
     (response) => response,  // If successful, return response as-is
-    (error) => {
+    async (error) => {
+        const request = error.config;
         // Check if error is a 401 (Unauthorized - token expired or invalid)
         if (error.response && error.response.status === 401) {
-            // Remove the invalid token from storage
-            localStorage.removeItem('token');
-            // Redirect user to login page
-            window.location.href = '/login';
+            // Expired access token → refresh once and send the request again
+            if (request && !request._retried && !request.url.startsWith('/auth/') && localStorage.getItem('refresh_token')) {
+                request._retried = true;
+                try {
+                    const token = await refreshTokens();
+                    request.headers.Authorization = `Bearer ${token}`;
+                    return api(request);
+                } catch (refreshError) {
+                    // Refresh token expired too → log in again (below)
+                }
+            }
+            if (!request?.url?.startsWith('/auth/login')) {
+                // Remove the invalid tokens from storage
+                localStorage.removeItem('token');
+                localStorage.removeItem('refresh_token');
+                // Redirect user to login page
+                window.location.href = '/login';
+            }
         }
         return Promise.reject(error);
     }
@@ -2,7 +2,7 @@ import React, { createContext, useContext, useState, useEffect } from 'react';
 // jwtDecode: Library to decode JWT tokens and extract data (email, role, expiration)
 import { jwtDecode } from 'jwt-decode';
 // API: Axios instance for making HTTP requests to backend
-import api from '../api/api';
+import api, { saveTokens, refreshTokens } from '../api/api';
 
 // Create context object - This holds authentication data shared across all components
 const AuthContext = createContext();
@@ -16,35 +16,56 @@ export const AuthProvider = ({ children }) => {
 
     // useEffect: Runs when component mounts - Check if user is already logged in
     useEffect(() => {
-        // Try to get saved token from browser's local storage
-        const token = localStorage.getItem('token');
-        if (token) {
-            try {
-                // Decode the token to extract user data
-                const decoded = jwtDecode(token);
-                
-                // Check if token has expired (exp is in seconds, Date.now() is in milliseconds)
-                if (decoded.exp * 1000 < Date.now()) {
-                    // Token is expired - remove it and clear user
-                    localStorage.removeItem('token');
-                    setUser(null);
-                } else {
-                    // Token is still valid - restore user session
+        const restoreSession = async () => {
+            // Try to get saved token from browser's local storage
+            let token = localStorage.getItem('token');
+            if (token) {
+                try {
+                    // Check if token has expired (exp is in seconds, Date.now() is in milliseconds)
+                    if (jwtDecode(token).exp * 1000 < Date.now()) {
+                        // Access tokens are short-lived: get a new one with the refresh token
+                        token = await refreshTokens();
+                    }
+                    // Decode the token to extract user data and restore the session
+                    const decoded = jwtDecode(token);
                     setUser({
                         email: decoded.sub,  // 'sub' claim contains the email
                         role: decoded.role
                     });
+                } catch (error) {
+                    // Token is corrupted, or the refresh token has expired too
+                    console.error('Failed to restore session:', error);
+                    localStorage.removeItem('token');
+                    localStorage.removeItem('refresh_token');
+                    setUser(null);
                 }
-            } catch (error) {
-                // Token is corrupted or invalid
-                console.error('Failed to decode token:', error);
-                localStorage.removeItem('token');
             }
-        }
-        // Finished checking - loading is complete
-        setLoading(false);
+            // Finished checking - loading is complete
+            setLoading(false);
+        };
+        restoreSession();
     }, []);
 
+    // Refresh the access token a minute before it expires, so WebSocket/stream
+    // reconnects and <video> URLs (which read the token from storage) always get
+    // a valid one, even in a lecture that lasts hours
+    useEffect(() => {
+        if (!user) return;
+        let timer;
+        const schedule = () => {
+            const token = localStorage.getItem('token');
+            if (!token) return;
+            const delay = Math.max(jwtDecode(token).exp * 1000 - Date.now() - 60 * 1000, 5 * 1000);
+            timer = setTimeout(() => {
+                refreshTokens()
+                    .then(schedule)
+                    .catch((error) => console.error('Failed to refresh token:', error));
+            }, delay);
+        };
+        schedule();
+        return () => clearTimeout(timer);
+    }, [user]);
+
     // Function to handle user login
     const login = async (email, password) => {
         // Create form data (backend expects URL-encoded format, not JSON)
@@ -60,10 +81,10 @@ export const AuthProvider = ({ children }) => {
                 },
             });
 
-            // Extract JWT token from response
+            // Extract JWT tokens from response
             const { access_token } = response.data;
-            // Save token to local storage so it persists across page refreshes
-            localStorage.setItem('token', access_token);
+            // Save tokens to local storage so they persist across page refreshes
+            saveTokens(response.data);
 
             // Decode token to get user info
             const decoded = jwtDecode(access_token);
@@ -83,8 +104,9 @@ export const AuthProvider = ({ children }) => {
 
     // Function to handle user logout
     const logout = () => {
-        // Remove token from storage
+        // Remove tokens from storage
         localStorage.removeItem('token');
+        localStorage.removeItem('refresh_token');
         // Clear user state
         setUser(null);
     };
@@ -0,0 +1,73 @@
+import { useEffect, useRef } from 'react';
+
+// Event types sent by the backend /events/ stream
+const EVENT_TYPES = [
+    'course-created',
+    'course-updated',
+    'course-deleted',
+    'meeting-created',
+    'meeting-deleted',
+    'occupancy',
+    'resync'
+];
+
+/**
+ * Custom hook that subscribes once to the backend live update stream (SSE).
+ * handlers: { 'course-created': (course) => ..., 'occupancy': (rooms) => ..., ... }
+ */
+const useLiveUpdates = (handlers) => {
+    // Keep the latest handlers without reopening the stream on every render
+    const handlersRef = useRef(handlers);
+    handlersRef.current = handlers;
+
+    useEffect(() => {
+        let source = null;
+        let retry = null;
+        let closed = false;
+        let connected = false;  // true once the first stream has opened
+
+        const open = () => {
+            const token = localStorage.getItem('token');
+            if (!token) return;
+
+            // EventSource can't send headers, so the token goes in the URL
+            const baseUrl = import.meta.env.VITE_API_URL || 'http://127.0.0.1:8000';
+            source = new EventSource(`${baseUrl}/events/?token=${encodeURIComponent(token)}`);
+
+            EVENT_TYPES.forEach(type => {
+                source.addEventListener(type, (event) => {
+                    const handler = handlersRef.current[type];
+                    if (handler) handler(JSON.parse(event.data));
+                });
+            });
+
+            // Events sent while the stream was down are lost (the server only
+            // sends fresh occupancy) → on every reconnect, reload like a "resync"
+            source.onopen = () => {
+                if (connected) {
+                    const handler = handlersRef.current.resync;
+                    if (handler) handler({});
+                }
+                connected = true;
+            };
+
+            // The browser reconnects automatically on network errors, but with the
+            // same URL: once the access token in it has expired the server refuses
+            // and the browser gives up → reopen with the current (refreshed) token
+            source.onerror = () => {
+                if (source.readyState === EventSource.CLOSED && !closed) {
+                    retry = setTimeout(open, 3000);
+                }
+            };
+        };
+
+        open();
+        return () => {
+            closed = true;
+            clearTimeout(retry);
+            if (source) source.close();
+        };
+    }, []);
+};
+
+export default useLiveUpdates;
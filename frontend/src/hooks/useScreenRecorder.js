@@ -1,15 +1,82 @@
 import { useState, useRef, useCallback } from 'react';
+import api from '../api/api';
+
+// The recorder hands over a chunk this often (ms) and it is uploaded right away
+const CHUNK_INTERVAL_MS = 5000;
+
+// Longest wait between upload retries while the network is down (ms)
+const MAX_RETRY_DELAY_MS = 30000;
+
+// SHA-256 of a chunk (the server checks it before storing the chunk)
+const sha256Hex = async (buffer) => {
+    const hash = await crypto.subtle.digest('SHA-256', buffer);
+    return Array.from(new Uint8Array(hash)).map(b => b.toString(16).padStart(2, '0')).join('');
+};
+
+// Save chunks as a local file (used when uploading is not possible)
+const downloadChunks = (chunks, suffix = '') => {
+    const blob = new Blob(chunks, { type: 'video/webm; codecs=vp8' });
+    const url = URL.createObjectURL(blob);
+    const a = document.createElement('a');
+    a.style.display = 'none';
+    a.href = url;
+    a.download = `meeting-recording-${new Date().toISOString()}${suffix}.webm`;
+    document.body.appendChild(a);
+    a.click();
+
+    // Cleanup
+    window.URL.revokeObjectURL(url);
+    document.body.removeChild(a);
+};
 
 /**
  * Custom hook for screen recording functionality.
+ * With a meetingId, chunks are uploaded to the server while recording
+ * (nothing piles up in browser memory); otherwise the file is downloaded at the end.
  */
-const useScreenRecorder = () => {
+const useScreenRecorder = (meetingId = null) => {
     const [isRecording, setIsRecording] = useState(false);
     const [recordingTime, setRecordingTime] = useState(0);
     const [recordingStream, setRecordingStream] = useState(null);
     const mediaRecorderRef = useRef(null);
     const timerRef = useRef(null);
+    // Chunks kept in the browser (only when they can't be uploaded)
     const chunksRef = useRef([]);
+    // Current upload: { id, index, queue, failed } or null
+    const uploadRef = useRef(null);
+    const meetingIdRef = useRef(meetingId);
+    meetingIdRef.current = meetingId;
+
+    const uploadChunk = async (upload, index, blob) => {
+        // Upload stopped working earlier → keep the rest locally
+        if (upload.failed) {
+            chunksRef.current.push(blob);
+            return;
+        }
+
+        const buffer = await blob.arrayBuffer();
+        const checksum = await sha256Hex(buffer);
+
+        for (let attempt = 0; ; attempt++) {
+            try {
+                // Re-sending a chunk the server already has is a no-op, so retries are safe
+                await api.put(`/recordings/${upload.id}/chunks/${index}`, buffer, {
+                    headers: { 'Content-Type': 'application/octet-stream', 'X-Chunk-SHA256': checksum }
+                });
+                return;
+            } catch (err) {
+                const status = err.response?.status;
+                // Network/server errors are retried; anything else means the upload can't continue
+                if (status && status < 500 && status !== 429) {
+                    console.error('Recording upload failed, keeping the rest locally:', err);
+                    upload.failed = true;
+                    chunksRef.current.push(blob);
+                    return;
+                }
+                await new Promise(resolve => setTimeout(resolve, Math.min(MAX_RETRY_DELAY_MS, 1000 * 2 ** attempt)));
+            }
+        }
+    };
 
     const startRecording = useCallback(async (existingStream = null) => {
         if (mediaRecorderRef.current && mediaRecorderRef.current.state !== 'inactive') return;
@@ -44,26 +111,31 @@ const useScreenRecorder = () => {
             mediaRecorderRef.current = mediaRecorder;
             chunksRef.current = [];
 
+            // Start a server-side recording (needs crypto.subtle → https or localhost)
+            let upload = null;
+            if (meetingIdRef.current && window.crypto?.subtle) {
+                try {
+                    const res = await api.post('/recordings/', { meeting_id: meetingIdRef.current });
+                    upload = { id: res.data.id, index: 0, queue: Promise.resolve(), failed: false };
+                } catch (err) {
+                    console.warn('Recording upload not available, recording locally:', err);
+                }
+            }
+            uploadRef.current = upload;
+
             mediaRecorder.ondataavailable = (event) => {
-                if (event.data.size > 0) {
+                if (event.data.size === 0) return;
+                if (upload) {
+                    // Upload chunks one after another, in recording order
+                    const index = upload.index++;
+                    const blob = event.data;
+                    upload.queue = upload.queue.then(() => uploadChunk(upload, index, blob));
+                } else {
                     chunksRef.current.push(event.data);
                 }
             };
 
-            mediaRecorder.onstop = () => {
-                const blob = new Blob(chunksRef.current, { type: 'video/webm; codecs=vp8' });
-                const url = URL.createObjectURL(blob);
-                const a = document.createElement('a');
-                a.style.display = 'none';
-                a.href = url;
-                a.download = `meeting-recording-${new Date().toISOString()}.webm`;
-                document.body.appendChild(a);
-                a.click();
-
-                // Cleanup
-                window.URL.revokeObjectURL(url);
-                document.body.removeChild(a);
-
+            mediaRecorder.onstop = async () => {
                 // Stop all tracks to ensure cleanup (even if external, since sharing UI is already gone or ended)
                 stream.getTracks().forEach(track => track.stop());
 
@@ -71,9 +143,29 @@ const useScreenRecorder = () => {
                 setIsRecording(false);
                 clearInterval(timerRef.current);
                 setRecordingTime(0);
+
+                uploadRef.current = null;
+                if (upload) {
+                    // Wait for the last chunks, then close the recording on the server
+                    await upload.queue;
+                    if (!upload.failed) {
+                        try {
+                            await api.post(`/recordings/${upload.id}/complete`);
+                        } catch (err) {
+                            console.error('Could not finish recording upload:', err);
+                        }
+                    }
+                }
+
+                // Anything that couldn't be uploaded is saved as a local file
+                if (chunksRef.current.length > 0) {
+                    downloadChunks(chunksRef.current, upload ? '-unsent-part' : '');
+                    chunksRef.current = [];
+                }
             };
 
-            mediaRecorder.start();
+            // With uploads, hand over a chunk every few seconds instead of one blob at the end
+            mediaRecorder.start(upload ? CHUNK_INTERVAL_MS : undefined);
             setIsRecording(true);
 
             // Start timer
@@ -3,6 +3,8 @@ import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../context/AuthContext';
 // API client for making requests to backend
 import api from '../api/api';
+// Live update stream (course/meeting changes, room occupancy)
+import useLiveUpdates from '../hooks/useLiveUpdates';
 
 const AdminDashboard = () => {
     const navigate = useNavigate();
@@ -15,6 +17,8 @@ const AdminDashboard = () => {
     // Meeting states
     const [meetings, setMeetings] = useState([]);
     const [meetingTitle, setMeetingTitle] = useState('');
+    const [meetingCourseId, setMeetingCourseId] = useState(''); // '' = no course (only in the full meeting list)
+    const [meetingMediaMode, setMeetingMediaMode] = useState('mesh'); // 'mesh', 'sfu' (server relay, for big classes) or 'webinar' (server relay, students watch)
     const [meetingLoading, setMeetingLoading] = useState(false);
     const [copyStatus, setCopyStatus] = useState('');
     const [meetingError, setMeetingError] = useState(''); // Improved error handling
@@ -31,6 +35,12 @@ const AdminDashboard = () => {
     const [showDeleteModal, setShowDeleteModal] = useState(false);
     const [courseToDelete, setCourseToDelete] = useState(null);
 
+    // States for the enrollment modal (students don't enroll themselves)
+    const [rosterCourse, setRosterCourse] = useState(null);  // Course whose roster is open
+    const [roster, setRoster] = useState([]);  // Enrolled users (GET /courses/{id}/enrollments)
+    const [rosterEmail, setRosterEmail] = useState('');  // Email of the user to enroll
+    const [rosterError, setRosterError] = useState('');
+
     // Function to fetch all courses from backend
     const fetchCourses = async () => {
         try {
@@ -64,6 +74,18 @@ const AdminDashboard = () => {
         loadData();
     }, []);
 
+    // Live updates: apply course/meeting changes pushed by the server (no re-fetching)
+    const [occupancy, setOccupancy] = useState({}); // { room_id: { peers, waiting } }
+    useLiveUpdates({
+        'course-created': (course) => setCourses(prev => prev.some(c => c.id === course.id) ? prev : [...prev, course]),
+        'course-updated': (course) => setCourses(prev => prev.map(c => c.id === course.id ? course : c)),
+        'course-deleted': ({ id }) => setCourses(prev => prev.filter(c => c.id !== id)),
+        'meeting-created': (meeting) => setMeetings(prev => prev.some(m => m.id === meeting.id) ? prev : [...prev, meeting]),
+        'meeting-deleted': ({ id }) => setMeetings(prev => prev.filter(m => m.id !== id)),
+        'occupancy': (rooms) => setOccupancy(rooms),
+        'resync': () => { fetchCourses(); fetchMeetings(); }
+    });
+
     // Handle meeting creation
     const handleCreateMeeting = async (e) => {
         e.preventDefault();
@@ -73,8 +95,16 @@ const AdminDashboard = () => {
         setMeetingError('');
         setMeetingSuccess('');
         try {
-            await api.post('/meetings/', { title: meetingTitle });
+            const isWebinar = meetingMediaMode === 'webinar';
+            await api.post('/meetings/', {
+                title: meetingTitle,
+                media_mode: isWebinar ? 'sfu' : meetingMediaMode,
+                room_mode: isWebinar ? 'webinar' : 'meeting',
+                course_id: meetingCourseId ? Number(meetingCourseId) : null
+            });
             setMeetingTitle('');
+            setMeetingMediaMode('mesh');
+            setMeetingCourseId('');
             setMeetingSuccess('Meeting link generated successfully!');
             alert('Meeting link generated successfully!');
             setTimeout(() => setMeetingSuccess(''), 5000); // Clear after 5 seconds
@@ -176,6 +206,47 @@ const AdminDashboard = () => {
         }
     };
 
+    // Open the enrollment modal and load the course roster
+    const handleOpenRoster = async (course) => {
+        setRosterCourse(course);
+        setRoster([]);
+        setRosterEmail('');
+        setRosterError('');
+        try {
+            const response = await api.get(`/courses/${course.id}/enrollments`);
+            setRoster(response.data);
+        } catch (err) {
+            setRosterError(err.response?.data?.detail || 'Failed to load enrollments.');
+        }
+    };
+
+    // Enroll a user in the open course by email
+    const handleAddEnrollment = async (e) => {
+        e.preventDefault();
+        setRosterError('');
+        setSubmitting(true);
+        try {
+            const response = await api.post(`/courses/${rosterCourse.id}/enrollments`, { email: rosterEmail });
+            setRoster(prev => [...prev, response.data]);
+            setRosterEmail('');
+        } catch (err) {
+            setRosterError(err.response?.data?.detail || 'Failed to enroll user.');
+        } finally {
+            setSubmitting(false);
+        }
+    };
+
+    // Remove a user from the open course
+    const handleRemoveEnrollment = async (userId) => {
+        setRosterError('');
+        try {
+            await api.delete(`/courses/${rosterCourse.id}/enrollments/${userId}`);
+            setRoster(prev => prev.filter(u => u.user_id !== userId));
+        } catch (err) {
+            setRosterError(err.response?.data?.detail || 'Failed to remove user.');
+        }
+    };
+
     // Show loading message while fetching initial data
     if (loading) return <div className="loading">Loading dashboard data...</div>;
 
@@ -203,6 +274,27 @@ const AdminDashboard = () => {
                             style={{ flex: 1, padding: '0.5rem', borderRadius: '4px', border: '1px solid #ddd' }}
                             required
                         />
+                        <select
+                            value={meetingCourseId}
+                            onChange={(e) => setMeetingCourseId(e.target.value)}
+                            title="Students enrolled in the course see the meeting on their dashboard"
+                            style={{ padding: '0.5rem', borderRadius: '4px', border: '1px solid #ddd' }}
+                        >
+                            <option value="">No course</option>
+                            {courses.map(course => (
+                                <option key={course.id} value={course.id}>{course.title}</option>
+                            ))}
+                        </select>
+                        <select
+                            value={meetingMediaMode}
+                            onChange={(e) => setMeetingMediaMode(e.target.value)}
+                            title="Server relay sends each camera to the server once (better for large classes)"
+                            style={{ padding: '0.5rem', borderRadius: '4px', border: '1px solid #ddd' }}
+                        >
+                            <option value="mesh">Peer-to-peer</option>
+                            <option value="sfu">Server relay (SFU)</option>
+                            <option value="webinar">Webinar (students watch)</option>
+                        </select>
                         <button type="submit" className="btn-primary" disabled={meetingLoading}>
                             {meetingLoading ? 'Creating...' : 'Create Meeting'}
                         </button>
@@ -238,6 +330,7 @@ const AdminDashboard = () => {
                                         <td>
                                             <div className="action-btns">
                                                 <button className="btn-edit" onClick={() => handleOpenModal(course)}>Edit</button>
+                                                <button className="btn-edit" onClick={() => handleOpenRoster(course)}>Students</button>
                                                 <button className="btn-delete" onClick={() => handleDeleteClick(course)}>Delete</button>
                                             </div>
                                         </td>
@@ -271,7 +364,7 @@ const AdminDashboard = () => {
                             <tbody>
                                 {meetings.map(meeting => (
                                     <tr key={meeting.id}>
-                                        <td>{meeting.title}</td>
+                                        <td>{meeting.title}{occupancy[meeting.room_id] && <span style={{ color: '#059669', fontSize: '0.8125rem', fontWeight: 600 }}> · {occupancy[meeting.room_id].peers} live</span>}</td>
                                         <td>
                                             <code style={{ background: '#f3f4f6', padding: '0.2rem 0.4rem', borderRadius: '4px' }}>
                                                 {meeting.room_id}
@@ -355,6 +448,63 @@ const AdminDashboard = () => {
                 </div>
             )}
 
+            {/* Modal for Course Enrollments */}
+            {rosterCourse && (
+                <div className="modal-overlay">
+                    <div className="modal-content">
+                        <h2>Students of {rosterCourse.title}</h2>
+                        {rosterError && <div className="error-message">{rosterError}</div>}
+                        <form onSubmit={handleAddEnrollment}>
+                            <div className="form-group">
+                                <label>Enroll by Email</label>
+                                <input
+                                    type="email"
+                                    value={rosterEmail}
+                                    onChange={(e) => setRosterEmail(e.target.value)}
+                                    placeholder="student@example.com"
+                                    required
+                                />
+                            </div>
+                            <div className="modal-actions">
+                                <button type="submit" className="btn-primary" disabled={submitting}>
+                                    {submitting ? 'Enrolling...' : 'Enroll'}
+                                </button>
+                            </div>
+                        </form>
+                        <div className="table-responsive" style={{ margin: '1.5rem 0' }}>
+                            <table className="admin-table">
+                                <thead>
+                                    <tr>
+                                        <th>Email</th>
+                                        <th>Role</th>
+                                        <th>Action</th>
+                                    </tr>
+                                </thead>
+                                <tbody>
+                                    {roster.map(user => (
+                                        <tr key={user.user_id}>
+                                            <td>{user.email}</td>
+                                            <td>{user.role}</td>
+                                            <td>
+                                                <button className="btn-delete" onClick={() => handleRemoveEnrollment(user.user_id)}>Remove</button>
+                                            </td>
+                                        </tr>
+                                    ))}
+                                    {roster.length === 0 && (
+                                        <tr>
+                                            <td colSpan="3" className="text-center">No one is enrolled yet.</td>
+                                        </tr>
+                                    )}
+                                </tbody>
+                            </table>
+                        </div>
+                        <div className="modal-actions">
+                            <button type="button" className="btn-secondary" onClick={() => setRosterCourse(null)}>Close</button>
+                        </div>
+                    </div>
+                </div>
+            )}
+
             {/* Modal for Delete Confirmation */}
             {showDeleteModal && (
                 <div className="modal-overlay">
@@ -41,7 +41,11 @@ const Login = () => {
             navigate(from, { replace: true });
         } catch (err) {
             // Show error message if login fails
-            setError('Invalid email or password. Please try again.');
+            // 429 = too many failed logins, 503 = server busy: show the server's message
+            const status = err.response?.status;
+            setError(status === 429 || status === 503
+                ? err.response.data.detail
+                : 'Invalid email or password. Please try again.');
         } finally {
             setLoading(false);  // Hide loading state
         }
@@ -6,6 +6,9 @@ import useScreenRecorder from '../hooks/useScreenRecorder';
 import { Mic, MicOff, Video, VideoOff, Circle, Square, PhoneOff, Users, MonitorUp, Hand, X, MessageSquare, Send, Image as ImageIcon, Upload, Settings, Check, XCircle, CheckCircle, ShieldAlert } from 'lucide-react';
 import { BackgroundProcessor } from '../utils/BackgroundProcessor';
 
+// Key of the single server connection in peerConnections (SFU meetings)
+const SFU_PEER_ID = '__sfu__';
+
 
 
 
@@ -136,7 +139,8 @@ const MeetingRoom = () => {
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState('');
 
-    const { isRecording, recordingTime, recordingStream, formatTime, startRecording, stopRecording } = useScreenRecorder();
+    // Recordings are uploaded to the server while recording (linked to this meeting)
+    const { isRecording, recordingTime, recordingStream, formatTime, startRecording, stopRecording } = useScreenRecorder(meeting?.id);
 
     // Refs for non-reactive state
     const socket = useRef(null);
@@ -148,6 +152,15 @@ const MeetingRoom = () => {
     const audioContextRef = useRef(null);
     const analysersRef = useRef({}); // { peerId: { analyser, dataArray } }
     const speakerTimeoutRef = useRef(null);
+    const resumeTokenRef = useRef(null); // Lets us rejoin without the waiting room after a server restart
+    const reconnectAttemptsRef = useRef(0); // Remaining reconnect attempts (server restart or network drop)
+    const leavingRef = useRef(false); // True once we leave on purpose (no auto-reconnect)
+    const mediaModeRef = useRef('mesh'); // 'mesh' or 'sfu' (one connection to the server that forwards media)
+    const sfuTracksRef = useRef({}); // SFU: { mid: { publisher, kind } } sent by the server
+    const sfuStreamsRef = useRef({}); // SFU: { publisher: MediaStream } built from the server's tracks
+    const videoPriorityRef = useRef(null); // Participant IDs that send video (from the server's "stream-priority")
+    const isViewerRef = useRef(false); // Webinar attendee: receives the stage from the server, sends nothing
+    const levelReportRef = useRef({ speaking: false, at: 0 }); // Last audio level sent to the server
 
     // Reactive state for UI
     const [peers, setPeers] = useState([]); // Array of peer objects { id, stream }
@@ -157,6 +170,9 @@ const MeetingRoom = () => {
     const [isScreenSharing, setIsScreenSharing] = useState(false);
     const [activePresenterId, setActivePresenterId] = useState(null); // ID of the participant currently sharing screen
     const [activeSpeakerId, setActiveSpeakerId] = useState(null); // ID of the current active speaker
+    const [videoPriority, setVideoPriority] = useState(null); // IDs that send video; everyone else is audio-only
+    const [isViewer, setIsViewer] = useState(false); // Webinar attendee (watch only, can raise a hand)
+    const [audienceCount, setAudienceCount] = useState(null); // Webinar viewers (null = not a webinar)
     const [participantNames, setParticipantNames] = useState({}); // UUID -> Name mapping
     const [mutedPeers, setMutedPeers] = useState({}); // UUID -> boolean mapping
     const [cameraOffPeers, setCameraOffPeers] = useState({}); // UUID -> boolean mapping
@@ -198,6 +214,7 @@ const MeetingRoom = () => {
         if (analysersRef.current[remotePeerId]) {
             delete analysersRef.current[remotePeerId];
         }
+        delete sfuStreamsRef.current[remotePeerId];
         setPeers(prev => prev.filter(p => p.id !== remotePeerId));
     };
 
@@ -212,6 +229,7 @@ const MeetingRoom = () => {
         }
 
         // Close socket
+        leavingRef.current = true;
         if (socket.current) {
             socket.current.close();
         }
@@ -269,6 +287,7 @@ const MeetingRoom = () => {
                 setLoading(true);
                 const response = await api.get(`/meetings/room/${room_id}`);
                 setMeeting(response.data);
+                mediaModeRef.current = response.data.media_mode || 'mesh';
 
                 // Get local media
                 const stream = await navigator.mediaDevices.getUserMedia({ video: true, audio: true });
@@ -337,6 +356,9 @@ const MeetingRoom = () => {
                 }
                 const average = sum / dataArray.length;
 
+                // Tell the server how loud we are (it picks who sends video for the whole room)
+                if (peerId === 'local') reportAudioLevel(average);
+
                 if (average > maxVolume && average > VOLUME_THRESHOLD) {
                     // Check if it's the local user and they are muted
                     if (peerId === 'local' && isMuted) return;
@@ -370,7 +392,9 @@ const MeetingRoom = () => {
         const socketUrl = `${wsBaseUrl}/ws/${roomId}`;
 
         console.log(`Connecting to signaling server at: ${socketUrl}`);
-        socket.current = new WebSocket(socketUrl);
+        // The server checks our JWT before accepting the connection
+        const token = encodeURIComponent(localStorage.getItem('token') || '');
+        socket.current = new WebSocket(`${socketUrl}?token=${token}`);
 
         socket.current.onopen = () => {
             console.log('Signaling WebSocket connection opened');
@@ -382,6 +406,7 @@ const MeetingRoom = () => {
 
             switch (type) {
                 case 'init':
+                    reconnectAttemptsRef.current = 0;
                     myPeerId.current = peer_id;
                     console.log('Temporary Peer ID:', peer_id);
                     const email = authUser?.email || '';
@@ -397,7 +422,8 @@ const MeetingRoom = () => {
                         roomId: room_id,
                         userId: stableUserId,
                         username: localStorage.getItem('username') || 'Guest',
-                        role: role
+                        role: role,
+                        resumeToken: resumeTokenRef.current
                     }));
                     break;
                 case 'participants':
@@ -434,8 +460,37 @@ const MeetingRoom = () => {
                     setJoinRequests(prev => prev.filter(r => r.userId !== sender_id));
                     setToast(prev => (prev?.targetUserId === sender_id ? null : prev));
 
-                    // Initiate offer to the new participant
-                    createPeerConnection(sender_id, true);
+                    // Initiate offer to the new participant (SFU: the server forwards their media instead)
+                    if (mediaModeRef.current !== 'sfu') createPeerConnection(sender_id, true);
+                    break;
+                case 'joins':
+                    // Several participants admitted at once (batch approval)
+                    console.log('New participants joined:', data.users);
+                    data.users.forEach(u => {
+                        setJoinRequests(prev => prev.filter(r => r.userId !== u.sender_id));
+                        setToast(prev => (prev?.targetUserId === u.sender_id ? null : prev));
+                        if (mediaModeRef.current !== 'sfu') createPeerConnection(u.sender_id, true);
+                    });
+                    break;
+                case 'sfu-answer':
+                    // Server answered our SFU offer
+                    sfuTracksRef.current = data.tracks || {};
+                    await peerConnections.current[SFU_PEER_ID]?.setRemoteDescription({ type: 'answer', sdp: data.sdp });
+                    syncSfuStreams();
+                    break;
+                case 'sfu-offer':
+                    // Server added tracks for new participants
+                    sfuTracksRef.current = data.tracks || {};
+                    handleSfuOffer(data.sdp);
+                    break;
+                case 'sfu-tracks':
+                    // Same connection, but tracks now belong to other participants (or left)
+                    sfuTracksRef.current = data.tracks || {};
+                    syncSfuStreams();
+                    break;
+                case 'sfu-closed':
+                    // Server dropped our media connection → start a new one
+                    if (!leavingRef.current) setTimeout(() => startSfu(), 2000);
                     break;
                 case 'offer':
                     console.log('Received WebRTC offer from:', sender_id);
@@ -458,6 +513,12 @@ const MeetingRoom = () => {
 
                     removePeer(sender_id);
                     break;
+                case 'stream-priority':
+                    // Who sends video (presenter, active speaker, recent speakers)
+                    videoPriorityRef.current = data.video;
+                    setVideoPriority(data.video);
+                    Object.values(peerConnections.current).forEach(pc => applySendPriority(pc));
+                    break;
                 case 'screen-share':
                     console.log('Screen share update from:', sender_id, data.isSharing);
                     setActivePresenterId(data.isSharing ? sender_id : null);
@@ -497,6 +558,7 @@ const MeetingRoom = () => {
                     setChatMessages(data.history);
                     break;
                 case 'kicked':
+                    leavingRef.current = true;
                     if (data.reason === 'session-replaced') {
                         console.warn('Session replaced by another tab. Cleaning up media...');
                         cleanupAllSessions();
@@ -533,16 +595,87 @@ const MeetingRoom = () => {
                     break;
                 case 'join-approved':
                     console.log('Join approved!');
+                    resumeTokenRef.current = data.resumeToken || resumeTokenRef.current;
                     setIsWaiting(false);
                     // Now that we are approved, we can initialize WebRTC by being notified of participants
+                    if (mediaModeRef.current === 'sfu' && !peerConnections.current[SFU_PEER_ID]) startSfu();
                     break;
                 case 'join-rejected':
                     console.log('Join rejected');
                     setIsRejected(true);
                     break;
+                case 'resume-token':
+                    // Used to re-attach quickly if our connection drops
+                    resumeTokenRef.current = data.resumeToken;
+                    // Joined directly (no waiting room) → connect our media to the server
+                    if (mediaModeRef.current === 'sfu' && !peerConnections.current[SFU_PEER_ID]) startSfu();
+                    break;
+                case 'resumed':
+                    // Reconnected to our old slot; missed messages follow right after this
+                    console.log(`Session resumed (${data.missed} missed messages)`);
+                    resumeTokenRef.current = data.resumeToken;
+                    break;
+                case 'reconnect':
+                    // Server is restarting: media keeps flowing, we reconnect once the socket closes
+                    console.log('Server asked us to reconnect:', data.reason);
+                    resumeTokenRef.current = data.resumeToken;
+                    reconnectAttemptsRef.current = 10;
+                    break;
                 case 'waiting-users-list':
                     console.log('Received waiting users list:', data.users);
-                    setJoinRequests(data.users);
+                    // Keep raised hands of webinar viewers
+                    setJoinRequests(prev => [...data.users, ...prev.filter(r => r.viewer)]);
+                    break;
+                case 'webinar-viewer':
+                    // Webinar: we watch the stage through the server (no waiting room, no mesh)
+                    isViewerRef.current = true;
+                    setIsViewer(true);
+                    if (!peerConnections.current[SFU_PEER_ID]) startSfu();
+                    break;
+                case 'audience':
+                    // Webinar: who is on stage and how many watch (sent at most every few seconds)
+                    setAudienceCount(data.viewers);
+                    setActivePresenterId(data.presenter);
+                    data.stage.forEach(u => {
+                        peerNamesRef.current[u.userId] = u.username;
+                    });
+                    setParticipantNames(Object.fromEntries(data.stage.map(u => [u.userId, u.username])));
+                    break;
+                case 'promoted':
+                    // A host brought us on stage → send our camera/mic from now on
+                    resumeTokenRef.current = data.resumeToken || resumeTokenRef.current;
+                    isViewerRef.current = false;
+                    setIsViewer(false);
+                    setIsHandRaised(false);
+                    startSfu();
+                    setToast({ message: 'You are on stage now', id: Date.now() });
+                    setTimeout(() => setToast(null), 4000);
+                    break;
+                case 'demoted':
+                    // Back in the audience → receive only
+                    isViewerRef.current = true;
+                    setIsViewer(true);
+                    setIsHandRaised(false);
+                    startSfu();
+                    setToast({ message: 'You are back in the audience', id: Date.now() });
+                    setTimeout(() => setToast(null), 4000);
+                    break;
+                case 'viewer-hand':
+                    // Webinar viewer wants to speak (hosts can invite them to the stage)
+                    if (!data.isRaised) {
+                        setJoinRequests(prev => prev.filter(r => r.userId !== data.userId));
+                        break;
+                    }
+                    setJoinRequests(prev => {
+                        if (prev.find(r => r.userId === data.userId)) return prev;
+                        return [...prev, { userId: data.userId, username: data.username, viewer: true }];
+                    });
+                    setToast({
+                        message: `${data.username} raised their hand ✋`,
+                        id: Date.now(),
+                        type: 'join-request',
+                        targetUserId: data.userId
+                    });
                     break;
                 default:
                     break;
@@ -551,14 +684,58 @@ const MeetingRoom = () => {
 
         socket.current.onclose = () => {
             console.log('Signaling WebSocket closed');
+            // Connection dropped unexpectedly → try to resume our session
+            if (reconnectAttemptsRef.current === 0 && resumeTokenRef.current && !leavingRef.current) {
+                reconnectAttemptsRef.current = 10;
+            }
+            // Reconnect (with our resume token) after a drop or while the server restarts
+            if (reconnectAttemptsRef.current > 0) {
+                reconnectAttemptsRef.current -= 1;
+                setTimeout(() => setupSignaling(roomId, stream), 2000);
+            }
         };
 
         socket.current.onerror = (err) => {
             console.error('Signaling WebSocket error:', err);
-            setError('Lost connection to signaling server.');
+            if (reconnectAttemptsRef.current === 0) {
+                setError('Lost connection to signaling server.');
+            }
         };
     };
 
+    // =====================================
+    // STREAM PRIORITY: only the presenter, active speaker and recent speakers send video
+    // =====================================
+
+    const reportAudioLevel = (average) => {
+        // Sent when we start/stop speaking, and every 500ms while speaking (for loudness)
+        const micOn = localStreamRef.current?.getAudioTracks()[0]?.enabled;
+        const level = micOn ? average / 255 : 0;
+        const speaking = level >= 0.12;
+        const now = Date.now();
+        const last = levelReportRef.current;
+        if (speaking === last.speaking && (!speaking || now - last.at < 500)) return;
+        levelReportRef.current = { speaking, at: now };
+        if (socket.current?.readyState === WebSocket.OPEN) {
+            socket.current.send(JSON.stringify({ type: 'audio-level', level: Math.round(level * 100) / 100 }));
+        }
+    };
+
+    const applySendPriority = async (pc) => {
+        // Not in the server's list → stop sending our video (audio keeps flowing)
+        const send = !videoPriorityRef.current || videoPriorityRef.current.includes(myPeerId.current);
+        const sender = pc.getSenders().find(s => s.track?.kind === 'video');
+        if (!sender) return;
+        const params = sender.getParameters();
+        if (!params.encodings?.length || params.encodings[0].active === send) return;
+        params.encodings.forEach(encoding => { encoding.active = send; });
+        try {
+            await sender.setParameters(params);
+        } catch (err) {
+            console.error('Could not change video sending:', err);
+        }
+    };
+
     const setupAudioAnalysis = (peerId, stream) => {
         try {
             const audioTrack = stream.getAudioTracks()[0];
@@ -632,6 +809,7 @@ const MeetingRoom = () => {
         // Handle connection state changes for abrupt disconnections
         pc.onconnectionstatechange = () => {
             console.log(`Connection state for ${remotePeerId}:`, pc.connectionState);
+            if (pc.connectionState === 'connected') applySendPriority(pc);
             if (pc.connectionState === 'disconnected' || pc.connectionState === 'failed' || pc.connectionState === 'closed') {
                 removePeer(remotePeerId);
             }
@@ -660,6 +838,118 @@ const MeetingRoom = () => {
         return pc;
     };
 
+    // =====================================
+    // SFU MODE: one connection to the server, which forwards everyone's media
+    // =====================================
+
+    // The server (aiortc) needs all our ICE candidates inside the SDP
+    const waitForIceGathering = (pc) => new Promise(resolve => {
+        if (pc.iceGatheringState === 'complete') return resolve();
+        const timeout = setTimeout(resolve, 3000);
+        pc.addEventListener('icegatheringstatechange', () => {
+            if (pc.iceGatheringState === 'complete') {
+                clearTimeout(timeout);
+                resolve();
+            }
+        });
+    });
+
+    const startSfu = async () => {
+        if (peerConnections.current[SFU_PEER_ID]) {
+            peerConnections.current[SFU_PEER_ID].close();
+        }
+        Object.keys(sfuStreamsRef.current).forEach(publisher => removePeer(publisher));
+        sfuTracksRef.current = {};
+
+        const pc = new RTCPeerConnection(rtcConfig);
+        peerConnections.current[SFU_PEER_ID] = pc;
+
+        // Our media goes up ONCE (screen share/background swaps use replaceTrack like in mesh mode)
+        // Webinar viewers only receive (the server drops anything they would send)
+        const currentStream = screenStreamRef.current || localStreamRef.current;
+        if (isViewerRef.current) {
+            pc.addTransceiver('audio', { direction: 'recvonly' });
+            pc.addTransceiver('video', { direction: 'recvonly' });
+        } else if (currentStream) {
+            currentStream.getTracks().forEach(track => pc.addTrack(track, currentStream));
+        }
+
+        pc.ontrack = () => syncSfuStreams();
+
+        pc.onconnectionstatechange = () => {
+            console.log('SFU connection state:', pc.connectionState);
+            if (pc.connectionState === 'connected') applySendPriority(pc);
+            if (pc.connectionState === 'failed' && peerConnections.current[SFU_PEER_ID] === pc && !leavingRef.current) {
+                setTimeout(() => startSfu(), 2000);
+            }
+        };
+
+        try {
+            const offer = await pc.createOffer();
+            await pc.setLocalDescription(offer);
+            await waitForIceGathering(pc);
+            if (socket.current?.readyState === WebSocket.OPEN) {
+                socket.current.send(JSON.stringify({ type: 'sfu-offer', sdp: pc.localDescription.sdp }));
+            }
+        } catch (err) {
+            console.error('SFU offer error:', err);
+        }
+    };
+
+    const handleSfuOffer = async (sdp) => {
+        const pc = peerConnections.current[SFU_PEER_ID];
+        if (!pc) return;
+        try {
+            await pc.setRemoteDescription({ type: 'offer', sdp });
+            const answer = await pc.createAnswer();
+            await pc.setLocalDescription(answer);
+            await waitForIceGathering(pc);
+            if (socket.current?.readyState === WebSocket.OPEN) {
+                socket.current.send(JSON.stringify({ type: 'sfu-answer', sdp: pc.localDescription.sdp }));
+            }
+            syncSfuStreams();
+        } catch (err) {
+            console.error('Error handling SFU offer:', err);
+        }
+    };
+
+    // Build one MediaStream per participant from the server's { mid → publisher } map
+    const syncSfuStreams = () => {
+        const pc = peerConnections.current[SFU_PEER_ID];
+        if (!pc) return;
+
+        const tracksByPublisher = {};
+        pc.getTransceivers().forEach(transceiver => {
+            const info = transceiver.mid && sfuTracksRef.current[transceiver.mid];
+            if (info) {
+                (tracksByPublisher[info.publisher] = tracksByPublisher[info.publisher] || []).push(transceiver.receiver.track);
+            }
+        });
+
+        Object.entries(tracksByPublisher).forEach(([publisher, tracks]) => {
+            const existing = sfuStreamsRef.current[publisher];
+            const unchanged = existing && existing.getTracks().length === tracks.length && tracks.every(t => existing.getTracks().includes(t));
+            if (unchanged) return;
+
+            const stream = new MediaStream(tracks);
+            sfuStreamsRef.current[publisher] = stream;
+            if (stream.getAudioTracks().length > 0) {
+                setupAudioAnalysis(publisher, stream);
+            }
+            setPeers(prev => {
+                if (prev.some(p => p.id === publisher)) {
+                    return prev.map(p => p.id === publisher ? { ...p, stream } : p);
+                }
+                return [...prev, { id: publisher, stream }];
+            });
+        });
+
+        // Participants whose tracks are gone
+        Object.keys(sfuStreamsRef.current).forEach(publisher => {
+            if (!tracksByPublisher[publisher]) removePeer(publisher);
+        });
+    };
+
     const handleOffer = async (remotePeerId, offer) => {
         const pc = createPeerConnection(remotePeerId, false);
         try {
@@ -738,6 +1028,18 @@ const MeetingRoom = () => {
         }
     };
 
+    // Webinar: send a speaker back to the audience
+    const handleDemoteSpeaker = (targetUserId) => {
+        if (myRole !== 'admin') return;
+
+        if (socket.current?.readyState === WebSocket.OPEN) {
+            socket.current.send(JSON.stringify({
+                type: 'demote-speaker',
+                targetUserId
+            }));
+        }
+    };
+
     const handleRemoveParticipant = (targetUserId) => {
         if (myRole !== 'admin') return;
 
@@ -839,10 +1141,11 @@ const MeetingRoom = () => {
         }
     };
 
-    const approveUser = (targetUserId) => {
+    const approveUser = (targetUserId, viewer = false) => {
         if (socket.current?.readyState === WebSocket.OPEN) {
             socket.current.send(JSON.stringify({
-                type: 'approve-user',
+                // Webinar viewer with a raised hand → bring them on stage
+                type: viewer ? 'promote-viewer' : 'approve-user',
                 targetUserId
             }));
             setJoinRequests(prev => prev.filter(r => r.userId !== targetUserId));
@@ -850,8 +1153,20 @@ const MeetingRoom = () => {
         }
     };
 
-    const rejectUser = (targetUserId) => {
+    // Approve everyone in the waiting room at once (one roster update on the server)
+    const approveAllUsers = () => {
         if (socket.current?.readyState === WebSocket.OPEN) {
+            socket.current.send(JSON.stringify({
+                type: 'approve-all'
+            }));
+            setJoinRequests(prev => prev.filter(r => r.viewer));
+            setToast(prev => (prev?.type === 'join-request' ? null : prev));
+        }
+    };
+
+    const rejectUser = (targetUserId, viewer = false) => {
+        // Webinar viewer's raised hand is just dismissed (they keep watching)
+        if (!viewer && socket.current?.readyState === WebSocket.OPEN) {
             socket.current.send(JSON.stringify({
                 type: 'reject-user',
                 targetUserId
@@ -1130,7 +1445,10 @@ const MeetingRoom = () => {
         );
     }
 
-    const totalParticipants = peers.length + 1;
+    // Webinar viewers are not on stage → no local tile
+    const totalParticipants = peers.length + (isViewer ? 0 : 1);
+    // Participants outside the server's video list only send audio → show their avatar
+    const isAudioOnly = (peerId) => videoPriority !== null && !videoPriority.includes(peerId);
     let gridCols, gridRows;
     if (totalParticipants === 1) {
         gridCols = '1fr';
@@ -1161,6 +1479,11 @@ const MeetingRoom = () => {
                         <Users size={16} />
                         {totalParticipants} Online
                     </div>
+                    {audienceCount !== null && (
+                        <div style={{ display: 'flex', alignItems: 'center', gap: '0.6rem', background: '#eef2ff', color: '#4338ca', padding: '0.5rem 1rem', borderRadius: '30px', fontSize: '0.875rem', fontWeight: '600', border: '1px solid #e0e7ff' }}>
+                            {audienceCount} Watching
+                        </div>
+                    )}
                     {myRole === 'admin' && joinRequests.length > 0 && (
                         <button
                             onClick={() => setShowJoinRequests(!showJoinRequests)}
@@ -1179,7 +1502,14 @@ const MeetingRoom = () => {
                 <div style={{ position: 'fixed', top: '100px', right: '2.5rem', width: '320px', background: '#fff', borderRadius: '24px', boxShadow: '0 20px 25px -5px rgba(0,0,0,0.1), 0 10px 10px -5px rgba(0,0,0,0.04)', border: '1px solid #e5e7eb', zIndex: 100, overflow: 'hidden', animation: 'popIn 0.3s cubic-bezier(0.175, 0.885, 0.32, 1.275)' }}>
                     <div style={{ padding: '1.25rem', borderBottom: '1px solid #f3f4f6', display: 'flex', justifyContent: 'space-between', alignItems: 'center', background: '#fff' }}>
                         <h3 style={{ margin: 0, fontSize: '1rem', fontWeight: '700', color: '#111827' }}>Pending Requests</h3>
-                        <button onClick={() => setShowJoinRequests(false)} style={{ background: 'none', border: 'none', cursor: 'pointer', color: '#9ca3af' }}><X size={20} /></button>
+                        <div style={{ display: 'flex', alignItems: 'center', gap: '0.5rem' }}>
+                            {joinRequests.length > 1 && (
+                                <button onClick={approveAllUsers} style={{ background: '#10b981', color: '#fff', border: 'none', padding: '0.4rem 0.75rem', borderRadius: '10px', cursor: 'pointer', fontWeight: '600', fontSize: '0.8rem' }}>
+                                    Approve all
+                                </button>
+                            )}
+                            <button onClick={() => setShowJoinRequests(false)} style={{ background: 'none', border: 'none', cursor: 'pointer', color: '#9ca3af' }}><X size={20} /></button>
+                        </div>
                     </div>
                     <div style={{ maxHeight: '400px', overflowY: 'auto', padding: '0.75rem' }}>
                         {joinRequests.length === 0 ? (
@@ -1192,11 +1522,11 @@ const MeetingRoom = () => {
                                         <div style={{ fontWeight: '600', color: '#111827' }}>{request.username}</div>
                                     </div>
                                     <div style={{ display: 'flex', gap: '0.5rem' }}>
-                                        <button onClick={() => approveUser(request.userId)} style={{ flex: 1, background: '#10b981', color: '#fff', border: 'none', padding: '0.6rem', borderRadius: '10px', cursor: 'pointer', fontWeight: '600', display: 'flex', alignItems: 'center', justifyContent: 'center', gap: '0.5rem' }}>
-                                            <Check size={16} /> Approve
+                                        <button onClick={() => approveUser(request.userId, request.viewer)} style={{ flex: 1, background: '#10b981', color: '#fff', border: 'none', padding: '0.6rem', borderRadius: '10px', cursor: 'pointer', fontWeight: '600', display: 'flex', alignItems: 'center', justifyContent: 'center', gap: '0.5rem' }}>
+                                            <Check size={16} /> {request.viewer ? 'Invite to stage' : 'Approve'}
                                         </button>
-                                        <button onClick={() => rejectUser(request.userId)} style={{ flex: 1, background: '#ef4444', color: '#fff', border: 'none', padding: '0.6rem', borderRadius: '10px', cursor: 'pointer', fontWeight: '600', display: 'flex', alignItems: 'center', justifyContent: 'center', gap: '0.5rem' }}>
-                                            <X size={16} /> Reject
+                                        <button onClick={() => rejectUser(request.userId, request.viewer)} style={{ flex: 1, background: '#ef4444', color: '#fff', border: 'none', padding: '0.6rem', borderRadius: '10px', cursor: 'pointer', fontWeight: '600', display: 'flex', alignItems: 'center', justifyContent: 'center', gap: '0.5rem' }}>
+                                            <X size={16} /> {request.viewer ? 'Dismiss' : 'Reject'}
                                         </button>
                                     </div>
                                 </div>
@@ -1290,8 +1620,8 @@ const MeetingRoom = () => {
                                 padding: '1rem',
                                 overflowY: 'auto'
                             }}>
-                                {/* Local Video as Thumbnail (if not presenting) */}
-                                {activePresenterId !== myPeerId.current && (
+                                {/* Local Video as Thumbnail (if not presenting or watching a webinar) */}
+                                {activePresenterId !== myPeerId.current && !isViewer && (
                                     <VideoTile
                                         peerId="local"
                                         stream={localStream}
@@ -1314,7 +1644,7 @@ const MeetingRoom = () => {
                                             stream={peer.stream}
                                             username={participantNames[peer.id] || 'Guest'}
                                             isMuted={mutedPeers[peer.id] || false}
-                                            isVideoDisabled={cameraOffPeers[peer.id]}
+                                            isVideoDisabled={cameraOffPeers[peer.id] || isAudioOnly(peer.id)}
                                             isHandRaised={raisedHands[peer.id]}
                                             isLocal={false}
                                             isActiveSpeaker={activeSpeakerId === peer.id}
@@ -1337,8 +1667,8 @@ const MeetingRoom = () => {
                             alignItems: 'center',
                             overflow: 'hidden'
                         }}>
-                            {/* Local Participant */}
-                            <VideoTile
+                            {/* Local Participant (webinar viewers are not on stage) */}
+                            {!isViewer && <VideoTile
                                 peerId="local"
                                 stream={localStream}
                                 username={localStorage.getItem('username') || 'You'}
@@ -1350,7 +1680,7 @@ const MeetingRoom = () => {
                                 transform={isScreenSharing ? 'none' : 'scaleX(-1)'}
                                 maxWidth={totalParticipants === 1 ? '960px' : '100%'}
                                 totalParticipants={totalParticipants}
-                            />
+                            />}
 
                             {/* Remote Participants */}
                             {peers.map(peer => (
@@ -1360,7 +1690,7 @@ const MeetingRoom = () => {
                                     stream={peer.stream}
                                     username={participantNames[peer.id] || 'Guest'}
                                     isMuted={mutedPeers[peer.id] || false}
-                                    isVideoDisabled={cameraOffPeers[peer.id]}
+                                    isVideoDisabled={cameraOffPeers[peer.id] || isAudioOnly(peer.id)}
                                     isHandRaised={raisedHands[peer.id]}
                                     isLocal={false}
                                     isActiveSpeaker={activeSpeakerId === peer.id}
@@ -1441,6 +1771,15 @@ const MeetingRoom = () => {
                                         {activePresenterId === peer.id && <MonitorUp size={14} color="#3b82f6" />}
                                         {mutedPeers[peer.id] ? <MicOff size={14} color="#ef4444" /> : <Mic size={14} color="#10b981" />}
 
+                                        {myRole === 'admin' && audienceCount !== null && (
+                                            <button
+                                                onClick={() => handleDemoteSpeaker(peer.id)}
+                                                title="Send back to the audience"
+                                                style={{ background: '#e0e7ff', border: 'none', color: '#4338ca', fontSize: '0.7rem', fontWeight: '600', padding: '4px 8px', borderRadius: '6px', cursor: 'pointer' }}
+                                            >
+                                                Audience
+                                            </button>
+                                        )}
                                         {myRole === 'admin' && (
                                             <button
                                                 onClick={() => handleRemoveParticipant(peer.id)}
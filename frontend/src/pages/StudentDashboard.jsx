@@ -1,23 +1,27 @@
 import React, { useState, useEffect } from 'react';
 // API client for making requests to backend
 import api from '../api/api';
+// Live update stream (course/meeting changes, room occupancy)
+import useLiveUpdates from '../hooks/useLiveUpdates';
 
 import { useNavigate } from 'react-router-dom';
 
 const StudentDashboard = () => {
     const navigate = useNavigate();
-    // State for courses list
+    // Courses the student is enrolled in (GET /users/me/courses)
     const [courses, setCourses] = useState([]);
+    // Whole catalog, only loaded when the student browses it
+    const [catalog, setCatalog] = useState(null);
     const [loading, setLoading] = useState(true);  // Loading state while fetching
     const [error, setError] = useState('');  // Error messages
 
-    // Meeting states
+    // Meetings of the enrolled courses (GET /users/me/meetings, newest first)
     const [meetings, setMeetings] = useState([]);
 
-    // Function to fetch all courses from backend
+    // Function to fetch the enrolled courses from backend
     const fetchCourses = async () => {
         try {
-            const response = await api.get('/courses/');
+            const response = await api.get('/users/me/courses');
             setCourses(response.data);
         } catch (err) {
             setError('Failed to fetch courses. Please try again.');
@@ -25,10 +29,10 @@ const StudentDashboard = () => {
         }
     };
 
-    // Function to fetch all meetings from backend
+    // Function to fetch the meetings of the enrolled courses from backend
     const fetchMeetings = async () => {
         try {
-            const response = await api.get('/meetings/');
+            const response = await api.get('/users/me/meetings');
             setMeetings(response.data);
         } catch (err) {
             console.error('Failed to fetch meetings:', err);
@@ -36,6 +40,17 @@ const StudentDashboard = () => {
         }
     };
 
+    // Function to fetch all courses (catalog) from backend
+    const fetchCatalog = async () => {
+        try {
+            const response = await api.get('/courses/');
+            setCatalog(response.data);
+        } catch (err) {
+            setError('Failed to fetch the course catalog. Please try again.');
+            console.error(err);
+        }
+    };
+
     // Fetch data when component first loads
     useEffect(() => {
         const loadData = async () => {
@@ -46,6 +61,31 @@ const StudentDashboard = () => {
         loadData();
     }, []);
 
+    // Live updates: apply course/meeting changes pushed by the server (no re-fetching)
+    // The stream carries every change; keep only what concerns the enrolled courses
+    const [occupancy, setOccupancy] = useState({}); // { room_id: { peers } } (students only get head counts)
+    useLiveUpdates({
+        'course-created': (course) => setCatalog(prev => prev && !prev.some(c => c.id === course.id) ? [...prev, course] : prev),
+        'course-updated': (course) => {
+            setCourses(prev => prev.map(c => c.id === course.id ? course : c));
+            setCatalog(prev => prev && prev.map(c => c.id === course.id ? course : c));
+            setMeetings(prev => prev.map(m => m.course_id === course.id ? { ...m, course_title: course.title } : m));
+        },
+        'course-deleted': ({ id }) => {
+            setCourses(prev => prev.filter(c => c.id !== id));
+            setCatalog(prev => prev && prev.filter(c => c.id !== id));
+            setMeetings(prev => prev.filter(m => m.course_id !== id));
+        },
+        'meeting-created': (meeting) => {
+            const course = courses.find(c => c.id === meeting.course_id);
+            if (!course) return;
+            setMeetings(prev => prev.some(m => m.id === meeting.id) ? prev : [{ ...meeting, course_title: course.title }, ...prev]);
+        },
+        'meeting-deleted': ({ id }) => setMeetings(prev => prev.filter(m => m.id !== id)),
+        'occupancy': (rooms) => setOccupancy(rooms),
+        'resync': () => { fetchCourses(); fetchMeetings(); if (catalog) fetchCatalog(); }
+    });
+
     // Handle join meeting
     const handleJoinMeeting = (roomId) => {
         navigate(`/meeting/${roomId}`);
@@ -57,7 +97,7 @@ const StudentDashboard = () => {
             <header className="dashboard-header">
                 <div>
                     <h1>Student Dashboard</h1>
-                    <p className="text-muted">Browse and explore available courses</p>
+                    <p className="text-muted">Your courses and their meetings</p>
                 </div>
             </header>
 
@@ -79,7 +119,8 @@ const StudentDashboard = () => {
                                 <div key={meeting.id} className="stat-card" style={{ borderLeft: '4px solid #10b981', background: '#ecfdf5' }}>
                                     <div style={{ display: 'flex', justifyContent: 'space-between', alignItems: 'center' }}>
                                         <div>
-                                            <h3 style={{ margin: 0 }}>{meeting.title}</h3>
+                                            <p className="text-muted" style={{ fontSize: '0.75rem', margin: 0 }}>{meeting.course_title}</p>
+                                            <h3 style={{ margin: 0 }}>{meeting.title}{occupancy[meeting.room_id] && <span style={{ color: '#059669', fontSize: '0.8125rem', fontWeight: 600 }}> · {occupancy[meeting.room_id].peers} live</span>}</h3>
                                             <p className="text-muted" style={{ fontSize: '0.8125rem', marginBottom: '0.25rem' }}>
                                                 ID: <code style={{ color: '#059669' }}>{meeting.room_id}</code>
                                             </p>
@@ -98,7 +139,7 @@ const StudentDashboard = () => {
                             ))}
                             {meetings.length === 0 && (
                                 <div className="text-center" style={{ gridColumn: '1 / -1', padding: '1rem', background: '#f9fafb', borderRadius: '8px' }}>
-                                    <p className="text-muted">No live meetings at the moment.</p>
+                                    <p className="text-muted">No meetings in your courses at the moment.</p>
                                 </div>
                             )}
                         </>
@@ -106,9 +147,9 @@ const StudentDashboard = () => {
                 </div>
             </div>
 
-            {/* Display courses section */}
-            <div className="course-list-section">
-                <h2>Available Courses</h2>
+            {/* Enrolled courses section */}
+            <div className="course-list-section" style={{ marginBottom: '2.5rem' }}>
+                <h2>My Courses</h2>
                 <div className="course-grid">
                     {loading ? (
                         [1, 2, 3].map(i => (
@@ -122,19 +163,43 @@ const StudentDashboard = () => {
                                     <p>{course.description || "No description available for this course."}</p>
                                     <div className="course-footer">
                                         <span className="course-id">ID: {course.id}</span>
-                                        <button className="btn-edit" onClick={() => alert('Enrollment feature coming soon!')}>View Details</button>
                                     </div>
                                 </div>
                             ))}
                             {courses.length === 0 && (
                                 <div className="text-center" style={{ gridColumn: '1 / -1', padding: '3rem' }}>
-                                    <p className="text-muted">No courses are currently available.</p>
+                                    <p className="text-muted">You are not enrolled in any course yet. A tutor or admin enrolls you in a course.</p>
                                 </div>
                             )}
                         </>
                     )}
                 </div>
             </div>
+
+            {/* Course catalog (loaded on demand, read only: tutors and admins manage enrollments) */}
+            <div className="course-list-section">
+                <h2>Course Catalog</h2>
+                {catalog === null ? (
+                    <button className="btn-secondary" onClick={fetchCatalog}>Browse all courses</button>
+                ) : (
+                    <div className="course-grid">
+                        {catalog.filter(course => !courses.some(c => c.id === course.id)).map(course => (
+                            <div key={course.id} className="stat-card course-card">
+                                <h3>{course.title}</h3>
+                                <p>{course.description || "No description available for this course."}</p>
+                                <div className="course-footer">
+                                    <span className="course-id">ID: {course.id}</span>
+                                </div>
+                            </div>
+                        ))}
+                        {catalog.every(course => courses.some(c => c.id === course.id)) && (
+                            <div className="text-center" style={{ gridColumn: '1 / -1', padding: '3rem' }}>
+                                <p className="text-muted">No other courses are available.</p>
+                            </div>
+                        )}
+                    </div>
+                )}
+            </div>
         </div>
     );
 };
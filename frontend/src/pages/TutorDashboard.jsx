@@ -1,6 +1,8 @@
 import React, { useState, useEffect } from 'react';
 // API client for making requests to backend
 import api from '../api/api';
+// Live update stream (course/meeting changes, room occupancy)
+import useLiveUpdates from '../hooks/useLiveUpdates';
 
 import { useNavigate } from 'react-router-dom';
 
@@ -53,6 +55,18 @@ const TutorDashboard = () => {
         loadData();
     }, []);
 
+    // Live updates: apply course/meeting changes pushed by the server (no re-fetching)
+    const [occupancy, setOccupancy] = useState({}); // { room_id: { peers, waiting } }
+    useLiveUpdates({
+        'course-created': (course) => setCourses(prev => prev.some(c => c.id === course.id) ? prev : [...prev, course]),
+        'course-updated': (course) => setCourses(prev => prev.map(c => c.id === course.id ? course : c)),
+        'course-deleted': ({ id }) => setCourses(prev => prev.filter(c => c.id !== id)),
+        'meeting-created': (meeting) => setMeetings(prev => prev.some(m => m.id === meeting.id) ? prev : [...prev, meeting]),
+        'meeting-deleted': ({ id }) => setMeetings(prev => prev.filter(m => m.id !== id)),
+        'occupancy': (rooms) => setOccupancy(rooms),
+        'resync': () => { fetchCourses(); fetchMeetings(); }
+    });
+
     // Handle join meeting
     const handleJoinMeeting = (roomId) => {
         navigate(`/meeting/${roomId}`);
@@ -169,7 +183,7 @@ const TutorDashboard = () => {
                             <tbody>
                                 {meetings.map(meeting => (
                                     <tr key={meeting.id}>
-                                        <td>{meeting.title}</td>
+                                        <td>{meeting.title}{occupancy[meeting.room_id] && <span style={{ color: '#059669', fontSize: '0.8125rem', fontWeight: 600 }}> · {occupancy[meeting.room_id].peers} live</span>}</td>
                                         <td>
                                             <code style={{ background: '#f3f4f6', padding: '0.2rem 0.4rem', borderRadius: '4px' }}>
                                                 {meeting.room_id}
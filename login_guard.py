@@ -0,0 +1,226 @@
+# used to read limits from environment variables
+import os
+
+# used for the sliding windows and cache expiry
+import time
+
+# used so threadpool code and the event loop can share the stores safely
+import threading
+
+# used for the shared (SQLite) stand-in store
+import sqlite3
+
+# used to key the credential cache without keeping passwords in memory
+import hmac
+import hashlib
+import secrets
+
+# used for the in-memory windows and the LRU cache
+from collections import OrderedDict, deque
+
+# counters for throttled / cached logins
+import metrics
+
+
+# =====================================
+# LOGIN THROTTLE SETTINGS
+# =====================================
+
+# Failed logins are counted per client address and per account (email) in a
+# sliding window. Over the limit → 429 before any database or bcrypt work.
+# Successful logins are not counted: a whole class behind one school address
+# can log in at once.
+
+# Turn throttling on/off ("1" = on)
+LOGIN_THROTTLE_ENABLED = os.getenv("LOGIN_THROTTLE_ENABLED", "1") == "1"
+
+# Failures allowed per client address in the window (credential stuffing)
+LOGIN_IP_MAX_FAILURES = int(os.getenv("LOGIN_IP_MAX_FAILURES", "30"))
+LOGIN_IP_WINDOW_SECONDS = float(os.getenv("LOGIN_IP_WINDOW_SECONDS", "60"))
+
+# Failures allowed per account in the window (password guessing), counted for
+# unknown emails too so the answer doesn't tell which accounts exist
+LOGIN_ACCOUNT_MAX_FAILURES = int(os.getenv("LOGIN_ACCOUNT_MAX_FAILURES", "5"))
+LOGIN_ACCOUNT_WINDOW_SECONDS = float(os.getenv("LOGIN_ACCOUNT_WINDOW_SECONDS", "300"))
+
+# Where the windows live:
+#   "memory"             → this worker only (default)
+#   "sqlite:<file path>" → shared by every worker on this machine; a local
+#                          stand-in for a shared store (Redis etc.) with the same interface
+LOGIN_THROTTLE_STORE = os.getenv("LOGIN_THROTTLE_STORE", "memory")
+
+# Successful logins are remembered this long (0 = off), so a page that logs in
+# again and again with the right password doesn't cost a bcrypt verify each time
+LOGIN_CACHE_SECONDS = float(os.getenv("LOGIN_CACHE_SECONDS", "300"))
+LOGIN_CACHE_SIZE = int(os.getenv("LOGIN_CACHE_SIZE", "10000"))
+
+
+# =====================================
+# FAILURE STORES
+# =====================================
+
+# Both stores keep, per key, the times of the recent failures (at most "keep").
+
+class MemoryStore:
+    def __init__(self):
+        # key → deque of failure times (oldest first)
+        self.failures = {}
+        self._lock = threading.Lock()
+        self._added = 0
+
+    def recent(self, key: str, since: float) -> list:
+        with self._lock:
+            times = self.failures.get(key)
+            return [at for at in times if at > since] if times else []
+
+    def add(self, key: str, now: float, keep: int, window: float):
+        with self._lock:
+            times = self.failures.get(key)
+            if times is None:
+                times = self.failures[key] = deque(maxlen=keep)
+            times.append(now)
+            # Now and then drop keys whose failures are all old
+            self._added += 1
+            if self._added % 1000 == 0:
+                self.failures = {k: t for k, t in self.failures.items() if t and t[-1] > now - window}
+
+    def reset(self, key: str):
+        with self._lock:
+            self.failures.pop(key, None)
+
+
+class SQLiteStore:
+    # Same interface, in a SQLite file every worker process opens
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._added = 0
+        with self._connection() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS login_failures (key TEXT NOT NULL, at REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_login_failures_key_at ON login_failures (key, at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread (sqlite3 connections aren't shared across threads)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def recent(self, key: str, since: float) -> list:
+        rows = self._connection().execute(
+            "SELECT at FROM login_failures WHERE key = ? AND at > ? ORDER BY at", (key, since))
+        return [at for (at,) in rows]
+
+    def add(self, key: str, now: float, keep: int, window: float):
+        conn = self._connection()
+        conn.execute("INSERT INTO login_failures (key, at) VALUES (?, ?)", (key, now))
+        self._added += 1
+        if self._added % 1000 == 0:
+            conn.execute("DELETE FROM login_failures WHERE at < ?", (now - window,))
+
+    def reset(self, key: str):
+        self._connection().execute("DELETE FROM login_failures WHERE key = ?", (key,))
+
+
+def _make_store():
+    if LOGIN_THROTTLE_STORE.startswith("sqlite:"):
+        return SQLiteStore(LOGIN_THROTTLE_STORE[len("sqlite:"):])
+    return MemoryStore()
+
+
+# =====================================
+# LOGIN THROTTLE
+# =====================================
+
+class LoginThrottle:
+    def __init__(self, store):
+        self.store = store
+        # kind of key → (max failures, window in seconds)
+        self.limits = {
+            "ip": (LOGIN_IP_MAX_FAILURES, LOGIN_IP_WINDOW_SECONDS),
+            "account": (LOGIN_ACCOUNT_MAX_FAILURES, LOGIN_ACCOUNT_WINDOW_SECONDS),
+        }
+
+    def _keys(self, ip: str, email: str):
+        yield "ip", f"ip:{ip}"
+        yield "account", f"account:{email.strip().lower()}"
+
+    def retry_after(self, ip: str, email: str) -> float:
+        # Seconds until the next attempt is allowed (0 = allowed now)
+        if not LOGIN_THROTTLE_ENABLED:
+            return 0
+        now = time.time()
+        wait = 0
+        for kind, key in self._keys(ip, email):
+            limit, window = self.limits[kind]
+            recent = self.store.recent(key, now - window)
+            if len(recent) >= limit:
+                # Allowed again when the oldest failure that counts leaves the window
+                wait = max(wait, recent[-limit] + window - now)
+                metrics.inc(f"auth.login.throttled.{kind}")
+        return wait
+
+    def failed(self, ip: str, email: str):
+        if not LOGIN_THROTTLE_ENABLED:
+            return
+        now = time.time()
+        for kind, key in self._keys(ip, email):
+            limit, window = self.limits[kind]
+            self.store.add(key, now, limit, window)
+
+    def succeeded(self, email: str):
+        # The right password clears the account's failures (not the address's)
+        if LOGIN_THROTTLE_ENABLED:
+            self.store.reset(f"account:{email.strip().lower()}")
+
+
+# =====================================
+# CREDENTIAL CACHE
+# =====================================
+
+class CredentialCache:
+    # Remembers recent successful logins as HMAC(email, password) with a key that
+    # only lives in this process → stored hash. The password itself is never kept,
+    # and an entry only matches while the user's stored hash is unchanged
+    # (a password change invalidates it).
+
+    def __init__(self):
+        self._key = secrets.token_bytes(32)
+        self.entries = OrderedDict()   # digest → (stored hash, expires at)
+        self._lock = threading.Lock()
+
+    def _digest(self, email: str, password: str) -> bytes:
+        message = email.encode() + b"\0" + password.encode()
+        return hmac.new(self._key, message, hashlib.sha256).digest()
+
+    def check(self, email: str, password: str, stored_hash: str) -> bool:
+        if LOGIN_CACHE_SECONDS <= 0:
+            return False
+        digest = self._digest(email, password)
+        with self._lock:
+            entry = self.entries.get(digest)
+            if entry is None:
+                return False
+            cached_hash, expires = entry
+            if expires < time.monotonic() or not hmac.compare_digest(cached_hash, stored_hash):
+                del self.entries[digest]
+                return False
+            self.entries.move_to_end(digest)
+        metrics.inc("auth.login.cache_hit")
+        return True
+
+    def add(self, email: str, password: str, stored_hash: str):
+        if LOGIN_CACHE_SECONDS <= 0:
+            return
+        digest = self._digest(email, password)
+        with self._lock:
+            self.entries[digest] = (stored_hash, time.monotonic() + LOGIN_CACHE_SECONDS)
+            self.entries.move_to_end(digest)
+            while len(self.entries) > LOGIN_CACHE_SIZE:
+                self.entries.popitem(last=False)
+
+
+# Global instances used by the /auth/login route
+login_throttle = LoginThrottle(_make_store())
+credential_cache = CredentialCache()
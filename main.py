@@ -1,7 +1,10 @@
+import time
+# used to measure cold start (import → ready to serve)
+_process_started = time.perf_counter()
+
 from fastapi import FastAPI, Depends, Request
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
 import os
+import asyncio
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -9,35 +12,45 @@ load_dotenv()
 # FastAPI → main framework
 # Depends → for dependency injection (not heavily used here)
 
-from database import engine, Base, SessionLocal
-# engine → database connection engine
-# Base → base class for all models
-# SessionLocal → used to create DB sessions
+from database import engine, read_router
+# engine → database connection engine (primary)
+# read_router → picks a healthy read replica for read-only endpoints
 
-from models import User, UserRole
-# User → user table model
-# UserRole → roles enum (ADMIN, TUTOR, STUDENT)
+from migrations import current_version, LATEST_VERSION
+# Schema version check (tables are created by python manage.py migrate, not here)
 
-from auth import get_password_hash
-# get_password_hash → hashes plain password before storing in DB
+import metrics as process_metrics
+# process_metrics → counters (cold start is "startup.seconds"); "metrics" is the router below
 
-from routers import auth, users, courses, meetings, signaling
+from routers import auth, users, courses, meetings, signaling, metrics, events, recordings
 # Import all route files (auth routes, user routes, course routes)
 
+from signaling import manager
+# manager → keeps all live meeting rooms (WebSocket connections)
+
+from events import broker
+# broker → pushes live updates (changes, room occupancy) to dashboards
+
+from analytics import attendance_log
+# attendance_log → join/leave events written to the database in batches
+
+from traffic import traffic_recorder
+# traffic_recorder → opt-in log of inbound signaling frames (TRAFFIC_RECORDING=1)
+
 from sqlalchemy.orm import Session
 # DB session type
 
 from fastapi.middleware.cors import CORSMiddleware
 # Middleware that allows frontend to call backend APIs
 
+from compression import CompressionMiddleware, HTTP_COMPRESSION
+# Compresses API responses (gzip/brotli) and tunes WebSocket compression
 
-# =====================================
-# CREATE DATABASE TABLES
-# =====================================
+from static_files import ASSETS_DIR, PrecompressedStaticFiles, load_index_page
+# Serves the built React app (frontend/dist) with compression + cache headers
 
-# This creates all tables in database based on models
-# Example: User table, Course table etc.
-Base.metadata.create_all(bind=engine)
+from server import autoscale_threadpool
+# Sizes the threadpool (database, bcrypt) to the load; server.py also runs the app
 
 
 # =====================================
@@ -63,63 +76,80 @@ app.add_middleware(
 
 
 # =====================================
-# SEED DEMO USERS FUNCTION
+# RESPONSE COMPRESSION
 # =====================================
 
-# This function creates demo users automatically
-# So we can test login without manually adding users
-def seed_users():
+# Compress large JSON responses (meeting lists etc.) with brotli/gzip
+# Can be turned off per deployment with HTTP_COMPRESSION=0
+if HTTP_COMPRESSION:
+    app.add_middleware(CompressionMiddleware)
 
-    # Create DB session
-    db = SessionLocal()
 
-    try:
-        # Demo users list
-        users_to_seed = [
-            {"email": "admin@gmail.com", "password": "adminpassword", "role": UserRole.ADMIN},
-            {"email": "tutor@gmail.com", "password": "tutorpassword", "role": UserRole.TUTOR},
-            {"email": "student@gmail.com", "password": "studentpassword", "role": UserRole.STUDENT},
-        ]
+# =====================================
+# STARTUP EVENT
+# =====================================
 
-        # Loop through demo users
-        for user_data in users_to_seed:
+# This runs automatically when app starts
+# No database writes or password hashing here: every worker runs it, so it must
+# stay cheap (migrations and demo users → python manage.py migrate / seed)
+@app.on_event("startup")
+async def startup_event():
+    # One read: refuse to serve against a database the code doesn't match
+    version = current_version(engine)
+    if version < LATEST_VERSION:
+        raise RuntimeError(
+            f"Database schema is at version {version}, the code needs {LATEST_VERSION}: "
+            "run python manage.py migrate"
+        )
 
-            # Check if user already exists
-            user = db.query(User).filter(User.email == user_data["email"]).first()
+    # Bring back rooms saved by the previous process (see POST /signaling/drain)
+    restored = manager.restore_snapshot()
+    if restored:
+        print(f"Restored {restored} rooms from snapshot")
 
-            if not user:
-                # Create new user with hashed password
-                new_user = User(
-                    email=user_data["email"],
-                    password=get_password_hash(user_data["password"]),
-                    role=user_data["role"]
-                )
+    # Pre-warms rooms of scheduled meetings shortly before they start
+    app.state.room_scheduler = asyncio.create_task(manager.run_scheduler())
 
-                # Add user to DB
-                db.add(new_user)
+    # Pushes live room occupancy to dashboards when it changes
+    app.state.occupancy_task = asyncio.create_task(broker.run_occupancy(manager))
 
-        # Save all users to database
-        db.commit()
+    # Delivers course/meeting events from every worker (only when EVENTS_STORE is shared)
+    app.state.shared_events_task = asyncio.create_task(broker.run_shared_events())
 
-    except Exception as e:
-        # If error happens → print error and rollback
-        print(f"Error seeding users: {e}")
-        db.rollback()
+    # Writes attendance (join/leave) events in batches
+    app.state.attendance_task = asyncio.create_task(attendance_log.run())
 
-    finally:
-        # Always close DB connection
-        db.close()
+    # Writes recorded signaling traffic (only when TRAFFIC_RECORDING=1)
+    app.state.traffic_task = asyncio.create_task(traffic_recorder.run())
 
+    # Grows/shrinks the threadpool used by blocking calls
+    app.state.threadpool_task = asyncio.create_task(autoscale_threadpool())
 
-# =====================================
-# STARTUP EVENT
-# =====================================
+    # Checks the read replicas (only when DATABASE_REPLICA_URLS is set)
+    app.state.replica_task = asyncio.create_task(read_router.run_health_checks())
 
-# This runs automatically when app starts
-# It will create demo users
-@app.on_event("startup")
-async def startup_event():
-    seed_users()
+    # Cold start of this worker: interpreter importing main.py → ready to serve
+    startup_seconds = time.perf_counter() - _process_started
+    process_metrics.inc("startup.seconds", startup_seconds)
+    print(f"Worker ready in {startup_seconds * 1000:.0f} ms")
+
+
+# This runs when the app stops → stop the background scheduler
+# If nobody called /signaling/drain, still save what is left (chat, presenter)
+@app.on_event("shutdown")
+async def shutdown_event():
+    app.state.room_scheduler.cancel()
+    app.state.occupancy_task.cancel()
+    app.state.shared_events_task.cancel()
+    app.state.attendance_task.cancel()
+    app.state.traffic_task.cancel()
+    app.state.threadpool_task.cancel()
+    app.state.replica_task.cancel()
+    # Write the attendance events that are still waiting
+    await attendance_log.flush()
+    await traffic_recorder.flush()
+    if not manager.draining and manager.rooms:
+        manager.save_snapshot()
 
 
 # =====================================
@@ -132,17 +162,21 @@ app.include_router(users.router)    # user routes
 app.include_router(courses.router)  # course routes
 app.include_router(meetings.router) # meeting routes
 app.include_router(signaling.router) # signaling routes (WebSocket)
+app.include_router(signaling.admin_router) # signaling admin routes (drain)
+app.include_router(metrics.router)   # metrics routes (admin only)
+app.include_router(events.router)    # live update stream (SSE)
+app.include_router(recordings.router) # meeting recordings (chunked upload + playback)
 
 # =====================================
 # SERVE FRONTEND (Single Tunnel Support)
 # =====================================
 
-# Get absolute path to the frontend/dist folder
-frontend_dist = os.path.join(os.getcwd(), "frontend", "dist")
+# Paths are resolved once (see static_files.py) and index.html is kept in memory
+index_page = load_index_page()
 
-# Mount assets folder (CSS, JS)
-if os.path.exists(os.path.join(frontend_dist, "assets")):
-    app.mount("/assets", StaticFiles(directory=os.path.join(frontend_dist, "assets")), name="assets")
+# Mount assets folder (CSS, JS) with precompressed .br/.gz files and long cache headers
+if os.path.exists(ASSETS_DIR):
+    app.mount("/assets", PrecompressedStaticFiles(directory=ASSETS_DIR), name="assets")
 
 # Catch-all route to serve the SPA (React handles routing)
 @app.get("/{rest_of_path:path}")
@@ -151,10 +185,9 @@ async def serve_frontend(request: Request, rest_of_path: str):
     if rest_of_path.startswith("api/") or rest_of_path.startswith("ws/"):
         return {"detail": "Not Found"}
     
-    # Serve index.html for all other paths
-    index_path = os.path.join(frontend_dist, "index.html")
-    if os.path.exists(index_path):
-        return FileResponse(index_path)
+    # Serve index.html (from memory, with ETag) for all other paths
+    if index_page is not None:
+        return index_page.response(request)
     return {"error": "Frontend build not found. Please run 'npm run build' in the frontend directory."}
 
 
@@ -165,4 +198,14 @@ async def serve_frontend(request: Request, rest_of_path: str):
 # Simple test endpoint to check API running
 @app.get("/")
 async def root():
-    return {"message": "Welcome to the Course Management System API"}
\ No newline at end of file
+    return {"message": "Welcome to the Course Management System API"}
+
+
+# =====================================
+# RUN WITH: python main.py (same as python server.py)
+# =====================================
+
+if __name__ == "__main__":
+    import server
+
+    server.run()
@@ -0,0 +1,131 @@
+# used to read the command line (migrate / seed / status / replica)
+import argparse
+import sys
+
+# used to copy the SQLite database for a local read replica
+import sqlite3
+
+from dotenv import load_dotenv
+
+# Same settings as the app (.env)
+load_dotenv()
+
+from database import engine, SessionLocal
+# engine → database the commands run against
+# SessionLocal → used to create DB sessions
+
+from migrations import migrate, current_version, LATEST_VERSION, MIGRATIONS
+# Versioned schema changes (see migrations.py)
+
+from models import User, UserRole
+# User → user table model
+# UserRole → roles enum (ADMIN, TUTOR, STUDENT)
+
+from auth import get_password_hash
+# get_password_hash → hashes plain password before storing in DB
+
+
+# =====================================
+# MANAGEMENT COMMANDS
+# =====================================
+
+# Run once per deploy, NOT in every worker:
+#   python manage.py migrate   → bring the database schema up to date
+#   python manage.py seed      → create the demo users (if missing)
+#   python manage.py status    → schema version of the database
+#   python manage.py replica X → copy the (SQLite) database to X, a local read replica
+
+
+def seed_users() -> int:
+    # Creates demo users so we can test login without manually adding users
+    # Returns how many were created
+    db = SessionLocal()
+
+    try:
+        # Demo users list
+        users_to_seed = [
+            {"email": "admin@gmail.com", "password": "adminpassword", "role": UserRole.ADMIN},
+            {"email": "tutor@gmail.com", "password": "tutorpassword", "role": UserRole.TUTOR},
+            {"email": "student@gmail.com", "password": "studentpassword", "role": UserRole.STUDENT},
+        ]
+
+        # One query for all of them (only missing users are hashed)
+        emails = [user_data["email"] for user_data in users_to_seed]
+        existing = {email for (email,) in db.query(User.email).filter(User.email.in_(emails))}
+
+        created = 0
+        for user_data in users_to_seed:
+            if user_data["email"] not in existing:
+                db.add(User(
+                    email=user_data["email"],
+                    password=get_password_hash(user_data["password"]),
+                    role=user_data["role"]
+                ))
+                created += 1
+
+        # Save all users to database
+        db.commit()
+        return created
+
+    except Exception:
+        db.rollback()
+        raise
+
+    finally:
+        # Always close DB connection
+        db.close()
+
+
+def copy_replica(path: str):
+    # Stand-in for replication when developing with SQLite: a consistent copy of
+    # the primary. Run it again to "catch up"; in between the copy lags behind.
+    if engine.url.get_backend_name() != "sqlite":
+        raise SystemExit("replica only copies SQLite databases; use your database's replication")
+    source = sqlite3.connect(engine.url.database)
+    target = sqlite3.connect(path)
+    try:
+        # Online backup: safe while the app is writing
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Course-Era management commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+    migrate_parser = commands.add_parser("migrate", help="apply pending schema migrations")
+    migrate_parser.add_argument("--to", type=int, default=LATEST_VERSION, help="stop at this version")
+    commands.add_parser("seed", help="create the demo users")
+    commands.add_parser("status", help="show the schema version")
+    replica_parser = commands.add_parser("replica", help="copy the SQLite database to a local read replica")
+    replica_parser.add_argument("path", help="file to write, e.g. course_era_replica.db")
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        applied = migrate(engine, args.to)
+        for version, description in applied:
+            print(f"Applied {version}: {description}")
+        print(f"Database is at version {current_version(engine)} (latest {LATEST_VERSION})")
+
+    elif args.command == "seed":
+        if current_version(engine) < LATEST_VERSION:
+            print("Database schema is out of date: run python manage.py migrate first")
+            return 1
+        print(f"Created {seed_users()} demo users")
+
+    elif args.command == "replica":
+        copy_replica(args.path)
+        print(f"Copied {engine.url.database} to {args.path}")
+
+    else:
+        version = current_version(engine)
+        print(f"Database is at version {version} (latest {LATEST_VERSION})")
+        for number, description, _ in MIGRATIONS:
+            if number > version:
+                print(f"  pending {number}: {description}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+# used to measure how long (and how much CPU) something takes
+import time
+
+# used so counters stay correct when updated from worker threads
+import threading
+
+# used to create counters that start at 0 automatically
+from collections import defaultdict
+
+# used to build the "with metrics.timer(...)" helper
+from contextlib import contextmanager
+
+
+# =====================================
+# IN-PROCESS COUNTERS
+# =====================================
+
+# All counters of this worker process
+# Structure:
+# counters = {
+#   "compression.http.gzip.bytes_in": 123456,
+#   "compression.http.gzip.cpu_seconds": 0.42,
+#   ...
+# }
+counters = defaultdict(float)
+
+# Lock so threadpool code (sync endpoints, bcrypt, ...) can update counters safely
+_lock = threading.Lock()
+
+
+def inc(name: str, value: float = 1):
+    # Add a value to a counter (creates it if missing)
+    with _lock:
+        counters[name] += value
+
+
+@contextmanager
+def timer(name: str):
+    # Measure wall time AND CPU time of a block of code
+    # Adds to: "<name>.count", "<name>.seconds", "<name>.cpu_seconds"
+    start_wall = time.perf_counter()
+    start_cpu = time.thread_time()
+    try:
+        yield
+    finally:
+        with _lock:
+            counters[name + ".count"] += 1
+            counters[name + ".seconds"] += time.perf_counter() - start_wall
+            counters[name + ".cpu_seconds"] += time.thread_time() - start_cpu
+
+
+class _Suspend:
+    # Passes what a coroutine waits on (a future, or None = "let others run")
+    # up to the event loop, and the loop's answer back down
+    __slots__ = ("waiting_on",)
+
+    def __init__(self, waiting_on):
+        self.waiting_on = waiting_on
+
+    def __await__(self):
+        return (yield self.waiting_on)
+
+
+async def timed(name: str, coro):
+    # Await a coroutine, adding to the same counters as timer()
+    # "<name>.cpu_seconds" only counts while the coroutine itself runs: thread_time()
+    # on the event loop thread also counts every other task that runs while this one
+    # is suspended, so each step is timed separately (between two awaits)
+    # "<name>.seconds" is wall time, including the time spent suspended
+    start_wall = time.perf_counter()
+    cpu = 0.0
+    value, error = None, None
+    try:
+        while True:
+            start_cpu = time.thread_time()
+            try:
+                waiting_on = coro.send(value) if error is None else coro.throw(error)
+            except StopIteration as done:
+                return done.value
+            finally:
+                cpu += time.thread_time() - start_cpu
+            try:
+                value, error = await _Suspend(waiting_on), None
+            except BaseException as e:
+                # Cancelled (or the awaited future failed) → raise it inside the coroutine
+                value, error = None, e
+    finally:
+        coro.close()
+        with _lock:
+            counters[name + ".count"] += 1
+            counters[name + ".seconds"] += time.perf_counter() - start_wall
+            counters[name + ".cpu_seconds"] += cpu
+
+
+def snapshot(prefix: str = ""):
+    # Return a copy of the counters (optionally only the ones starting with prefix)
+    with _lock:
+        return {name: value for name, value in sorted(counters.items()) if name.startswith(prefix)}
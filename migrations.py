@@ -0,0 +1,200 @@
+# used to build the frozen table definitions of each migration
+from sqlalchemy import (
+    MetaData, Table, Column, Integer, String, DateTime, ForeignKey, Index, UniqueConstraint,
+    inspect, select, text
+)
+from sqlalchemy.schema import CreateColumn
+
+# used for type hinting
+from typing import Callable, List, Tuple
+
+
+# =====================================
+# VERSIONED SCHEMA MIGRATIONS
+# =====================================
+
+# The database schema is changed by numbered migrations run ONCE, out of band:
+#   python manage.py migrate
+# instead of every worker calling create_all() when it imports main.py.
+# The app only reads the version on startup (see main.py) and refuses to start
+# when the database is behind the code.
+#
+# Every migration describes the schema AS IT WAS at that point (its own tables and
+# columns below), never the current models, so old databases upgrade step by step.
+# Steps skip tables/columns that already exist, so a database made by the old
+# create_all() is adopted without changes.
+#
+# Adding a column/table to models.py → append a migration here.
+
+# Stores the version the database is at (one row)
+version_metadata = MetaData()
+schema_version = Table(
+    "schema_version", version_metadata,
+    Column("version", Integer, nullable=False),
+)
+
+
+def _create_table(conn, table: Table):
+    # Table (and its indexes) unless it already exists
+    table.create(conn, checkfirst=True)
+
+
+def _add_column(conn, table_name: str, column: Column):
+    # ALTER TABLE ... ADD COLUMN unless the column already exists
+    if column.name in {c["name"] for c in inspect(conn).get_columns(table_name)}:
+        return
+    # Attach to a throwaway table so the column renders for this database's dialect
+    Table(table_name, MetaData(), column)
+    ddl = CreateColumn(column).compile(dialect=conn.dialect)
+    conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {ddl}"))
+
+
+def _create_index(conn, index: Index):
+    index.create(conn, checkfirst=True)
+
+
+# ---------- 1: users, courses, meetings ----------
+
+def _initial(conn):
+    metadata = MetaData()
+    _create_table(conn, Table(
+        "users", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("email", String, unique=True, index=True, nullable=False),
+        Column("password", String, nullable=False),
+        Column("role", String),
+    ))
+    _create_table(conn, Table(
+        "courses", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("title", String, index=True, nullable=False),
+        Column("description", String, nullable=True),
+    ))
+    _create_table(conn, Table(
+        "meetings", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("title", String, nullable=False),
+        Column("room_id", String, unique=True, index=True, nullable=False),
+        Column("created_by", Integer, ForeignKey("users.id"), nullable=False),
+        Column("created_at", DateTime(timezone=True)),
+    ))
+
+
+# ---------- 2: meeting schedule ----------
+
+def _meeting_schedule(conn):
+    _add_column(conn, "meetings", Column("scheduled_start", DateTime(timezone=True), nullable=True))
+    _add_column(conn, "meetings", Column("scheduled_end", DateTime(timezone=True), nullable=True))
+    meetings = Table("meetings", MetaData(), Column("scheduled_start", DateTime(timezone=True)))
+    _create_index(conn, Index("ix_meetings_scheduled_start", meetings.c.scheduled_start))
+
+
+# ---------- 3: attendance log ----------
+
+def _attendance_events(conn):
+    metadata = MetaData()
+    Table("meetings", metadata, Column("id", Integer, primary_key=True))
+    _create_table(conn, Table(
+        "attendance_events", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("meeting_id", Integer, ForeignKey("meetings.id"), nullable=False),
+        Column("user_email", String, nullable=False),
+        Column("event", String, nullable=False),
+        Column("at", DateTime(timezone=True), nullable=False),
+        Index("ix_attendance_events_meeting_at", "meeting_id", "at"),
+    ))
+
+
+# ---------- 4: chunked recordings ----------
+
+def _recordings(conn):
+    metadata = MetaData()
+    Table("meetings", metadata, Column("id", Integer, primary_key=True))
+    Table("users", metadata, Column("id", Integer, primary_key=True))
+    _create_table(conn, Table(
+        "recordings", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("meeting_id", Integer, ForeignKey("meetings.id"), nullable=False, index=True),
+        Column("created_by", Integer, ForeignKey("users.id"), nullable=False),
+        Column("status", String, nullable=False),
+        Column("size", Integer, nullable=False),
+        Column("chunk_count", Integer, nullable=False),
+        Column("created_at", DateTime(timezone=True)),
+        Column("completed_at", DateTime(timezone=True), nullable=True),
+    ))
+
+
+# ---------- 5: SFU media mode ----------
+
+def _media_mode(conn):
+    _add_column(conn, "meetings", Column("media_mode", String, nullable=False, server_default="mesh"))
+
+
+# ---------- 6: webinar room mode ----------
+
+def _room_mode(conn):
+    _add_column(conn, "meetings", Column("room_mode", String, nullable=False, server_default="meeting"))
+
+
+# ---------- 7: course enrollment ----------
+
+def _enrollments(conn):
+    metadata = MetaData()
+    Table("users", metadata, Column("id", Integer, primary_key=True))
+    Table("courses", metadata, Column("id", Integer, primary_key=True))
+    _create_table(conn, Table(
+        "enrollments", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+        Column("course_id", Integer, ForeignKey("courses.id"), nullable=False),
+        Column("created_at", DateTime(timezone=True)),
+        UniqueConstraint("user_id", "course_id", name="uq_enrollments_user_course"),
+        Index("ix_enrollments_course_user", "course_id", "user_id"),
+    ))
+    _add_column(conn, "meetings", Column("course_id", Integer, nullable=True))
+    meetings = Table("meetings", MetaData(), Column("course_id", Integer), Column("created_at", DateTime(timezone=True)))
+    _create_index(conn, Index("ix_meetings_course_created", meetings.c.course_id, meetings.c.created_at))
+
+
+# (version, description, step) in order; never edit or reorder a released step
+MIGRATIONS: List[Tuple[int, str, Callable]] = [
+    (1, "users, courses and meetings", _initial),
+    (2, "meeting schedule", _meeting_schedule),
+    (3, "attendance log", _attendance_events),
+    (4, "chunked recordings", _recordings),
+    (5, "meeting media mode", _media_mode),
+    (6, "meeting room mode", _room_mode),
+    (7, "course enrollment", _enrollments),
+]
+
+# Version the code expects
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(engine) -> int:
+    # Version the database is at (0 = never migrated); one read, no writes
+    with engine.connect() as conn:
+        if not inspect(conn).has_table("schema_version"):
+            return 0
+        return conn.execute(select(schema_version.c.version)).scalar() or 0
+
+
+def migrate(engine, target: int = LATEST_VERSION) -> List[Tuple[int, str]]:
+    # Run the missing steps up to target, each in its own transaction;
+    # returns the steps that ran
+    applied = []
+    with engine.begin() as conn:
+        version_metadata.create_all(conn)
+        if conn.execute(select(schema_version.c.version)).scalar() is None:
+            conn.execute(schema_version.insert().values(version=0))
+
+    for version, description, step in MIGRATIONS:
+        if version > target:
+            break
+        with engine.begin() as conn:
+            if conn.execute(select(schema_version.c.version)).scalar() >= version:
+                continue
+            step(conn)
+            conn.execute(schema_version.update().values(version=version))
+        applied.append((version, description))
+    return applied
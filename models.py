@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Enum, ForeignKey, DateTime, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 import datetime
 import os
@@ -12,6 +12,9 @@ from database import Base
 import enum
 # enum → used to create role types like admin, tutor, student
 
+# Frontend base URL for meeting links (read ONCE at startup, not per row)
+FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:5173").rstrip("/")
+
 
 # =====================================
 # USER ROLES ENUM
@@ -27,6 +30,22 @@ class UserRole(str, enum.Enum):
     STUDENT = "student"
 
 
+# How media flows in a meeting
+# Mesh → every participant sends to every other participant (default)
+# SFU → every participant sends once to the server, which forwards (see sfu.py)
+class MediaMode(str, enum.Enum):
+    MESH = "mesh"
+    SFU = "sfu"
+
+
+# Who takes part in a meeting
+# Meeting → every admitted participant is on camera (default)
+# Webinar → only hosts and promoted speakers are on stage, students watch (see signaling.py)
+class RoomMode(str, enum.Enum):
+    MEETING = "meeting"
+    WEBINAR = "webinar"
+
+
 # =====================================
 # USER TABLE MODEL
 # =====================================
@@ -50,6 +69,9 @@ class User(Base):
     # Relationship to meetings
     meetings = relationship("Meeting", back_populates="creator")
 
+    # Courses this user is enrolled in
+    enrollments = relationship("Enrollment", back_populates="user")
+
 
 # =====================================
 # COURSE TABLE MODEL
@@ -68,6 +90,36 @@ class Course(Base):
     # Course description (optional)
     description = Column(String, nullable=True)
 
+    # Enrolled users (removed together with the course, see DELETE /courses/{id})
+    enrollments = relationship("Enrollment", back_populates="course")
+
+    # Meetings held for this course
+    meetings = relationship("Meeting", back_populates="course")
+
+
+# =====================================
+# ENROLLMENT TABLE MODEL
+# =====================================
+
+# One row per user per course
+# The per-user feeds (/users/me/courses, /users/me/meetings) start from
+# (user_id, course_id), the course roster from (course_id, user_id)
+class Enrollment(Base):
+    __tablename__ = "enrollments"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    course_id = Column(Integer, ForeignKey("courses.id"), nullable=False)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.datetime.now(datetime.timezone.utc))
+
+    user = relationship("User", back_populates="enrollments")
+    course = relationship("Course", back_populates="enrollments")
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "course_id", name="uq_enrollments_user_course"),
+        Index("ix_enrollments_course_user", "course_id", "user_id"),
+    )
+
 
 # =====================================
 # MEETING TABLE MODEL
@@ -82,11 +134,87 @@ class Meeting(Base):
     created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.datetime.now(datetime.timezone.utc))
 
+    # Optional schedule: the room is pre-warmed shortly before scheduled_start
+    # and its state is kept until scheduled_end (see signaling.py)
+    scheduled_start = Column(DateTime(timezone=True), nullable=True, index=True)
+    scheduled_end = Column(DateTime(timezone=True), nullable=True)
+
+    # "mesh" or "sfu" (see MediaMode)
+    media_mode = Column(String, nullable=False, default=MediaMode.MESH.value)
+
+    # "meeting" or "webinar" (see RoomMode)
+    room_mode = Column(String, nullable=False, default=RoomMode.MEETING.value)
+
+    # Course this meeting belongs to (optional; enrolled users see it in their feed)
+    course_id = Column(Integer, ForeignKey("courses.id"), nullable=True)
+
     # Relationship to user
     creator = relationship("User", back_populates="meetings")
 
+    # Relationship to course
+    course = relationship("Course", back_populates="meetings")
+
+    # The meeting feed reads the meetings of a few courses, newest first
+    __table_args__ = (Index("ix_meetings_course_created", "course_id", "created_at"),)
+
+    # Recordings uploaded during this meeting (rows are deleted with the meeting)
+    recordings = relationship("Recording", back_populates="meeting", cascade="all, delete-orphan")
+
     @property
     def meeting_url(self):
         # Return the absolute frontend join URL using room_id and FRONTEND_URL
-        frontend_url = os.getenv("FRONTEND_URL", "http://localhost:5173").rstrip("/")
-        return f"{frontend_url}/meeting/{self.room_id}"
\ No newline at end of file
+        return build_meeting_url(self.room_id)
+
+
+def build_meeting_url(room_id: str) -> str:
+    # Absolute frontend join URL for a room (also used by the fast list endpoint)
+    return f"{FRONTEND_URL}/meeting/{room_id}"
+
+
+# =====================================
+# ATTENDANCE LOG TABLE MODEL
+# =====================================
+
+# One row per join/leave of an approved participant (written in batches, see analytics.py)
+class AttendanceEvent(Base):
+    __tablename__ = "attendance_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    meeting_id = Column(Integer, ForeignKey("meetings.id"), nullable=False)
+
+    # Stable user ID used by the meeting room (email)
+    user_email = Column(String, nullable=False)
+
+    # "join" or "leave"
+    event = Column(String, nullable=False)
+    at = Column(DateTime(timezone=True), nullable=False)
+
+    # Reports read the events of one meeting in time order
+    __table_args__ = (Index("ix_attendance_events_meeting_at", "meeting_id", "at"),)
+
+
+# =====================================
+# RECORDING TABLE MODEL
+# =====================================
+
+# A meeting recording uploaded in chunks while it is being recorded
+# The video itself is stored on disk (see recordings.py), not in the database
+class Recording(Base):
+    __tablename__ = "recordings"
+
+    id = Column(Integer, primary_key=True, index=True)
+    meeting_id = Column(Integer, ForeignKey("meetings.id"), nullable=False, index=True)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    # "uploading" while chunks are arriving, "complete" after the recorder stopped
+    status = Column(String, nullable=False, default="uploading")
+
+    # Bytes stored so far and number of chunks received (next chunk index)
+    size = Column(Integer, nullable=False, default=0)
+    chunk_count = Column(Integer, nullable=False, default=0)
+
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.datetime.now(datetime.timezone.utc))
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Relationship to meeting
+    meeting = relationship("Meeting", back_populates="recordings")
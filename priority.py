@@ -0,0 +1,111 @@
+# used to read priority settings from environment variables
+import os
+
+# most recent speakers, in speaking order
+from collections import OrderedDict
+
+
+# =====================================
+# STREAM PRIORITY SETTINGS
+# =====================================
+
+# How many participants send video (presenter, active speaker, recent speakers ...)
+# Everyone else is audio-only until they speak
+PRIORITY_VIDEO_SLOTS = int(os.getenv("PRIORITY_VIDEO_SLOTS", "9"))
+
+# Audio level (0..1, reported by the client) from which someone counts as speaking
+SPEAKING_LEVEL = float(os.getenv("SPEAKING_LEVEL", "0.12"))
+
+# Another speaker must be this much louder to take over as active speaker (no flickering)
+SPEAKER_SWITCH_RATIO = float(os.getenv("SPEAKER_SWITCH_RATIO", "1.5"))
+
+# At most one priority update per room every this many seconds
+PRIORITY_MIN_INTERVAL = float(os.getenv("PRIORITY_MIN_INTERVAL", "1.0"))
+
+
+class SpeakerRanking:
+    """
+    Who should be seen in one room: presenter, active speaker, then the people
+    who spoke most recently, then everyone else in join order.
+    Reporting a level is O(1) (O(speakers) when someone starts/stops speaking)
+    and building a hint stops after PRIORITY_VIDEO_SLOTS participants, so a
+    big room never costs more than one pass over its peers per update.
+    """
+
+    __slots__ = ("speaking", "recent", "active", "last_hint", "last_sent", "scheduled")
+
+    def __init__(self):
+        # peer_id → audio level of everyone speaking right now
+        self.speaking = {}
+        # peer_id → None, the latest speaker last
+        self.recent = OrderedDict()
+        # Current active speaker (kept after they stop, until someone else speaks)
+        self.active = None
+        # Last hint sent to the room (unchanged hints are not sent again)
+        self.last_hint = None
+        self.last_sent = 0.0
+        # True while a send is scheduled (see ConnectionManager._schedule_priority)
+        self.scheduled = False
+
+    def report(self, peer_id: str, level: float) -> bool:
+        # New audio level from a participant. Returns True if the ranking may have changed
+        if level >= SPEAKING_LEVEL:
+            started = peer_id not in self.speaking
+            self.speaking[peer_id] = level
+            if started:
+                # Started speaking → first of the recent speakers
+                self.recent[peer_id] = None
+                self.recent.move_to_end(peer_id)
+            return self._pick_active() or started
+
+        # Stopped speaking (or was already quiet)
+        if self.speaking.pop(peer_id, None) is None:
+            return False
+        return self._pick_active()
+
+    def forget(self, peer_id: str):
+        # Participant left the room
+        self.speaking.pop(peer_id, None)
+        self.recent.pop(peer_id, None)
+        if self.active == peer_id:
+            self.active = None
+            self._pick_active()
+
+    def _pick_active(self) -> bool:
+        # Loudest current speaker, but the current one keeps the spot unless clearly beaten
+        if not self.speaking:
+            return False
+        loudest = max(self.speaking, key=self.speaking.get)
+        current = self.speaking.get(self.active)
+        if loudest == self.active or (current is not None and self.speaking[loudest] < current * SPEAKER_SWITCH_RATIO):
+            return False
+        self.active = loudest
+        return True
+
+    def hint(self, presenter, peers: dict) -> dict:
+        # Message for the room: who sends video, who is speaking, who presents
+        video = []
+        chosen = set()
+
+        def add(peer_id):
+            if peer_id is not None and peer_id in peers and peer_id not in chosen:
+                chosen.add(peer_id)
+                video.append(peer_id)
+
+        add(presenter)
+        add(self.active)
+        for peer_id in reversed(self.recent):
+            if len(video) >= PRIORITY_VIDEO_SLOTS:
+                break
+            add(peer_id)
+        for peer_id in peers:
+            if len(video) >= PRIORITY_VIDEO_SLOTS:
+                break
+            add(peer_id)
+
+        return {
+            "type": "stream-priority",
+            "video": video,                 # these participants send video
+            "activeSpeaker": self.active if self.active in peers else None,
+            "presenter": presenter
+        }
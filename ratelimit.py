@@ -0,0 +1,164 @@
+# used to read limits from environment variables
+import os
+import json
+
+# used to refill buckets based on elapsed time
+import time
+
+# counters for how often limits are hit
+import metrics
+
+
+# =====================================
+# RATE LIMIT SETTINGS
+# =====================================
+
+# Limits per message type: (tokens added per second, bucket size = max burst)
+# "default" is used for every type not listed
+DEFAULT_PEER_LIMITS = {
+    "default": (50, 200),
+    "relay": (100, 600),       # WebRTC setup (RELAY_TYPES): offer/answer + ICE candidates per connection
+    "join": (1, 3),
+    "chat-message": (2, 5),
+    "mic-status": (2, 5),
+    "video-status": (2, 5),
+    "raise-hand": (1, 3),
+    "screen-share": (1, 3),
+    "audio-level": (4, 8),     # sent when speaking starts/stops, ~2/s while speaking
+}
+
+# Same idea, but shared by everybody in the room
+DEFAULT_ROOM_LIMITS = {
+    "default": (500, 1000),
+    "chat-message": (20, 40),
+    "raise-hand": (10, 20),
+    "audio-level": (100, 200), # own bucket: speakers must not use up the "default" budget
+}
+
+# WebRTC call setup, sent to one peer (or the server) only → no room bucket,
+# just the per-peer "relay" bucket. Approving a whole waiting room starts
+# hundreds of connections at once, and a dropped offer/answer/candidate
+# breaks that connection for good.
+RELAY_TYPES = {"offer", "answer", "ice-candidate", "sfu-offer", "sfu-answer", "sfu-layer"}
+
+
+def _load_limits(env_name: str, defaults: dict) -> dict:
+    # Override limits with JSON, example: PEER_RATE_LIMITS='{"chat-message": [5, 10]}'
+    limits = dict(defaults)
+    raw = os.getenv(env_name)
+    if raw:
+        for msg_type, (rate, burst) in json.loads(raw).items():
+            limits[msg_type] = (float(rate), float(burst))
+    return limits
+
+
+PEER_LIMITS = _load_limits("PEER_RATE_LIMITS", DEFAULT_PEER_LIMITS)
+ROOM_LIMITS = _load_limits("ROOM_RATE_LIMITS", DEFAULT_ROOM_LIMITS)
+
+# Turn rate limiting on/off ("1" = on)
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") == "1"
+
+# "1" = tell the sender it was throttled, "0" = silently drop extra messages
+RATE_LIMIT_NOTIFY = os.getenv("RATE_LIMIT_NOTIFY", "1") == "1"
+
+# At most one "throttled" notice per bucket every this many seconds
+NOTICE_INTERVAL = 1.0
+
+
+# =====================================
+# TOKEN BUCKET
+# =====================================
+
+class TokenBucket:
+    """
+    Holds up to "capacity" tokens and refills "rate" tokens per second.
+    Each message takes one token; no token left → message is over the limit.
+    """
+
+    __slots__ = ("rate", "capacity", "tokens", "updated", "last_notice")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity       # start full so normal bursts are allowed
+        self.updated = time.monotonic()
+        self.last_notice = 0.0
+
+    def allow(self, now: float) -> bool:
+        # Refill for the time passed since the last message
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def should_notify(self, now: float) -> bool:
+        # Limit the throttle notices too (they are messages as well)
+        if now - self.last_notice >= NOTICE_INTERVAL:
+            self.last_notice = now
+            return True
+        return False
+
+
+# =====================================
+# PER-PEER + PER-ROOM LIMITER
+# =====================================
+
+class RateLimiter:
+    def __init__(self):
+        # connection_id → { limit_key → TokenBucket }
+        self.peer_buckets = {}
+        # room_id → { limit_key → TokenBucket }
+        self.room_buckets = {}
+
+    def _bucket(self, buckets: dict, key: str, limits: dict) -> TokenBucket:
+        bucket = buckets.get(key)
+        if bucket is None:
+            rate, burst = limits[key]
+            bucket = buckets[key] = TokenBucket(rate, burst)
+        return bucket
+
+    def check(self, room_id: str, connection_id: str, msg_type):
+        """
+        Returns (allowed, notify):
+        - allowed → process the message
+        - notify  → message was dropped and the sender should get a "throttled" notice
+        """
+        if not RATE_LIMIT_ENABLED:
+            return True, False
+
+        now = time.monotonic()
+
+        # Unknown types share the "default" bucket (clients can't create new buckets)
+        relay = msg_type in RELAY_TYPES
+        peer_key = "relay" if relay else msg_type if msg_type in PEER_LIMITS else "default"
+        room_key = msg_type if msg_type in ROOM_LIMITS else "default"
+
+        # Check the sender first: one noisy tab shouldn't use up the room budget
+        bucket = self._bucket(self.peer_buckets.setdefault(connection_id, {}), peer_key, PEER_LIMITS)
+        if not bucket.allow(now):
+            metrics.inc(f"ratelimit.peer.{peer_key}.dropped")
+            return False, RATE_LIMIT_NOTIFY and bucket.should_notify(now)
+
+        if relay:
+            return True, False
+
+        bucket = self._bucket(self.room_buckets.setdefault(room_id, {}), room_key, ROOM_LIMITS)
+        if not bucket.allow(now):
+            metrics.inc(f"ratelimit.room.{room_key}.dropped")
+            return False, RATE_LIMIT_NOTIFY and bucket.should_notify(now)
+
+        return True, False
+
+    def forget_connection(self, connection_id: str):
+        # Free memory when a WebSocket closes
+        self.peer_buckets.pop(connection_id, None)
+
+    def forget_room(self, room_id: str):
+        # Free memory when a room is deleted
+        self.room_buckets.pop(room_id, None)
+
+
+# Global limiter used by the signaling WebSocket route
+rate_limiter = RateLimiter()
@@ -0,0 +1,108 @@
+# used to read storage settings from environment variables
+import os
+
+# used to check every uploaded chunk (SHA-256)
+import hashlib
+
+# one upload lock per recording (chunks must be appended in order)
+import asyncio
+from contextlib import asynccontextmanager
+
+# run blocking file I/O without freezing the event loop
+from starlette.concurrency import run_in_threadpool
+
+
+# =====================================
+# RECORDING STORAGE SETTINGS
+# =====================================
+
+# Folder where recordings are stored (one .webm file per recording)
+RECORDINGS_DIR = os.getenv("RECORDINGS_DIR", "recordings")
+
+# Largest accepted chunk (MediaRecorder sends a few MB every few seconds)
+RECORDING_MAX_CHUNK_BYTES = int(os.getenv("RECORDING_MAX_CHUNK_BYTES", str(32 * 1024 * 1024)))
+
+# What the browser recorder produces (see useScreenRecorder.js)
+RECORDING_MEDIA_TYPE = "video/webm"
+
+
+class ChunkTooLarge(Exception):
+    pass
+
+
+def recording_path(recording_id: int) -> str:
+    return os.path.join(RECORDINGS_DIR, f"{recording_id}.webm")
+
+
+def create_recording_file(recording_id: int):
+    # Empty file that chunks are appended to
+    os.makedirs(RECORDINGS_DIR, exist_ok=True)
+    open(recording_path(recording_id), "wb").close()
+
+
+def delete_recording_file(recording_id: int):
+    try:
+        os.remove(recording_path(recording_id))
+    except FileNotFoundError:
+        pass
+
+
+# Uploads of the same recording wait for each other
+# upload_locks = { recording_id: [asyncio.Lock, requests using it] }
+# An entry only exists while requests use it, so abandoned uploads, errors and
+# deleted recordings (also with their meeting) leave nothing behind
+upload_locks = {}
+
+
+@asynccontextmanager
+async def upload_lock(recording_id: int):
+    entry = upload_locks.setdefault(recording_id, [asyncio.Lock(), 0])
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            yield
+    finally:
+        entry[1] -= 1
+        if entry[1] == 0:
+            del upload_locks[recording_id]
+
+
+# =====================================
+# STREAMING CHUNK WRITE
+# =====================================
+
+async def write_chunk(recording_id: int, offset: int, body) -> tuple:
+    """
+    Write a request body to the recording file at "offset" while it arrives
+    (pieces of ~64KB, never the whole chunk in memory) and hash it on the way.
+    Returns (bytes written, SHA-256 hex). On any error the file is cut back to "offset".
+    """
+    digest = hashlib.sha256()
+    written = 0
+    f = await run_in_threadpool(open, recording_path(recording_id), "r+b")
+    try:
+        # Drop leftovers of an earlier upload that failed halfway
+        f.truncate(offset)
+        f.seek(offset)
+        async for piece in body:
+            if not piece:
+                continue
+            written += len(piece)
+            if written > RECORDING_MAX_CHUNK_BYTES:
+                raise ChunkTooLarge()
+            digest.update(piece)
+            await run_in_threadpool(f.write, piece)
+        await run_in_threadpool(f.flush)
+    except BaseException:
+        # Client disconnected, chunk too big ... → nothing of this chunk is kept
+        f.truncate(offset)
+        f.close()
+        raise
+    f.close()
+    return written, digest.hexdigest()
+
+
+def truncate_recording(recording_id: int, size: int):
+    # Remove a chunk that failed its checksum
+    with open(recording_path(recording_id), "r+b") as f:
+        f.truncate(size)
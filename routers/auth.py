@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 # APIRouter → used to group related routes (like auth routes)
 # Depends → lets FastAPI automatically provide things (like DB connection)
 # HTTPException → used to throw errors
+# Request → client address for login throttling
 # status → contains standard HTTP status codes (401, 200, etc.)
 
+import math
+# math → Retry-After is a whole number of seconds
+
 from fastapi.security import OAuth2PasswordRequestForm
 # Standard login form that accepts username and password
 # Here we are using the "username" field to send email
@@ -11,8 +15,8 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 # Database session type (used to talk to the database)
 
-from datetime import timedelta
-# Used to calculate time (we’ll use it for token expiry)
+from starlette.concurrency import run_in_threadpool
+# run_in_threadpool → the login query runs in a worker thread (login is async for bcrypt)
 
 from database import get_db
 # Function that gives us a database connection
@@ -20,13 +24,26 @@ from database import get_db
 from models import User
 # User table model (represents uslisteners in the database)
 
-from auth import verify_password, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from auth import (
+    verify_password, dummy_verify_password, run_bcrypt, BcryptBusy,
+    create_tokens, user_for_refresh
+)
 # verify_password → checks if password is correct
-# create_access_token → creates a JWT token
-# ACCESS_TOKEN_EXPIRE_MINUTES → defines how long the token is valid
+# dummy_verify_password → same cost for unknown emails
+# run_bcrypt / BcryptBusy → bcrypt runs in its own bounded pool
+# create_tokens → short-lived access token + refresh token
+# user_for_refresh → checks a refresh token (no password needed)
+
+from schemas import Token, RefreshRequest
+# Token → structure of the response (what the API will return)
+# RefreshRequest → body of POST /auth/refresh
+
+from login_guard import login_throttle, credential_cache
+# login_throttle → too many failed logins per address / account → 429
+# credential_cache → recent successful logins skip bcrypt
 
-from schemas import Token
-# Defines the structure of the response (what the API will return)
+import metrics
+# metrics → login outcomes ("auth.login.*")
 
 
 # Create a router for authentication-related APIs
@@ -36,19 +53,57 @@ router = APIRouter(
 )
 
 
+def find_user(db: Session, email: str):
+    user = db.query(User).filter(User.email == email).first()
+    # Give the connection back before waiting for bcrypt (the session isn't used again)
+    db.close()
+    return user
+
+
 # Login endpoint → user logs in and receives a JWT token
 @router.post("/login", response_model=Token)
 async def login_for_access_token(
+    request: Request,  # Client address (for throttling)
     form_data: OAuth2PasswordRequestForm = Depends(),  # Gets username + password from request
     db: Session = Depends(get_db)  # Automatically gets database connection
 ):
+    client_ip = request.client.host if request.client else ""
+
+    # Too many recent failures from this address or for this account → stop here
+    # (no database query, no bcrypt)
+    retry_after = login_throttle.retry_after(client_ip, form_data.username)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Too many failed logins. Try again in {math.ceil(retry_after)} seconds.",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
 
     # Look for the user in the database using email
-    # (form_data.username is being used as email)
-    user = db.query(User).filter(User.email == form_data.username).first()
+    # (form_data.username is being used as email; in the threadpool, not on the event loop)
+    user = await run_in_threadpool(find_user, db, form_data.username)
+
+    if user and credential_cache.check(form_data.username, form_data.password, user.password):
+        # Same email + password logged in recently (and the password hasn't changed)
+        password_ok = True
+    else:
+        try:
+            if user:
+                password_ok = await run_bcrypt(verify_password, form_data.password, user.password)
+            else:
+                # Unknown email: spend the same time as a wrong password
+                password_ok = await run_bcrypt(dummy_verify_password)
+        except BcryptBusy:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many logins at the moment. Please try again.",
+                headers={"Retry-After": "1"},
+            )
 
     # If user does not exist OR password is incorrect
-    if not user or not verify_password(form_data.password, user.password):
+    if not password_ok:
+        login_throttle.failed(client_ip, form_data.username)
+        metrics.inc("auth.login.failed")
         # Return 401 Unauthorized error
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -56,20 +111,31 @@ async def login_for_access_token(
             headers={"WWW-Authenticate": "Bearer"},  # Indicates token-based authentication
         )
 
-    # Set how long the token will be valid (example: 30 minutes)
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-
-    # Create the JWT token
-    access_token = create_access_token(
-        data={
-            "sub": user.email,  # Store user email inside token
-            "role": user.role   # Store user role inside token (admin/user)
-        },
-        expires_delta=access_token_expires
-    )
-
-    # Return the token to the frontend
-    return {
-        "access_token": access_token,  # The generated JWT token
-        "token_type": "bearer"         # Token type (Bearer authentication)
-    }
\ No newline at end of file
+    login_throttle.succeeded(form_data.username)
+    credential_cache.add(form_data.username, form_data.password, user.password)
+    metrics.inc("auth.login.ok")
+
+    # Short-lived access token (id + role inside → no user lookup per request)
+    # and a refresh token to get the next one without the password
+    return create_tokens(user)
+
+
+# Refresh endpoint → new access token (and refresh token) without the password
+# The frontend calls it shortly before the access token expires, so long
+# lectures never hit the login page (no bcrypt in the middle of class)
+@router.post("/refresh", response_model=Token)
+def refresh_access_token(
+    body: RefreshRequest,
+    db: Session = Depends(get_db)
+):
+    # One primary-key lookup: the user still exists and the password is unchanged
+    user = user_for_refresh(body.refresh_token, db)
+    if user is None:
+        metrics.inc("auth.refresh.failed")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    metrics.inc("auth.refresh.ok")
+    return create_tokens(user)
@@ -7,23 +7,37 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 # Session → used to communicate with the database
 
+from sqlalchemy.exc import IntegrityError
+# IntegrityError → the (user, course) pair is unique; enrolling a user twice is refused
+
 from typing import List
 # List → used for type hinting when returning multiple items
 
-from database import get_db
-# Function that gives us a database connection
+from database import get_db, get_read_db
+# get_db → database connection (primary, for writes)
+# get_read_db → read-only connection (a replica when configured)
 
-from models import User, Course, UserRole
+from models import User, Course, Enrollment, Meeting, UserRole
 # User → user table model
 # Course → course table model
+# Enrollment → which users take which course
+# Meeting → meetings of a course are unlinked when it is deleted
 # UserRole → enum that defines roles (ADMIN, TUTOR, STUDENT)
 
 from auth import check_role
 # check_role → function that checks if logged-in user has required role
 
-from schemas import Course as CourseSchema, CourseCreate
+from schemas import Course as CourseSchema, CourseCreate, EnrollmentCreate, EnrollmentResponse
 # CourseSchema → response format for returning course data
 # CourseCreate → format for creating/updating course data
+# EnrollmentCreate / EnrollmentResponse → enrolling a user by email / course roster
+
+from serializers import json_response, rows_to_dicts
+# json_response → fast JSON encoding for big lists (skips Pydantic validation)
+# rows_to_dicts → turns column-only query rows into dicts
+
+from events import broker
+# broker → pushes changes to open dashboards (live updates)
 
 
 # Create a router for course-related endpoints
@@ -37,7 +51,7 @@ router = APIRouter(
 # CREATE COURSE (ADMIN ONLY)
 # ===========================
 @router.post("/", response_model=CourseSchema, status_code=status.HTTP_201_CREATED)
-async def create_course(
+def create_course(
     course: CourseCreate,  # Incoming data from request body (title + description)
     db: Session = Depends(get_db),  # Get database connection automatically
     admin_user: User = Depends(check_role([UserRole.ADMIN]))  # Only ADMIN can access
@@ -58,6 +72,9 @@ async def create_course(
     # Refresh object to get auto-generated fields (like ID)
     db.refresh(db_course)
 
+    # Tell open dashboards about the new course
+    broker.publish("course-created", CourseSchema.model_validate(db_course).model_dump(mode="json"))
+
     # Return the newly created course
     return db_course
 
@@ -66,8 +83,8 @@ async def create_course(
 # GET ALL COURSES
 # ===========================
 @router.get("/", response_model=List[CourseSchema])
-async def read_all_courses(
-    db: Session = Depends(get_db),  # Get DB connection
+def read_all_courses(
+    db: Session = Depends(get_read_db),  # Get DB connection
     admin_user: User = Depends(
         check_role([UserRole.ADMIN, UserRole.TUTOR, UserRole.STUDENT])
     )  # All logged-in users can view
@@ -76,15 +93,17 @@ async def read_all_courses(
     View all courses (All authenticated users can access).
     """
 
-    # Fetch and return all courses from database
-    return db.query(Course).all()
+    # Fetch only the needed columns and encode them directly
+    # Output has the same format as CourseSchema
+    rows = db.query(Course.title, Course.description, Course.id).all()
+    return json_response(rows_to_dicts(rows, ["title", "description", "id"]))
 
 
 # ===========================
 # UPDATE COURSE
 # ===========================
 @router.put("/{course_id}", response_model=CourseSchema)
-async def update_course(
+def update_course(
     course_id: int,  # Course ID from URL
     course_update: CourseCreate,  # New data coming from request body
     db: Session = Depends(get_db),  # DB connection
@@ -113,6 +132,9 @@ async def update_course(
     # Refresh to get updated values
     db.refresh(db_course)
 
+    # Tell open dashboards about the change
+    broker.publish("course-updated", CourseSchema.model_validate(db_course).model_dump(mode="json"))
+
     # Return updated course
     return db_course
 
@@ -121,7 +143,7 @@ async def update_course(
 # DELETE COURSE (ADMIN ONLY)
 # ===========================
 @router.delete("/{course_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_course(
+def delete_course(
     course_id: int,  # Course ID from URL
     db: Session = Depends(get_db),  # DB connection
     admin_user: User = Depends(check_role([UserRole.ADMIN]))  # Only ADMIN can delete
@@ -140,6 +162,10 @@ async def delete_course(
     # Print message for debugging (optional)
     print(f"Deleting course with ID: {course_id}")
 
+    # Remove its enrollments and unlink its meetings (one statement each)
+    db.query(Enrollment).filter(Enrollment.course_id == course_id).delete()
+    db.query(Meeting).filter(Meeting.course_id == course_id).update({Meeting.course_id: None})
+
     # Remove the course from database
     db.delete(db_course)
 
@@ -149,5 +175,94 @@ async def delete_course(
     # Print confirmation (optional debug)
     print(f"Course {course_id} deleted successfully")
 
+    # Tell open dashboards to remove it
+    broker.publish("course-deleted", {"id": course_id})
+
     # 204 means success but no response body
-    return None
\ No newline at end of file
+    return None
+
+
+# ===========================
+# ENROLLMENT
+# ===========================
+
+def get_course_or_404(course_id: int, db: Session):
+    if db.query(Course.id).filter(Course.id == course_id).first() is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+
+
+def enroll(db: Session, user_id: int, course_id: int) -> bool:
+    # Adds the enrollment; False when the user was already enrolled
+    db.add(Enrollment(user_id=user_id, course_id=course_id))
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return False
+    return True
+
+
+# Enroll a user (by email): students don't enroll themselves,
+# a course's roster is managed by admins and tutors
+@router.post("/{course_id}/enrollments", response_model=EnrollmentResponse, status_code=status.HTTP_201_CREATED)
+def add_enrollment(
+    course_id: int,
+    enrollment: EnrollmentCreate,
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(check_role([UserRole.ADMIN, UserRole.TUTOR]))
+):
+    """
+    Enroll a user in a course (Admin and Tutor).
+    """
+    get_course_or_404(course_id, db)
+    user = db.query(User).filter(User.email == enrollment.email).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    if not enroll(db, user.id, course_id):
+        raise HTTPException(status_code=400, detail="User is already enrolled in this course")
+
+    enrolled_at = db.query(Enrollment.created_at).filter(
+        Enrollment.user_id == user.id, Enrollment.course_id == course_id
+    ).scalar()
+    return {"user_id": user.id, "email": user.email, "role": user.role, "enrolled_at": enrolled_at}
+
+
+# Course roster
+@router.get("/{course_id}/enrollments", response_model=List[EnrollmentResponse])
+def read_enrollments(
+    course_id: int,
+    db: Session = Depends(get_read_db),
+    admin_user: User = Depends(check_role([UserRole.ADMIN, UserRole.TUTOR]))
+):
+    """
+    Users enrolled in a course, in enrollment order (Admin and Tutor).
+    """
+    get_course_or_404(course_id, db)
+
+    # One query: (course_id, user_id) index → users by primary key
+    rows = db.query(User.id, User.email, User.role, Enrollment.created_at).join(
+        Enrollment, Enrollment.user_id == User.id
+    ).filter(
+        Enrollment.course_id == course_id
+    ).order_by(Enrollment.id).all()
+    return json_response(rows_to_dicts(rows, ["user_id", "email", "role", "enrolled_at"]))
+
+
+# Remove someone from a course
+@router.delete("/{course_id}/enrollments/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
+def remove_enrollment(
+    course_id: int,
+    user_id: int,
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(check_role([UserRole.ADMIN, UserRole.TUTOR]))
+):
+    """
+    Remove a user from a course (Admin and Tutor).
+    """
+    removed = db.query(Enrollment).filter(
+        Enrollment.user_id == user_id, Enrollment.course_id == course_id
+    ).delete()
+    db.commit()
+    if not removed:
+        raise HTTPException(status_code=404, detail="Enrollment not found")
+    return None
@@ -0,0 +1,64 @@
+# Import tools to create routes and return errors
+import asyncio
+from fastapi import APIRouter, HTTPException, Query, status
+
+# StreamingResponse → keeps the HTTP response open and sends events as they happen
+from fastapi.responses import StreamingResponse
+
+# Live update broker + the room manager (for occupancy)
+from events import broker, format_event, public_occupancy, HEARTBEAT_SECONDS
+from signaling import manager, load_identity
+from models import UserRole
+
+
+# Create a router for the live update stream
+router = APIRouter(
+    prefix="/events",
+    tags=["events"]
+)
+
+
+# =====================================
+# LIVE UPDATES FOR DASHBOARDS (SSE)
+# =====================================
+@router.get("/")
+async def live_updates(token: str = Query(None)):
+    """
+    Server-Sent Events stream (all authenticated users).
+    Sends course/meeting changes and live room occupancy, so dashboards
+    subscribe once instead of re-fetching lists.
+    Students only get the head count per room; admins and tutors also get
+    the presenter, waiting room and viewers.
+    """
+
+    # EventSource can't send headers → JWT comes as ?token=...
+    identity = load_identity(token)  # token claims, no database query
+    if identity is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials"
+        )
+
+    staff = identity["user_role"] in (UserRole.ADMIN, UserRole.TUTOR)
+
+    async def stream():
+        queue = broker.subscribe(staff)
+        try:
+            # Reconnect after 3s if the connection drops, then start with current occupancy
+            yield "retry: 3000\n\n"
+            occupancy = manager.occupancy()
+            yield format_event("occupancy", occupancy if staff else public_occupancy(occupancy))
+
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    message = ": keep-alive\n\n"
+                yield message
+        finally:
+            broker.unsubscribe(queue)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"  # tell proxies not to buffer the stream
+    })
@@ -7,11 +7,11 @@ from sqlalchemy.orm import Session
 # Import uuid to generate unique room names
 import uuid
 
-# Import database connection function
-from database import get_db
+# Import database connection functions (get_read_db → read-only, may use a replica)
+from database import get_db, get_read_db
 
 # Import database models (tables)
-from models import Meeting, User, UserRole
+from models import Meeting, AttendanceEvent, Course, User, UserRole, build_meeting_url
 
 # Import authentication and role-checking functions
 from auth import get_current_user, check_role
@@ -19,6 +19,21 @@ from auth import get_current_user, check_role
 # Import request and response data formats (schemas)
 from schemas import MeetingCreate, MeetingResponse
 
+# Fast JSON encoding for big lists (skips Pydantic validation)
+from serializers import json_response
+
+# Cache of room_id → meeting used by the WebSocket handshake
+from signaling import meeting_cache
+
+# SFU mode needs the optional aiortc package
+from sfu import sfu_available
+
+# Pushes changes to open dashboards (live updates)
+from events import broker
+
+# Recording files are removed together with the meeting
+from recordings import delete_recording_file
+
 
 # Create a router for all meeting-related endpoints
 # prefix="/meetings" means every route here starts with /meetings
@@ -32,7 +47,7 @@ router = APIRouter(
 # It responds with MeetingResponse format
 # It returns HTTP 201 status when successful
 @router.post("/", response_model=MeetingResponse, status_code=status.HTTP_201_CREATED)
-async def create_meeting(
+def create_meeting(
     meeting: MeetingCreate,  # Data sent from the user (title etc.)
     db: Session = Depends(get_db),  # Connect to database
     admin_user: User = Depends(check_role([UserRole.ADMIN]))  
@@ -43,6 +58,22 @@ async def create_meeting(
     Generates a unique room name automatically.
     """
     
+    # A meeting can't end before it starts
+    if meeting.scheduled_start and meeting.scheduled_end and meeting.scheduled_end <= meeting.scheduled_start:
+        raise HTTPException(status_code=400, detail="scheduled_end must be after scheduled_start")
+
+    # SFU meetings need the media relay on this server
+    if meeting.media_mode == "sfu" and not sfu_available():
+        raise HTTPException(status_code=400, detail="SFU mode is not available on this server (install aiortc)")
+
+    # Viewers receive the stage from the server (a mesh can't reach hundreds of viewers)
+    if meeting.room_mode == "webinar" and meeting.media_mode != "sfu":
+        raise HTTPException(status_code=400, detail="Webinars need media_mode 'sfu'")
+
+    # Students enrolled in the course see the meeting in their feed
+    if meeting.course_id is not None and db.query(Course.id).filter(Course.id == meeting.course_id).first() is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+
     # Generate a unique room name using uuid4
     # uuid4 creates a random unique string like: 'a3f5e9c0-...'
     room_id = str(uuid.uuid4())
@@ -51,7 +82,12 @@ async def create_meeting(
     db_meeting = Meeting(
         title=meeting.title,          # Take title from request
         room_id=room_id,              # Use generated unique room ID
-        created_by=admin_user.id      # Save which admin created it
+        created_by=admin_user.id,     # Save which admin created it
+        scheduled_start=meeting.scheduled_start,  # Optional schedule
+        scheduled_end=meeting.scheduled_end,
+        media_mode=meeting.media_mode.value,
+        room_mode=meeting.room_mode.value,
+        course_id=meeting.course_id
     )
     
     # Add the new meeting to the database session
@@ -62,6 +98,12 @@ async def create_meeting(
     
     # Refresh the object to get updated values (like auto-generated ID)
     db.refresh(db_meeting)
+
+    # Forget any cached "room not found" for this room ID
+    meeting_cache.invalidate(room_id)
+
+    # Tell open dashboards about the new meeting
+    broker.publish("meeting-created", MeetingResponse.model_validate(db_meeting).model_dump(mode="json"))
     
     # Return the newly created meeting
     return db_meeting
@@ -70,8 +112,8 @@ async def create_meeting(
 # This endpoint returns all meetings
 # Accessible by Admin, Tutor, and Student
 @router.get("/", response_model=list[MeetingResponse])
-async def read_all_meetings(
-    db: Session = Depends(get_db),  # Connect to database
+def read_all_meetings(
+    db: Session = Depends(get_read_db),  # Connect to database
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.TUTOR, UserRole.STUDENT]))
     # Allow multiple roles to access
 ):
@@ -79,15 +121,35 @@ async def read_all_meetings(
     View all meetings (All authenticated users can access).
     """
     
-    # Query database and return all meeting records
-    return db.query(Meeting).all()
+    # Query only the needed columns (no ORM objects) and encode them directly
+    # Output has the same format as MeetingResponse
+    rows = db.query(
+        Meeting.title, Meeting.id, Meeting.room_id, Meeting.created_at,
+        Meeting.scheduled_start, Meeting.scheduled_end, Meeting.media_mode, Meeting.room_mode,
+        Meeting.course_id
+    ).all()
+    return json_response([
+        {
+            "title": title,
+            "id": meeting_id,
+            "room_id": room_id,
+            "meeting_url": build_meeting_url(room_id),
+            "created_at": created_at,
+            "scheduled_start": scheduled_start,
+            "scheduled_end": scheduled_end,
+            "media_mode": media_mode,
+            "room_mode": room_mode,
+            "course_id": course_id
+        }
+        for title, meeting_id, room_id, created_at, scheduled_start, scheduled_end, media_mode, room_mode, course_id in rows
+    ])
 
 
 # This endpoint returns a single meeting by its room_id
 @router.get("/room/{room_id}", response_model=MeetingResponse)
-async def read_meeting_by_room(
+def read_meeting_by_room(
     room_id: str,  # Room ID comes from URL path
-    db: Session = Depends(get_db),  # Connect to database
+    db: Session = Depends(get_read_db),  # Connect to database
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.TUTOR, UserRole.STUDENT]))
 ):
     """
@@ -101,9 +163,9 @@ async def read_meeting_by_room(
 
 # This endpoint returns a single meeting by its ID
 @router.get("/{meeting_id}", response_model=MeetingResponse)
-async def read_meeting(
+def read_meeting(
     meeting_id: int,  # ID comes from URL path
-    db: Session = Depends(get_db),  # Connect to database
+    db: Session = Depends(get_read_db),  # Connect to database
     current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.TUTOR, UserRole.STUDENT]))
     # Allow multiple roles to access
 ):
@@ -122,9 +184,34 @@ async def read_meeting(
     return meeting
 
 
+# This endpoint returns the join/leave log of a meeting (for attendance reports)
+@router.get("/{meeting_id}/attendance")
+def read_meeting_attendance(
+    meeting_id: int,
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(check_role([UserRole.ADMIN]))
+):
+    """
+    Attendance events of a meeting in time order (Admin only).
+    Events are written in batches, so the last few seconds may not be here yet.
+    """
+    if db.query(Meeting.id).filter(Meeting.id == meeting_id).first() is None:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+
+    rows = db.query(
+        AttendanceEvent.user_email, AttendanceEvent.event, AttendanceEvent.at
+    ).filter(
+        AttendanceEvent.meeting_id == meeting_id
+    ).order_by(AttendanceEvent.at).all()
+    return json_response([
+        {"userId": user_email, "event": event, "at": at}
+        for user_email, event, at in rows
+    ])
+
+
 # This endpoint deletes a meeting by its ID
 @router.delete("/{meeting_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_meeting(
+def delete_meeting(
     meeting_id: int,
     db: Session = Depends(get_db),
     admin_user: User = Depends(check_role([UserRole.ADMIN]))
@@ -136,6 +223,17 @@ async def delete_meeting(
     if not meeting:
         raise HTTPException(status_code=404, detail="Meeting not found")
     
+    # Its attendance log and recordings go with it
+    recording_ids = [recording.id for recording in meeting.recordings]
+    db.query(AttendanceEvent).filter(AttendanceEvent.meeting_id == meeting_id).delete()
     db.delete(meeting)
     db.commit()
+    for recording_id in recording_ids:
+        delete_recording_file(recording_id)
+
+    # Next WebSocket lookup for this room goes back to the database
+    meeting_cache.invalidate(meeting.room_id)
+
+    # Tell open dashboards to remove it
+    broker.publish("meeting-deleted", {"id": meeting_id, "room_id": meeting.room_id})
     return None
\ No newline at end of file
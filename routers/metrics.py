@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends
+# APIRouter → used to group related routes
+# Depends → lets FastAPI automatically provide things (like current user)
+
+from models import User, UserRole
+# User → user table model
+# UserRole → roles enum (ADMIN, TUTOR, STUDENT)
+
+from auth import check_role
+# check_role → checks if user has required role
+
+import metrics
+# metrics → in-process counters (compression, signaling, auth ...)
+
+
+# Create a router for metrics endpoints
+router = APIRouter(
+    prefix="/metrics",  # All routes will start with /metrics
+    tags=["metrics"]    # Group name in Swagger docs
+)
+
+
+# =====================================
+# GET ALL COUNTERS (ADMIN ONLY)
+# =====================================
+@router.get("/")
+async def read_metrics(
+    prefix: str = "",  # Optional filter, example: ?prefix=compression.
+    admin_user: User = Depends(check_role([UserRole.ADMIN]))  # Only ADMIN can access
+):
+    """
+    Get the counters of this worker process (Admin only).
+    """
+
+    return metrics.snapshot(prefix)
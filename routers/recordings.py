@@ -0,0 +1,270 @@
+# Import tools to create routes and return errors
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Request, status
+
+# FileResponse → streams the file from disk and answers Range requests (video seeking)
+from fastapi.responses import FileResponse
+
+# Import Session to talk to the database
+from sqlalchemy.orm import Session
+
+import datetime
+import os
+
+# run blocking file I/O without freezing the event loop
+from starlette.concurrency import run_in_threadpool
+
+# Import database connection function
+from database import get_db
+
+# Import database models (tables)
+from models import Meeting, Recording, User, UserRole
+
+# Import authentication and role-checking functions
+from auth import check_role, get_user_from_token
+
+# Import request and response data formats (schemas)
+from schemas import RecordingCreate, RecordingResponse
+
+# Recording files on disk (chunked, streaming writes)
+from recordings import (
+    RECORDING_MEDIA_TYPE, ChunkTooLarge, create_recording_file, delete_recording_file,
+    recording_path, truncate_recording, upload_lock, write_chunk
+)
+
+
+# Create a router for all recording-related endpoints
+router = APIRouter(
+    prefix="/recordings",
+    tags=["recordings"]
+)
+
+
+def get_recording(db: Session, recording_id: int) -> Recording:
+    # Find a recording or answer 404
+    recording = db.query(Recording).filter(Recording.id == recording_id).first()
+    if not recording:
+        raise HTTPException(status_code=404, detail="Recording not found")
+    return recording
+
+
+def reload_recording(db: Session, recording: Recording) -> Recording:
+    # Read the row again after waiting for the upload lock
+    # (another request may have added a chunk, completed or deleted it meanwhile)
+    db.expire(recording)
+    return get_recording(db, recording.id)
+
+
+def save_recording(db: Session, recording: Recording) -> Recording:
+    # Commit the changes and load the saved row (so the response needs no query)
+    db.commit()
+    db.refresh(recording)
+    return recording
+
+
+def remove_recording(db: Session, recording: Recording, recording_id: int):
+    db.delete(recording)
+    db.commit()
+    delete_recording_file(recording_id)
+
+
+def check_owner(recording: Recording, user: User):
+    # Only the person recording (or an admin) can change a recording
+    if recording.created_by != user.id and user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have enough permissions to access this resource"
+        )
+
+
+# =====================================
+# START A RECORDING UPLOAD (ADMIN/TUTOR)
+# =====================================
+@router.post("/", response_model=RecordingResponse, status_code=status.HTTP_201_CREATED)
+def start_recording(
+    recording: RecordingCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.TUTOR]))
+):
+    """
+    Start a new recording of a meeting (Admin/Tutor).
+    Chunks are then sent with PUT /recordings/{id}/chunks/{index}.
+    """
+    if db.query(Meeting.id).filter(Meeting.id == recording.meeting_id).first() is None:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+
+    db_recording = Recording(meeting_id=recording.meeting_id, created_by=current_user.id)
+    db.add(db_recording)
+    db.commit()
+    db.refresh(db_recording)
+
+    create_recording_file(db_recording.id)
+    return db_recording
+
+
+# =====================================
+# UPLOAD ONE CHUNK (resumable)
+# =====================================
+@router.put("/{recording_id}/chunks/{index}", response_model=RecordingResponse)
+async def upload_chunk(
+    recording_id: int,
+    index: int,  # 0, 1, 2 ... in recording order
+    request: Request,
+    x_chunk_sha256: str = Header(...),  # SHA-256 (hex) of the chunk body
+    db: Session = Depends(get_db),
+    current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.TUTOR]))
+):
+    """
+    Append one chunk to a recording. The body is written to disk while it
+    arrives and checked against the X-Chunk-SHA256 header.
+    Sending a chunk that is already stored is a no-op, so a client that lost
+    the response can retry safely. The response's chunk_count is the next index.
+    """
+    # 404 / 403 before taking a lock
+    # (async endpoint → every query runs in the threadpool, never on the event loop)
+    recording = await run_in_threadpool(get_recording, db, recording_id)
+    check_owner(recording, current_user)
+
+    async with upload_lock(recording_id):
+        recording = await run_in_threadpool(reload_recording, db, recording)
+
+        if recording.status != "uploading":
+            raise HTTPException(status_code=409, detail="Recording is already complete")
+
+        # Already stored (retry) → tell the client where to continue
+        if index < recording.chunk_count:
+            return recording
+
+        # Chunks must arrive in order (the file is one continuous WebM stream)
+        if index > recording.chunk_count:
+            raise HTTPException(status_code=409, detail=f"Expected chunk {recording.chunk_count}")
+
+        try:
+            written, digest = await write_chunk(recording_id, recording.size, request.stream())
+        except ChunkTooLarge:
+            raise HTTPException(status_code=413, detail="Chunk is too large")
+
+        if written == 0:
+            raise HTTPException(status_code=400, detail="Empty chunk")
+
+        if digest != x_chunk_sha256.strip().lower():
+            await run_in_threadpool(truncate_recording, recording_id, recording.size)
+            raise HTTPException(status_code=400, detail="Chunk checksum mismatch")
+
+        recording.size += written
+        recording.chunk_count += 1
+        return await run_in_threadpool(save_recording, db, recording)
+
+
+# =====================================
+# FINISH A RECORDING
+# =====================================
+@router.post("/{recording_id}/complete", response_model=RecordingResponse)
+async def complete_recording(
+    recording_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.TUTOR]))
+):
+    """
+    Mark a recording as finished (no more chunks are accepted).
+    """
+    # 404 / 403 before taking a lock
+    # (async endpoint → every query runs in the threadpool, never on the event loop)
+    recording = await run_in_threadpool(get_recording, db, recording_id)
+    check_owner(recording, current_user)
+
+    async with upload_lock(recording_id):
+        recording = await run_in_threadpool(reload_recording, db, recording)
+
+        if recording.status != "complete":
+            recording.status = "complete"
+            recording.completed_at = datetime.datetime.now(datetime.timezone.utc)
+            await run_in_threadpool(save_recording, db, recording)
+
+    return recording
+
+
+# =====================================
+# LIST / GET RECORDINGS
+# =====================================
+@router.get("/", response_model=list[RecordingResponse])
+def read_recordings(
+    meeting_id: int = Query(None),  # Only the recordings of this meeting
+    db: Session = Depends(get_db),
+    current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.TUTOR, UserRole.STUDENT]))
+):
+    """
+    View recordings, newest first (All authenticated users can access).
+    """
+    query = db.query(Recording)
+    if meeting_id is not None:
+        query = query.filter(Recording.meeting_id == meeting_id)
+    return query.order_by(Recording.id.desc()).all()
+
+
+@router.get("/{recording_id}", response_model=RecordingResponse)
+def read_recording(
+    recording_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.TUTOR, UserRole.STUDENT]))
+):
+    """
+    Get recording details (used by the uploader to find where to resume).
+    """
+    return get_recording(db, recording_id)
+
+
+# =====================================
+# PLAY A RECORDING (Range requests)
+# =====================================
+@router.get("/{recording_id}/video")
+def play_recording(
+    recording_id: int,
+    token: str = Query(None),  # <video src> can't send headers → JWT comes as ?token=...
+    db: Session = Depends(get_db)
+):
+    """
+    Stream the recording file. Supports Range requests, so the player can
+    seek without downloading the whole file.
+    """
+    if get_user_from_token(token) is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials"
+        )
+
+    recording = get_recording(db, recording_id)
+    path = recording_path(recording.id)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Recording file not found")
+
+    return FileResponse(
+        path,
+        media_type=RECORDING_MEDIA_TYPE,
+        filename=f"recording-{recording.id}.webm",
+        content_disposition_type="inline",
+        headers={"Cache-Control": "private, max-age=3600"}
+    )
+
+
+# =====================================
+# DELETE A RECORDING
+# =====================================
+@router.delete("/{recording_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_recording(
+    recording_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(check_role([UserRole.ADMIN, UserRole.TUTOR]))
+):
+    """
+    Delete a recording and its file (owner or Admin).
+    """
+    # 404 / 403 before taking a lock
+    # (async endpoint → every query runs in the threadpool, never on the event loop)
+    recording = await run_in_threadpool(get_recording, db, recording_id)
+    check_owner(recording, current_user)
+
+    async with upload_lock(recording_id):
+        recording = await run_in_threadpool(reload_recording, db, recording)
+        await run_in_threadpool(remove_recording, db, recording, recording_id)
+
+    return None
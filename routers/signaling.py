@@ -1,8 +1,27 @@
 # Import tools to create WebSocket routes and handle disconnects
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query, Depends, HTTPException
 
 # Import the connection manager that handles rooms & users
-from signaling import manager
+from signaling import manager, load_identity
+
+# Per-connection and per-room message limits
+from ratelimit import rate_limiter
+
+# Server-side media relay (meetings with media_mode "sfu")
+from sfu import sfu, sfu_available
+
+# Only admins can manage the signaling server
+from models import User, UserRole
+from auth import check_role
+
+# Fast JSON encoding (datetimes as ISO strings)
+from serializers import json_response
+
+# Table of message handlers (one lookup + precompiled field checks per message)
+from dispatcher import MessageDispatcher, optional
+
+# Opt-in log of inbound frames (replayed by benchmarks/replay_traffic.py)
+from traffic import traffic_recorder
 
 # Create a router for websocket endpoints
 router = APIRouter(
@@ -10,13 +29,131 @@ router = APIRouter(
     tags=["signaling"]     # Group name shown in docs
 )
 
+# Router for HTTP endpoints that manage the signaling server (admin only)
+admin_router = APIRouter(
+    prefix="/signaling",
+    tags=["signaling"]
+)
+
+# Handlers for every WebSocket message type (other modules can add more with @dispatcher.on)
+dispatcher = MessageDispatcher("signaling")
+
+# Webinar viewers can only watch, ask to speak and run their SFU connection
+# (anything else would fan out to the stage)
+VIEWER_MESSAGES = {"join", "sfu-offer", "sfu-answer", "sfu-layer", "raise-hand"}
+
+
+# =====================================
+# DRAIN BEFORE RESTART (ADMIN ONLY)
+# =====================================
+@admin_router.post("/drain")
+async def drain_signaling(
+    admin_user: User = Depends(check_role([UserRole.ADMIN]))  # Only ADMIN can drain
+):
+    """
+    Prepare for a restart (Admin only).
+    Stops new WebSocket connections, saves all rooms to disk and asks
+    every client to reconnect with a resume token. Restart the server after this.
+    """
+    saved_rooms = await manager.drain()
+    return {"draining": True, "saved_rooms": saved_rooms}
+
+
+# =====================================
+# LIVE ROOMS + ANALYTICS (ADMIN ONLY)
+# =====================================
+@admin_router.get("/rooms")
+async def live_rooms(
+    admin_user: User = Depends(check_role([UserRole.ADMIN]))
+):
+    """
+    List meetings that are live right now (Admin only).
+    Per room: peer/waiting counts, presenter, duration and message rates.
+    """
+    return json_response(manager.room_analytics())
+
+
+# =====================================
+# FIND A USER (ADMIN ONLY)
+# =====================================
+@admin_router.get("/users/{user_id}")
+async def locate_user(
+    user_id: str,  # Stable user ID (email)
+    admin_user: User = Depends(check_role([UserRole.ADMIN]))
+):
+    """
+    Find which meeting room a user is in right now (Admin only).
+    """
+    location = manager.locate(user_id)
+    if location is None:
+        raise HTTPException(status_code=404, detail="User is not in any meeting")
+    return location
+
+
+# =====================================
+# KICK A USER FROM ANY ROOM (ADMIN ONLY)
+# =====================================
+@admin_router.post("/users/{user_id}/kick")
+async def kick_user_anywhere(
+    user_id: str,  # Stable user ID (email)
+    admin_user: User = Depends(check_role([UserRole.ADMIN]))
+):
+    """
+    Remove a user from whatever meeting they are in (Admin only).
+    """
+    room_id = await manager.kick_session(user_id)
+    if room_id is None:
+        raise HTTPException(status_code=404, detail="User is not in any meeting")
+    return {"userId": user_id, "room_id": room_id, "kicked": True}
+
+
+class Connection:
+    """One meeting WebSocket, passed to every message handler."""
+
+    __slots__ = ("websocket", "room_id", "meeting", "identity", "temp_peer_id", "peer_id")
+
+    def __init__(self, websocket: WebSocket, room_id: str, meeting: dict, identity: dict, temp_peer_id: str):
+        self.websocket = websocket
+        self.room_id = room_id
+        self.meeting = meeting
+        self.identity = identity
+        self.temp_peer_id = temp_peer_id
+        # Temporary ID until 'join' sets the stable one (email)
+        self.peer_id = temp_peer_id
+
+    def is_admin(self) -> bool:
+        sender_info = manager.rooms.get(self.room_id, {}).get("peers", {}).get(self.peer_id, {})
+        return sender_info.get("role") == "admin"
+
+
 # WebSocket endpoint for a specific meeting room
 @router.websocket("/{room_id}")
-async def websocket_signaling(websocket: WebSocket, room_id: str):
+async def websocket_signaling(websocket: WebSocket, room_id: str, token: str = Query(None)):
+
+    # Server is about to restart → refuse (client retries against the new process)
+    if manager.draining:
+        await websocket.close(code=1013)
+        return
+
+    # Browsers can't send headers on WebSockets → JWT comes as ?token=...
+    # Checked BEFORE accept(): closing first makes the server answer the handshake with 403
+    identity = load_identity(token)  # token claims, no database query
+    if identity is None:
+        await websocket.close(code=1008)
+        return
+
+    # Rooms only exist for real meetings → reject unknown room IDs
+    meeting = await manager.get_meeting(room_id)
+    if meeting is None:
+        await websocket.close(code=4404)
+        return
 
     # Connect the user to the room and get a temporary peer ID
-    temp_peer_id = await manager.connect(room_id, websocket)
-    stable_peer_id = temp_peer_id # we'll update this once 'join' is received
+    temp_peer_id = await manager.connect(room_id, websocket, meeting)
+    connection = Connection(websocket, room_id, meeting, identity, temp_peer_id)
+
+    # Recording ID of this connection (None unless TRAFFIC_RECORDING=1)
+    record_id = traffic_recorder.open(room_id, meeting, identity)
 
     try:
         # Keep listening for messages forever while connected
@@ -24,230 +161,377 @@ async def websocket_signaling(websocket: WebSocket, room_id: str):
 
             # Receive message from frontend in JSON format
             data = await websocket.receive_json()
-            
-            # Add sender ID so others know who sent the message
-            data["sender_id"] = stable_peer_id
-            
-            # ========== WHEN USER JOINS ==========
-            if data.get("type") == "join":
-                username = data.get("username", "Guest")
-                role = data.get("role", "student")
-                user_id = data.get("userId") or temp_peer_id # Use stable ID from frontend if provided
-                
-                # Update our tracking ID to the stable one
-                stable_peer_id = user_id
-                data["sender_id"] = stable_peer_id
-
-                # CHECK IF ALREADY APPROVED (Seamless Re-join)
-                # If they were already in 'peers', they don't need to wait again
-                is_already_approved = room_id in manager.rooms and user_id in manager.rooms[room_id]["peers"]
-                
-                # IF STUDENT -> Move to Waiting Room (unless already approved)
-                if role == "student" and not is_already_approved:
-                    await manager.move_to_waiting(room_id, user_id, websocket, username, role)
-                    
-                    # Notify admins in the room
-                    await manager.broadcast(room_id, {
-                        "type": "join-request",
-                        "userId": user_id,
-                        "username": username
-                    }, only_admins=True)
-                    
-                    # Tell student they are waiting
-                    await websocket.send_json({
-                        "type": "waiting-for-approval"
-                    })
-                
-                # IF ADMIN OR ALREADY APPROVED -> Join normally
-                else:
-                    await manager.add_to_peers(room_id, user_id, websocket, username, role)
-                    
-                    # Get updated participant list & presenter
-                    users, presenter = manager.get_participants(room_id)
-
-                    # Send updated participants list to everyone approved
-                    await manager.broadcast(room_id, {
-                        "type": "participants",
-                        "users": users,
-                        "presenter": presenter
-                    })
-
-                    # Tell other approved peers someone joined
-                    await manager.broadcast(room_id, {
-                        "type": "join",
-                        "sender_id": user_id,
-                        "username": username
-                    }, sender_id=user_id)
-
-                    history = manager.get_messages(room_id)
-                    if history:
-                        await websocket.send_json({
-                            "type": "chat-history",
-                            "history": history
-                        })
-                    
-                    # IF ADMIN -> Also send the current waiting room list
-                    if role == "admin":
-                        waiting_users = manager.get_waiting_users(room_id)
-                        if waiting_users:
-                            await websocket.send_json({
-                                "type": "waiting-users-list",
-                                "users": waiting_users
-                            })
-
-                continue
-
-            # ========== ADMIN APPROVE USER ==========
-            if data.get("type") == "approve-user":
-                sender_info = manager.rooms.get(room_id, {}).get("peers", {}).get(stable_peer_id, {})
-                if sender_info.get("role") == "admin":
-                    target_id = data.get("targetUserId")
-                    waiting_user = manager.rooms.get(room_id, {}).get("waiting", {}).get(target_id)
-                    
-                    if waiting_user:
-                        # Move from waiting to peers
-                        target_socket = waiting_user["socket"]
-                        target_username = waiting_user["username"]
-                        target_role = waiting_user["role"]
-                        
-                        manager.disconnect(room_id, target_id) # Remove from waiting
-                        await manager.add_to_peers(room_id, target_id, target_socket, target_username, target_role)
-                        
-                        # Notify the student
-                        await target_socket.send_json({
-                            "type": "join-approved"
-                        })
-                        
-                        # Broadcast updated participants
-                        users, presenter = manager.get_participants(room_id)
-                        await manager.broadcast(room_id, {
-                            "type": "participants",
-                            "users": users,
-                            "presenter": presenter
-                        })
-
-                        # Notify others to start WebRTC
-                        await manager.broadcast(room_id, {
-                            "type": "join",
-                            "sender_id": target_id,
-                            "username": target_username
-                        }, sender_id=target_id)
-                        
-                        # Send chat history to approved user
-                        history = manager.get_messages(room_id)
-                        if history:
-                            await target_socket.send_json({
-                                "type": "chat-history",
-                                "history": history
-                            })
-                continue
-
-            # ========== ADMIN REJECT USER ==========
-            if data.get("type") == "reject-user":
-                sender_info = manager.rooms.get(room_id, {}).get("peers", {}).get(stable_peer_id, {})
-                if sender_info.get("role") == "admin":
-                    target_id = data.get("targetUserId")
-                    await manager.kick_user(room_id, target_id)
-                continue
-
-            # ========== SCREEN SHARE EVENT ==========
-            if data.get("type") == "screen-share":
-
-                # If user started sharing screen
-                if data.get("isSharing"):
-                    manager.set_presenter(room_id, stable_peer_id)
-
-                # If user stopped sharing
-                else:
-                    users, presenter = manager.get_participants(room_id)
-
-                    # Remove presenter if this user was presenting
-                    if presenter == stable_peer_id:
-                        manager.set_presenter(room_id, None)
-
-                continue
-
-            # ========== CHAT MESSAGE ==========
-            elif data.get("type") == "chat-message":
-
-                # Save message to history
-                manager.add_message(room_id, data)
-
-                # Send message to everyone in the room
-                await manager.broadcast(room_id, data)
-
-                continue
-
-            # ========== ADMIN KICK USER ==========
-            elif data.get("type") == "kick-user":
-
-                # Get info about sender
-                sender_info = manager.rooms.get(room_id, {}).get("peers", {}).get(stable_peer_id, {})
-
-                # Only admin can kick users
-                if sender_info.get("role") == "admin":
-
-                    # ID of user to remove
-                    target_id = data.get("targetUserId")
-
-                    # Get username of removed user
-                    target_username = manager.rooms.get(room_id, {}).get("peers", {}).get(target_id, {}).get("username", "Unknown")
-
-                    # Remove user from room
-                    await manager.kick_user(room_id, target_id)
-                    
-                    # Notify others that user was removed
-                    await manager.broadcast(room_id, {
-                        "type": "user-kicked-notification",
-                        "username": target_username,
-                        "message": f"{target_username} was removed by admin"
-                    })
-                    
-                    # Send updated participants list
-                    users, presenter = manager.get_participants(room_id)
-                    await manager.broadcast(room_id, {
-                        "type": "participants",
-                        "users": users,
-                        "presenter": presenter
-                    })
-
-                continue
-
-            # ========== PRIVATE MESSAGE (WebRTC signaling) ==========
-            # If message has a target user → send only to them
-            target_id = data.get("target_id")
-
-            if target_id:
-                await manager.send_to_target(room_id, target_id, data)
-
-            else:
-                # Otherwise send to everyone except sender
-                await manager.broadcast(room_id, data, sender_id=stable_peer_id)
-            
+            if record_id is not None:
+                traffic_recorder.message(room_id, record_id, data)
+
+            await handle_message(connection, data)
+
     # ========== USER DISCONNECTED ==========
     except WebSocketDisconnect:
+        await handle_disconnect(connection)
 
-        # Remove user from room
-        manager.disconnect(room_id, stable_peer_id, websocket)
+    # ========== HANDLE ERRORS ==========
+    except Exception as e:
+        print(f"WebSocket error: {e}")   # print error in console
+        manager.disconnect(room_id, connection.peer_id, websocket)  # safely remove user
+
+    # ========== ALWAYS: FREE RATE LIMIT STATE ==========
+    finally:
+        rate_limiter.forget_connection(temp_peer_id)
+        traffic_recorder.close(room_id, record_id)
+
+
+async def handle_message(connection: Connection, data):
+    # One inbound frame (also driven by benchmarks/replay_traffic.py)
+    room_id = connection.room_id
+
+    # Find the handler; malformed messages (wrong/missing fields) are dropped here
+    route = dispatcher.route(data)
+    if route is None:
+        return
+    if data["type"] not in VIEWER_MESSAGES and manager.is_viewer(room_id, connection.peer_id):
+        return
+
+    # Drop messages over the per-peer / per-room limit BEFORE any broadcast
+    allowed, notify = rate_limiter.check(room_id, connection.temp_peer_id, data["type"])
+    if not allowed:
+        if notify:
+            await connection.websocket.send_json({
+                "type": "throttled",
+                "messageType": data["type"]
+            })
+        return
+
+    # Message rate of the room (admin analytics)
+    manager.record_message(room_id, data["type"])
+
+    # Add sender ID so others know who sent the message
+    data["sender_id"] = connection.peer_id
+
+    await dispatcher.run(route, connection, data)
+
+
+async def handle_disconnect(connection: Connection):
+    room_id, peer_id, websocket = connection.room_id, connection.peer_id, connection.websocket
+
+    # Webinar viewer left → nobody is told (the next "audience" update has the new count)
+    if manager.is_viewer(room_id, peer_id):
+        manager.disconnect(room_id, peer_id, websocket)
+
+    # Approved user dropped → keep their slot for a short time so they can resume
+    # Otherwise remove user from room and tell everyone (only if really removed,
+    # e.g. not when this socket was already replaced by a newer one)
+    elif not manager.detach(room_id, peer_id, websocket):
+        if manager.disconnect(room_id, peer_id, websocket):
+            await manager.announce_leave(room_id, peer_id)
+
+
+# =====================================
+# MESSAGE HANDLERS
+# =====================================
+
+# ========== WHEN USER JOINS ==========
+@dispatcher.on("join", username=optional(str), resumeToken=optional(str))
+async def handle_join(connection: Connection, data: dict):
+    room_id, websocket = connection.room_id, connection.websocket
+    username = data.get("username") or "Guest"
+    # Role and user ID come from the JWT, never from the client message
+    role = connection.identity["role"]
+    user_id = connection.identity["user_id"]
+
+    # Update our tracking ID to the stable one
+    connection.peer_id = user_id
+    data["sender_id"] = user_id
+
+    # FAST RECONNECT: same tab coming back within the resume window
+    # → re-attach to the existing slot, replay missed messages, no broadcasts
+    if await manager.resume(room_id, user_id, websocket, data.get("resumeToken")):
+        return
+
+    # CHECK IF ALREADY APPROVED (Seamless Re-join)
+    # If they were already in 'peers' (or approved before a server restart),
+    # they don't need to wait again
+    is_already_approved = (
+        (room_id in manager.rooms and user_id in manager.rooms[room_id]["peers"])
+        or manager.can_resume(room_id, user_id, data.get("resumeToken"))
+    )
+
+    # WEBINAR: students watch without the waiting room (only hosts and promoted speakers are peers)
+    if role == "student" and not is_already_approved and manager.is_webinar(room_id):
+        await manager.add_viewer(room_id, user_id, websocket, username)
+        if not manager.holds_slot(room_id, user_id, websocket):
+            return
+        await websocket.send_json({"type": "webinar-viewer"})
+        # Current stage + viewer count (later changes come as "audience")
+        await websocket.send_json(manager.audience_message(room_id))
+        return
+
+    # IF STUDENT -> Move to Waiting Room (unless already approved)
+    if role == "student" and not is_already_approved:
+        await manager.move_to_waiting(room_id, user_id, websocket, username, role)
+
+        # Matches the room's auto-admit policy → admitted with the next batch
+        # (no join-request to admins, one roster update for the whole batch)
+        if manager.should_auto_admit(room_id, connection.identity):
+            manager.queue_auto_admit(room_id, user_id)
+            return
+
+        # Notify admins in the room
+        await manager.broadcast(room_id, {
+            "type": "join-request",
+            "userId": user_id,
+            "username": username
+        }, only_admins=True)
+
+        # Tell student they are waiting
+        await websocket.send_json({
+            "type": "waiting-for-approval"
+        })
+        return
+
+    # IF ADMIN OR ALREADY APPROVED -> Join normally
+    await manager.add_to_peers(room_id, user_id, websocket, username, role)
+
+    # Replaced by another tab, kicked or sent to the webinar audience while the old session was being closed
+    if not manager.holds_slot(room_id, user_id, websocket) or manager.is_viewer(room_id, user_id):
+        return
+
+    # Token that lets this tab reconnect quickly after a network drop
+    await websocket.send_json({
+        "type": "resume-token",
+        "resumeToken": manager.issue_resume_token(room_id, user_id)
+    })
+
+    # Get updated participant list & presenter
+    users, presenter = manager.get_participants(room_id)
+
+    # Send updated participants list to everyone approved
+    await manager.broadcast(room_id, {
+        "type": "participants",
+        "users": users,
+        "presenter": presenter
+    })
+
+    # Tell other approved peers someone joined
+    await manager.broadcast(room_id, {
+        "type": "join",
+        "sender_id": user_id,
+        "username": username
+    }, sender_id=user_id)
+
+    history = manager.get_messages(room_id)
+    if history:
+        await websocket.send_json({
+            "type": "chat-history",
+            "history": history
+        })
 
-        # Get updated participants
+    # Who sends video right now (later changes come as "stream-priority")
+    await websocket.send_json(manager.priority_hint(room_id))
+
+    # IF ADMIN -> Also send the current waiting room list
+    if role == "admin":
+        waiting_users = manager.get_waiting_users(room_id)
+        if waiting_users:
+            await websocket.send_json({
+                "type": "waiting-users-list",
+                "users": waiting_users
+            })
+
+
+# ========== ADMIN APPROVE / REJECT (single or batch) ==========
+@dispatcher.on("approve-user", "reject-user", targetUserId=str)
+@dispatcher.on("approve-users", "reject-users", targetUserIds=list)
+@dispatcher.on("approve-all")
+async def handle_admission(connection: Connection, data: dict):
+    if not connection.is_admin():
+        return
+    room_id = connection.room_id
+    msg_type = data["type"]
+
+    # Which users? one ID, a list of IDs, or everyone waiting
+    if msg_type == "approve-all":
+        target_ids = list(manager.rooms.get(room_id, {}).get("waiting", {}))
+    elif msg_type in ("approve-users", "reject-users"):
+        target_ids = [str(t) for t in data["targetUserIds"]]
+    else:
+        target_ids = [data["targetUserId"]]
+
+    if msg_type.startswith("approve"):
+        # Moves all of them at once + a single roster update
+        await manager.admit(room_id, target_ids)
+
+    elif msg_type == "reject-user":
+        # Works for waiting users and peers (same as before)
+        await manager.kick_user(room_id, target_ids[0])
+
+    else:
+        rejected = await manager.reject(room_id, target_ids)
+
+        # Refresh the waiting list of every admin once
+        if rejected:
+            await manager.broadcast(room_id, {
+                "type": "waiting-users-list",
+                "users": manager.get_waiting_users(room_id)
+            }, only_admins=True)
+
+
+# ========== WEBINAR STAGE (admin brings a viewer on stage or back) ==========
+@dispatcher.on("promote-viewer", "demote-speaker", targetUserId=str)
+async def handle_stage(connection: Connection, data: dict):
+    if not connection.is_admin() or not manager.is_webinar(connection.room_id):
+        return
+    if data["type"] == "promote-viewer":
+        await manager.promote(connection.room_id, data["targetUserId"])
+    else:
+        await manager.demote(connection.room_id, data["targetUserId"])
+
+
+@dispatcher.on("set-auto-admit", roles=optional(list), domains=optional(list))
+async def handle_auto_admit(connection: Connection, data: dict):
+    # Change who skips the waiting room in this meeting
+    if connection.is_admin():
+        manager.set_auto_admit(connection.room_id, data.get("roles") or [], data.get("domains") or [])
+
+
+# ========== SCREEN SHARE EVENT ==========
+@dispatcher.on("screen-share", isSharing=optional(bool))
+async def handle_screen_share(connection: Connection, data: dict):
+    room_id = connection.room_id
+
+    # If user started sharing screen
+    if data.get("isSharing"):
+        manager.set_presenter(room_id, connection.peer_id)
+
+    # If user stopped sharing
+    else:
         users, presenter = manager.get_participants(room_id)
 
-        # Notify everyone about new participant list
-        await manager.broadcast(room_id, {
-            "type": "participants",
-            "users": users,
-            "presenter": presenter
-        })
+        # Remove presenter if this user was presenting
+        if presenter == connection.peer_id:
+            manager.set_presenter(room_id, None)
 
-        # Notify that user left
-        await manager.broadcast(room_id, {
-            "type": "leave",
-            "sender_id": stable_peer_id,
-            "message": f"User {stable_peer_id} has left the room"
-        })
+    # SFU: the presenter's video switches to the high layer for everyone
+    sfu.set_presenter(room_id, manager.rooms.get(room_id, {}).get("presenter"))
 
-    # ========== HANDLE ERRORS ==========
+
+# ========== AUDIO LEVEL (active speaker + stream priority) ==========
+@dispatcher.on("audio-level", level=(int, float))
+async def handle_audio_level(connection: Connection, data: dict):
+    manager.report_audio_level(connection.room_id, connection.peer_id, float(data["level"]))
+
+
+# ========== SFU MEDIA (server relay mode) ==========
+@dispatcher.on("sfu-offer", "sfu-answer", sdp=str)
+@dispatcher.on("sfu-layer", publisher=str, layer=optional(str))
+async def handle_sfu(connection: Connection, data: dict):
+    room_id, peer_id = connection.room_id, connection.peer_id
+
+    # Only approved participants (and webinar viewers, receive only) of SFU meetings
+    is_peer = peer_id in manager.rooms.get(room_id, {}).get("peers", {})
+    is_viewer = manager.is_viewer(room_id, peer_id)
+    if not ((is_peer or is_viewer) and connection.meeting.get("media_mode") == "sfu" and sfu_available()):
+        return
+
+    try:
+        if data["type"] == "sfu-offer":
+            await sfu.offer(
+                room_id, peer_id, data["sdp"],
+                send=lambda message: manager.send_to_target(room_id, peer_id, message),
+                presenter=manager.rooms[room_id]["presenter"],
+                publish=is_peer
+            )
+        elif data["type"] == "sfu-answer":
+            await sfu.answer(room_id, peer_id, data["sdp"])
+        else:
+            # Pick "high"/"low" video for one publisher (null = automatic)
+            await sfu.set_layer(room_id, peer_id, data["publisher"], data.get("layer"))
     except Exception as e:
-        print(f"WebSocket error: {e}")   # print error in console
-        manager.disconnect(room_id, stable_peer_id, websocket)  # safely remove user
\ No newline at end of file
+        print(f"SFU error: {e}")
+        await sfu.remove(room_id, peer_id)
+        await connection.websocket.send_json({"type": "sfu-closed"})
+
+
+# ========== CHAT MESSAGE ==========
+@dispatcher.on("chat-message", message=str)
+async def handle_chat(connection: Connection, data: dict):
+    # Save message to history
+    manager.add_message(connection.room_id, data)
+
+    # Send message to everyone in the room
+    await manager.broadcast(connection.room_id, data)
+
+
+# ========== ADMIN KICK USER ==========
+@dispatcher.on("kick-user", targetUserId=str)
+async def handle_kick(connection: Connection, data: dict):
+    # Only admin can kick users
+    if not connection.is_admin():
+        return
+    room_id = connection.room_id
+
+    # ID of user to remove
+    target_id = data["targetUserId"]
+
+    # Get username of removed user
+    target_username = manager.rooms.get(room_id, {}).get("peers", {}).get(target_id, {}).get("username", "Unknown")
+
+    # Remove user from room
+    await manager.kick_user(room_id, target_id)
+
+    # Notify others that user was removed
+    await manager.broadcast(room_id, {
+        "type": "user-kicked-notification",
+        "username": target_username,
+        "message": f"{target_username} was removed by admin"
+    })
+
+    # Send updated participants list
+    users, presenter = manager.get_participants(room_id)
+    await manager.broadcast(room_id, {
+        "type": "participants",
+        "users": users,
+        "presenter": presenter
+    })
+
+
+# ========== WebRTC SIGNALING (most frequent messages) ==========
+@dispatcher.on("offer", target_id=str, offer=dict)
+@dispatcher.on("answer", target_id=str, answer=dict)
+@dispatcher.on("ice-candidate", target_id=str, candidate=dict)
+async def handle_webrtc(connection: Connection, data: dict):
+    # Private message → only to the target peer
+    await manager.send_to_target(connection.room_id, data["target_id"], data)
+
+
+# ========== RAISE HAND (webinar viewers ask the hosts to speak) ==========
+@dispatcher.on("raise-hand", isRaised=bool)
+async def handle_raise_hand(connection: Connection, data: dict):
+    room_id, peer_id = connection.room_id, connection.peer_id
+    if not manager.is_viewer(room_id, peer_id):
+        await handle_relay(connection, data)
+        return
+
+    # Only hosts hear about it (they can answer with "promote-viewer")
+    await manager.broadcast(room_id, {
+        "type": "viewer-hand",
+        "userId": peer_id,
+        "username": manager.rooms[room_id]["viewers"][peer_id][1],
+        "isRaised": data["isRaised"]
+    }, only_admins=True)
+
+
+# ========== STATUS UPDATES + ANYTHING ELSE (relayed) ==========
+@dispatcher.on("mic-status", isMuted=bool)
+@dispatcher.on("video-status", isVideoOff=bool)
+@dispatcher.default
+async def handle_relay(connection: Connection, data: dict):
+    # If message has a target user → send only to them
+    target_id = data.get("target_id")
+
+    if target_id:
+        await manager.send_to_target(connection.room_id, target_id, data)
+
+    else:
+        # Otherwise send to everyone except sender
+        await manager.broadcast(connection.room_id, data, sender_id=connection.peer_id)
@@ -1,27 +1,35 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 # APIRouter → used to group related routes (like user routes)
 # Depends → lets FastAPI automatically provide things (like DB or current user)
+# Query → limits on the meeting feed
 
 from sqlalchemy.orm import Session
 # Session → used to communicate with the database
 
-from database import get_db
-# Function that gives a database connection
+from database import get_read_db
+# get_read_db → read-only database connection (a replica when configured)
 
-from models import User, UserRole
+from models import User, UserRole, Course, Enrollment, Meeting, build_meeting_url
 # User → user table model
 # UserRole → roles enum (ADMIN, TUTOR, STUDENT etc.)
+# Course, Enrollment, Meeting → the per-user course and meeting feeds
+# build_meeting_url → same meeting_url as the meeting endpoints
 
 from auth import get_current_user, check_role
 # get_current_user → gets logged-in user from JWT token
 # check_role → checks if user has required role
 
-from schemas import UserResponse
+from schemas import UserResponse, Course as CourseSchema, FeedMeetingResponse
 # UserResponse → defines how user data will be returned in API response
+# CourseSchema / FeedMeetingResponse → format of the feed items
 
 from typing import List
 # List → used for returning multiple users
 
+from serializers import json_response, rows_to_dicts
+# json_response → fast JSON encoding for big lists (skips Pydantic validation)
+# rows_to_dicts → turns column-only query rows into dicts
+
 
 # Create a router for user-related endpoints
 router = APIRouter(
@@ -50,8 +58,8 @@ async def read_users_me(
 # GET ALL USERS (ADMIN ONLY)
 # =====================================
 @router.get("/", response_model=List[UserResponse])
-async def read_all_users(
-    db: Session = Depends(get_db),  # Get database connection
+def read_all_users(
+    db: Session = Depends(get_read_db),  # Get database connection
     admin_user: User = Depends(check_role([UserRole.ADMIN]))  # Only ADMIN can access
 ):
     """
@@ -59,5 +67,73 @@ async def read_all_users(
     Returns a list of all users in the system.
     """
 
-    # Fetch all users from database and return them
-    return db.query(User).all()
\ No newline at end of file
+    # Fetch only the needed columns (never the password) and encode them directly
+    # Output has the same format as UserResponse
+    rows = db.query(User.email, User.role, User.id).all()
+    return json_response(rows_to_dicts(rows, ["email", "role", "id"]))
+
+
+# =====================================
+# MY COURSES / MY MEETINGS (FEEDS)
+# =====================================
+
+# Dashboards only need what the user is enrolled in, not the whole catalog.
+# Each feed is ONE query that starts from the user's enrollments
+# (unique (user_id, course_id) index) and joins the courses / meetings by index,
+# so its cost and size depend on the user's courses, not on how many exist.
+
+@router.get("/me/courses", response_model=List[CourseSchema])
+def read_my_courses(
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Courses the logged-in user is enrolled in, in enrollment order.
+    """
+    rows = db.query(Course.title, Course.description, Course.id).join(
+        Enrollment, Enrollment.course_id == Course.id
+    ).filter(
+        Enrollment.user_id == current_user.id
+    ).order_by(Enrollment.id).all()
+    return json_response(rows_to_dicts(rows, ["title", "description", "id"]))
+
+
+@router.get("/me/meetings", response_model=List[FeedMeetingResponse])
+def read_my_meetings(
+    limit: int = Query(50, ge=1, le=200),  # newest first; a dashboard shows a page
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Meetings of the courses the logged-in user is enrolled in, newest first.
+    Same fields as GET /meetings/, plus the course title.
+    """
+    # enrollments (user_id, course_id) → meetings (course_id, created_at) → course by id
+    rows = db.query(
+        Meeting.title, Meeting.id, Meeting.room_id, Meeting.created_at,
+        Meeting.scheduled_start, Meeting.scheduled_end, Meeting.media_mode, Meeting.room_mode,
+        Meeting.course_id, Course.title
+    ).join(
+        Enrollment, Enrollment.course_id == Meeting.course_id
+    ).join(
+        Course, Course.id == Meeting.course_id
+    ).filter(
+        Enrollment.user_id == current_user.id
+    ).order_by(Meeting.created_at.desc(), Meeting.id.desc()).limit(limit).all()
+    return json_response([
+        {
+            "title": title,
+            "id": meeting_id,
+            "room_id": room_id,
+            "meeting_url": build_meeting_url(room_id),
+            "created_at": created_at,
+            "scheduled_start": scheduled_start,
+            "scheduled_end": scheduled_end,
+            "media_mode": media_mode,
+            "room_mode": room_mode,
+            "course_id": course_id,
+            "course_title": course_title
+        }
+        for (title, meeting_id, room_id, created_at, scheduled_start, scheduled_end,
+             media_mode, room_mode, course_id, course_title) in rows
+    ])
@@ -9,6 +9,16 @@ class UserRole(str, enum.Enum):
     TUTOR = "tutor"
     STUDENT = "student"
 
+# MediaMode - How media flows in a meeting (same values as in models)
+class MediaMode(str, enum.Enum):
+    MESH = "mesh"
+    SFU = "sfu"
+
+# RoomMode - Who is a participant (same values as in models)
+class RoomMode(str, enum.Enum):
+    MEETING = "meeting"
+    WEBINAR = "webinar"
+
 # UserBase - Base schema with common user fields
 class UserBase(BaseModel):
     email: EmailStr  # Email validation - must be valid format
@@ -34,6 +44,12 @@ class UserResponse(UserBase):
 class Token(BaseModel):
     access_token: str  # The JWT token to use for future requests
     token_type: str
+    refresh_token: Optional[str] = None  # Gets a new access token (POST /auth/refresh)
+    expires_in: Optional[int] = None     # Seconds the access token is valid
+
+# RefreshRequest - Schema for getting a new access token without the password
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 # TokenData - Schema for data extracted from JWT token
 class TokenData(BaseModel):
@@ -56,13 +72,28 @@ class Course(CourseBase):
     class Config:
         from_attributes = True
 
+# EnrollmentCreate - Schema for enrolling a user (by email) in a course
+class EnrollmentCreate(BaseModel):
+    email: EmailStr
+
+# EnrollmentResponse - Schema for one user in a course roster
+class EnrollmentResponse(BaseModel):
+    user_id: int
+    email: str
+    role: str
+    enrolled_at: datetime
+
 # MeetingBase - Base schema for meetings
 class MeetingBase(BaseModel):
     title: str
 
 # MeetingCreate - Schema for creating a new meeting
 class MeetingCreate(MeetingBase):
-    pass
+    scheduled_start: Optional[datetime] = None  # Optional - when the meeting starts
+    scheduled_end: Optional[datetime] = None    # Optional - when the meeting ends
+    media_mode: MediaMode = MediaMode.MESH      # "sfu" = media goes through the server
+    room_mode: RoomMode = RoomMode.MEETING      # "webinar" = students watch, hosts present
+    course_id: Optional[int] = None             # Optional - enrolled students see it in their feed
 
 # MeetingResponse - Schema for returning meeting info
 class MeetingResponse(MeetingBase):
@@ -70,6 +101,33 @@ class MeetingResponse(MeetingBase):
     room_id: str
     meeting_url: str
     created_at: datetime
+    scheduled_start: Optional[datetime] = None
+    scheduled_end: Optional[datetime] = None
+    media_mode: MediaMode = MediaMode.MESH
+    room_mode: RoomMode = RoomMode.MEETING
+    course_id: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+# FeedMeetingResponse - A meeting in /users/me/meetings (with its course title)
+class FeedMeetingResponse(MeetingResponse):
+    course_title: str
+
+# RecordingCreate - Schema for starting a recording upload
+class RecordingCreate(BaseModel):
+    meeting_id: int
+
+# RecordingResponse - Schema for returning recording info (chunk_count = next chunk to send)
+class RecordingResponse(BaseModel):
+    id: int
+    meeting_id: int
+    created_by: int
+    status: str
+    size: int
+    chunk_count: int
+    created_at: datetime
+    completed_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -0,0 +1,51 @@
+# used as fallback JSON encoder when orjson is not installed
+import json
+
+# used to detect dates that need converting to text
+from datetime import date, datetime
+
+# Response → send already-encoded JSON bytes directly (skips Pydantic)
+from fastapi.responses import Response
+
+# orjson is optional: a much faster JSON encoder written in Rust
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# =====================================
+# FAST JSON RESPONSES FOR BULK READS
+# =====================================
+
+# List endpoints normally do:
+#   ORM objects → Pydantic validation (from_attributes) → JSON
+# For big lists we instead query only the needed columns and encode
+# plain dicts directly. The output matches the response_model format.
+
+
+def _default(value):
+    # Convert values the standard json module cannot handle
+    if isinstance(value, datetime):
+        # Same format as Pydantic ("Z" for UTC)
+        return value.isoformat().replace("+00:00", "Z")
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(data) -> bytes:
+    # Encode data to JSON bytes using the fastest encoder available
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_UTC_Z)
+    return json.dumps(data, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+def json_response(data, status_code: int = 200) -> Response:
+    # Return data as a JSON response without going through response_model
+    return Response(content=dumps(data), status_code=status_code, media_type="application/json")
+
+
+def rows_to_dicts(rows, fields: list) -> list:
+    # Turn column-only query rows (tuples) into dicts with the given keys
+    return [dict(zip(fields, row)) for row in rows]
@@ -0,0 +1,225 @@
+# used to read server settings from environment variables
+import os
+
+# used to find out which optional speedups are installed
+import importlib.util
+
+# used for the threadpool autoscaler and to run several workers
+import asyncio
+import signal
+import subprocess
+import sys
+import time
+
+# used for type hinting
+from typing import Optional
+
+import uvicorn
+
+from dotenv import load_dotenv
+
+# Same settings as the app (.env)
+load_dotenv()
+
+# Tuned WebSocket compression (see compression.py)
+from compression import WS_DEFLATE, websocket_protocol
+
+# threadpool sizes are reported under "server.threadpool."
+import metrics
+
+
+# =====================================
+# SERVER SETTINGS
+# =====================================
+
+# Where to listen (with several workers, worker i listens on SERVER_PORT + i)
+SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8000"))
+
+# "auto" = uvloop / httptools when installed (pip install uvloop httptools),
+# otherwise asyncio / h11. Or name one: SERVER_LOOP=asyncio, SERVER_HTTP=h11
+SERVER_LOOP = os.getenv("SERVER_LOOP", "auto")
+SERVER_HTTP = os.getenv("SERVER_HTTP", "auto")
+
+# Worker processes: a number, or "auto" = one per CPU
+# Meeting rooms live in the memory of one worker, so every worker gets its own
+# port and the proxy sends each /ws/<room_id> to the same worker (see README)
+SERVER_WORKERS = os.getenv("SERVER_WORKERS", "1")
+
+# Connection handling
+SERVER_BACKLOG = int(os.getenv("SERVER_BACKLOG", "2048"))
+SERVER_KEEP_ALIVE = int(os.getenv("SERVER_KEEP_ALIVE", "5"))
+# Max open connections + WebSockets per worker before answering 503 (0 = no limit)
+SERVER_LIMIT_CONCURRENCY = int(os.getenv("SERVER_LIMIT_CONCURRENCY", "0"))
+# Seconds to let requests finish on shutdown
+SERVER_GRACEFUL_SHUTDOWN = int(os.getenv("SERVER_GRACEFUL_SHUTDOWN", "30"))
+
+# WebSocket limits (signaling frames are small: SDP offers are a few KB)
+WS_MAX_MESSAGE_BYTES = int(os.getenv("WS_MAX_MESSAGE_BYTES", str(1024 * 1024)))
+# Frames received but not yet read by the app, per socket
+WS_MAX_QUEUE = int(os.getenv("WS_MAX_QUEUE", "32"))
+# Ping every N seconds, drop sockets that don't answer within the timeout (0 = off)
+WS_PING_INTERVAL = float(os.getenv("WS_PING_INTERVAL", "20"))
+WS_PING_TIMEOUT = float(os.getenv("WS_PING_TIMEOUT", "20"))
+
+# Threads for blocking work (database, bcrypt, file writes) per worker.
+# The pool grows while calls are waiting for a thread and shrinks when idle.
+THREADPOOL_MIN = int(os.getenv("THREADPOOL_MIN", "8"))
+THREADPOOL_MAX = int(os.getenv("THREADPOOL_MAX", "64"))
+THREADPOOL_SCALE_INTERVAL = float(os.getenv("THREADPOOL_SCALE_INTERVAL", "1.0"))
+
+
+def installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def event_loop() -> str:
+    if SERVER_LOOP != "auto":
+        return SERVER_LOOP
+    return "uvloop" if installed("uvloop") else "asyncio"
+
+
+def http_parser() -> str:
+    if SERVER_HTTP != "auto":
+        return SERVER_HTTP
+    return "httptools" if installed("httptools") else "h11"
+
+
+def worker_count() -> int:
+    if SERVER_WORKERS == "auto":
+        return os.cpu_count() or 1
+    return max(1, int(SERVER_WORKERS))
+
+
+def server_config(port: int = SERVER_PORT) -> uvicorn.Config:
+    # Settings of one worker
+    return uvicorn.Config(
+        "main:app",
+        host=SERVER_HOST,
+        port=port,
+        loop=event_loop(),
+        http=http_parser(),
+        ws=websocket_protocol(),             # tuned permessage-deflate (see compression.py)
+        ws_per_message_deflate=WS_DEFLATE,   # WS_DEFLATE=0 turns WebSocket compression off
+        ws_max_size=WS_MAX_MESSAGE_BYTES,
+        ws_max_queue=WS_MAX_QUEUE,
+        ws_ping_interval=WS_PING_INTERVAL or None,
+        ws_ping_timeout=WS_PING_TIMEOUT or None,
+        backlog=SERVER_BACKLOG,
+        timeout_keep_alive=SERVER_KEEP_ALIVE,
+        limit_concurrency=SERVER_LIMIT_CONCURRENCY or None,
+        timeout_graceful_shutdown=SERVER_GRACEFUL_SHUTDOWN,
+    )
+
+
+# =====================================
+# THREADPOOL AUTOSCALING (started in main.py)
+# =====================================
+
+async def autoscale_threadpool():
+    # Background task: resize the threadpool (anyio's default limiter) to the load
+    # Calls waiting for a thread → double (up to THREADPOOL_MAX)
+    # Less than a quarter in use → shrink by a quarter (down to THREADPOOL_MIN)
+    from anyio.to_thread import current_default_thread_limiter
+
+    limiter = current_default_thread_limiter()
+    limiter.total_tokens = THREADPOOL_MIN
+    metrics.counters["server.threadpool.size"] = THREADPOOL_MIN
+    while True:
+        await asyncio.sleep(THREADPOOL_SCALE_INTERVAL)
+        stats = limiter.statistics()
+        size = limiter.total_tokens
+        if stats.tasks_waiting and size < THREADPOOL_MAX:
+            size = min(THREADPOOL_MAX, size * 2)
+        elif stats.borrowed_tokens < size // 4 and size > THREADPOOL_MIN:
+            size = max(THREADPOOL_MIN, size - size // 4)
+        if size != limiter.total_tokens:
+            limiter.total_tokens = size
+            metrics.inc("server.threadpool.resized")
+            # Current size (a gauge, set instead of added)
+            metrics.counters["server.threadpool.size"] = size
+
+
+# =====================================
+# RUN ONE OR SEVERAL WORKERS
+# =====================================
+
+def run_worker(port: int):
+    uvicorn.Server(server_config(port)).run()
+
+
+def shard_snapshot_path(shard: int) -> str:
+    # room_snapshot.json.gz → room_snapshot.<shard>.json.gz
+    folder, name = os.path.split(os.getenv("ROOM_SNAPSHOT_PATH", "room_snapshot.json.gz"))
+    base, _, extension = name.partition(".")
+    return os.path.join(folder, f"{base}.{shard}.{extension}".rstrip("."))
+
+
+def run_workers(count: int):
+    # Start one process per port, restart the ones that crash, stop all on Ctrl+C / SIGTERM
+    # Each worker is a fresh "python server.py --worker PORT" process, so the app is
+    # imported once per worker (not again as the parent's __main__, as with spawn)
+    # and its settings are in the environment before anything reads them
+    ports = [SERVER_PORT + i for i in range(count)]
+    processes = {}
+    stopping = False
+
+    def start(port: int):
+        # Each worker saves/restores only its own rooms on restart (see POST /signaling/drain)
+        env = dict(os.environ, ROOM_SNAPSHOT_PATH=shard_snapshot_path(port - SERVER_PORT))
+        # Course/meeting changes reach the /events/ streams of every worker
+        # (HTTP requests can go to any worker), unless EVENTS_STORE is set
+        env.setdefault("EVENTS_STORE", "sqlite:live_events.db")
+        processes[port] = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--worker", str(port)], env=env
+        )
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for port in ports:
+        start(port)
+    print(f"Started {count} workers on ports {ports[0]}-{ports[-1]}")
+
+    while not stopping:
+        time.sleep(0.5)
+        for port, process in list(processes.items()):
+            if process.poll() is not None and not stopping:
+                print(f"Worker on port {port} exited ({process.returncode}), restarting")
+                start(port)
+
+    # Workers drain their own requests (SERVER_GRACEFUL_SHUTDOWN)
+    for process in processes.values():
+        process.terminate()
+    for process in processes.values():
+        process.wait()
+
+
+def run(workers: Optional[int] = None):
+    workers = workers or worker_count()
+    print(f"Server: loop={event_loop()}, http={http_parser()}, workers={workers}, "
+          f"ws_max_size={WS_MAX_MESSAGE_BYTES}, ws_ping={WS_PING_INTERVAL or 'off'}")
+    if workers == 1:
+        run_worker(SERVER_PORT)
+    else:
+        run_workers(workers)
+
+
+# =====================================
+# RUN WITH: python server.py [workers]
+# =====================================
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--worker":
+        # One worker started by run_workers()
+        try:
+            run_worker(int(sys.argv[2]))
+        except KeyboardInterrupt:
+            # Ctrl+C reaches every worker too; uvicorn has already shut down gracefully
+            pass
+    else:
+        run(int(sys.argv[1]) if len(sys.argv) > 1 else None)
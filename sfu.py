@@ -0,0 +1,422 @@
+# used to read SFU settings from environment variables
+import os
+
+# used for per-participant negotiation locks and background closes
+import asyncio
+
+# used for the room clock that all forwarded media is timed on
+import time
+
+# counters for SFU sessions and renegotiations
+import metrics
+
+# The SFU is optional: it needs "aiortc" (pip install aiortc)
+# Without it, meetings can only use the normal full-mesh mode
+try:
+    from aiortc import RTCPeerConnection, RTCSessionDescription, RTCConfiguration, RTCIceServer, MediaStreamTrack
+    from aiortc.mediastreams import MediaStreamError
+    from aiortc.contrib.media import MediaRelay, MediaBlackhole
+except ImportError:
+    RTCPeerConnection = None
+
+
+# =====================================
+# SFU SETTINGS
+# =====================================
+
+# STUN servers used by the server side of each peer connection (comma separated)
+SFU_STUN_SERVERS = [s.strip() for s in os.getenv("SFU_STUN_SERVERS", "stun:stun.l.google.com:19302").split(",") if s.strip()]
+
+# Height of the "low" video layer sent to grid tiles (the "high" layer is the original)
+SFU_LOW_LAYER_HEIGHT = int(os.getenv("SFU_LOW_LAYER_HEIGHT", "180"))
+
+# Video layers a subscriber can choose per publisher
+LAYERS = ("high", "low")
+
+
+def sfu_available() -> bool:
+    return RTCPeerConnection is not None
+
+
+# =====================================
+# MEDIA TRACKS (forwarding + layers)
+# =====================================
+
+if RTCPeerConnection is not None:
+
+    class TimelineTrack(MediaStreamTrack):
+        """
+        A published track moved onto the room's clock. Every publisher starts at
+        its own random timestamp; on one shared timeline a subscriber's slot can
+        switch between publishers without its timestamps going backwards.
+        Frames are re-timed here ONCE, before the relay shares them with subscribers.
+        """
+
+        def __init__(self, source, epoch: float):
+            super().__init__()
+            self.kind = source.kind
+            self.source = source
+            self.epoch = epoch
+            self.offset = None
+
+        async def recv(self):
+            frame = await self.source.recv()
+            if self.offset is None:
+                now = int((time.monotonic() - self.epoch) / frame.time_base)
+                self.offset = now - frame.pts
+            frame.pts += self.offset
+            return frame
+
+        def stop(self):
+            super().stop()
+            self.source.stop()
+
+    class ForwardTrack(MediaStreamTrack):
+        """
+        Track on a subscriber's sender that forwards frames from a switchable source.
+        Switching publisher or layer never needs SDP renegotiation, and a free
+        ForwardTrack is reused for the next publisher (no new transceiver).
+        """
+
+        def __init__(self, kind: str):
+            super().__init__()
+            self.kind = kind
+            self.source = None          # relayed track of the current publisher/layer
+            self.publisher = None       # peer ID of the current publisher
+            self.layer = None           # "high"/"low" for video
+            self.changed = asyncio.Event()
+            self.last_pts = None
+
+        def switch(self, source, publisher=None, layer=None):
+            # The old source is stopped by recv() when its next frame arrives
+            # (a relayed track stopped from outside would leave recv() waiting forever)
+            self.source = source
+            self.publisher = publisher if source is not None else None
+            self.layer = layer
+            self.changed.set()
+
+        async def recv(self):
+            while True:
+                source = self.source
+                if source is None:
+                    # Free slot → wait until a publisher is assigned
+                    self.changed.clear()
+                    await self.changed.wait()
+                    continue
+                try:
+                    frame = await source.recv()
+                except MediaStreamError:
+                    # Source stopped (switched away or publisher left)
+                    if source is self.source:
+                        self.source = None
+                        self.publisher = None
+                    continue
+                if source is not self.source:
+                    # Arrived from a source that was switched out meanwhile
+                    source.stop()
+                    continue
+                # Frames are shared with other subscribers (never modify them).
+                # Right after a switch the new source can be a few ms behind → skip those frames
+                if self.last_pts is not None and frame.pts <= self.last_pts:
+                    continue
+                self.last_pts = frame.pts
+                return frame
+
+        def stop(self):
+            super().stop()
+            if self.source is not None:
+                self.source.stop()
+                self.source = None
+
+    class ScaledVideoTrack(MediaStreamTrack):
+        """Low layer: the publisher's video scaled down ONCE, shared by all subscribers."""
+
+        kind = "video"
+
+        def __init__(self, source, height: int):
+            super().__init__()
+            self.source = source
+            self.height = height
+
+        async def recv(self):
+            frame = await self.source.recv()
+            if frame.height <= self.height:
+                return frame
+            # Keep the aspect ratio (even width for the encoder)
+            width = int(frame.width * self.height / frame.height) // 2 * 2
+            scaled = frame.reformat(width=width, height=self.height)
+            scaled.pts = frame.pts
+            scaled.time_base = frame.time_base
+            return scaled
+
+        def stop(self):
+            super().stop()
+            self.source.stop()
+
+
+# =====================================
+# SFU STATE
+# =====================================
+
+class SfuPeer:
+    """One participant: the server end of their single peer connection."""
+
+    def __init__(self, peer_id: str, send):
+        self.peer_id = peer_id
+        # async function that sends a signaling message to this participant
+        self.send = send
+        ice_servers = [RTCIceServer(urls=SFU_STUN_SERVERS)] if SFU_STUN_SERVERS else []
+        self.pc = RTCPeerConnection(RTCConfiguration(iceServers=ice_servers))
+
+        # What this participant publishes: { "audio": track, "video": track }
+        self.tracks = {}
+        # Video layers made from self.tracks["video"]: { "high": track, "low": ScaledVideoTrack }
+        self.layers = {}
+        # Keeps received media flowing when nobody is subscribed yet
+        self.blackhole = MediaBlackhole()
+
+        # What this participant receives: { (publisher_id, kind): ForwardTrack }
+        self.outgoing = {}
+        # ForwardTracks without a publisher, ready for reuse: { "audio": [...], "video": [...] }
+        self.free = {"audio": [], "video": []}
+        # Layers picked by this participant (otherwise presenter → high, others → low)
+        self.layer_choice = {}
+
+        # One offer/answer exchange at a time
+        self.lock = asyncio.Lock()
+        self.needs_offer = False
+
+    def track_map(self) -> dict:
+        # Which publisher each transceiver (mid) carries, so the client can build its tiles
+        result = {}
+        for transceiver in self.pc.getTransceivers():
+            track = transceiver.sender.track
+            if transceiver.mid is not None and isinstance(track, ForwardTrack) and track.publisher:
+                result[transceiver.mid] = {"publisher": track.publisher, "kind": track.kind}
+        return result
+
+
+class SfuRoom:
+    def __init__(self):
+        # peer_id → SfuPeer
+        self.peers = {}
+        # Fans one source track out to many subscribers (each layer is produced once)
+        self.relay = MediaRelay()
+        self.presenter = None
+        # Start of the room's media clock (see TimelineTrack)
+        self.epoch = time.monotonic()
+
+
+class SfuManager:
+    """
+    Selective forwarding for meetings with media_mode "sfu".
+    Each participant sends its media ONCE to the server, which forwards it to
+    everyone else. Grid tiles get the low layer, the presenter the high layer.
+    """
+
+    def __init__(self):
+        # room_id → SfuRoom
+        self.rooms = {}
+
+    # ---------- signaling from clients ----------
+
+    async def offer(self, room_id: str, peer_id: str, sdp: str, send, presenter=None, publish: bool = True):
+        # Client starts (or restarts) its SFU connection with an offer carrying its camera/mic
+        # publish=False: receive only (webinar viewers) - anything they send is dropped here
+        room = self.rooms.get(room_id)
+        if room is None:
+            room = self.rooms[room_id] = SfuRoom()
+            room.presenter = presenter
+
+        if peer_id in room.peers:
+            await self.remove(room_id, peer_id)
+            room = self.rooms.setdefault(room_id, room)
+
+        peer = room.peers[peer_id] = SfuPeer(peer_id, send)
+        metrics.inc("sfu.sessions")
+
+        @peer.pc.on("track")
+        def on_track(track):
+            if not publish:
+                peer.blackhole.addTrack(track)
+                return
+            # New published track → forward it to everyone else in the room
+            track = TimelineTrack(track, room.epoch)
+            peer.tracks[track.kind] = track
+            peer.blackhole.addTrack(room.relay.subscribe(track, buffered=False))
+            asyncio.ensure_future(self._publish(room, peer, track.kind))
+
+        @peer.pc.on("connectionstatechange")
+        async def on_state():
+            if peer.pc.connectionState == "failed" and room.peers.get(peer_id) is peer:
+                await self.remove(room_id, peer_id)
+                await send({"type": "sfu-closed"})
+
+        async with peer.lock:
+            await peer.pc.setRemoteDescription(RTCSessionDescription(sdp=sdp, type="offer"))
+            await peer.blackhole.start()
+            answer = await peer.pc.createAnswer()
+            await peer.pc.setLocalDescription(answer)
+            message = {"type": "sfu-answer", "sdp": peer.pc.localDescription.sdp, "tracks": peer.track_map()}
+        await send(message)
+
+        # Now subscribe to everyone already publishing (new transceivers → one server offer)
+        for other in list(room.peers.values()):
+            if other is not peer:
+                for kind in other.tracks:
+                    self._forward(room, other, kind, peer)
+        await self._negotiate(peer)
+
+    async def answer(self, room_id: str, peer_id: str, sdp: str):
+        # Client answers an offer the server sent (after tracks were added)
+        peer = self._peer(room_id, peer_id)
+        if peer is None:
+            return
+        async with peer.lock:
+            if peer.pc.signalingState != "have-local-offer":
+                return
+            await peer.pc.setRemoteDescription(RTCSessionDescription(sdp=sdp, type="answer"))
+        # More tracks may have been added while we waited for this answer
+        await self._negotiate(peer)
+
+    async def set_layer(self, room_id: str, peer_id: str, publisher_id: str, layer):
+        # Client picks a layer for one publisher (None = automatic)
+        room = self.rooms.get(room_id)
+        peer = self._peer(room_id, peer_id)
+        if peer is None or (layer is not None and layer not in LAYERS):
+            return
+        if layer is None:
+            peer.layer_choice.pop(publisher_id, None)
+        else:
+            peer.layer_choice[publisher_id] = layer
+        publisher = room.peers.get(publisher_id)
+        if publisher is not None and "video" in publisher.tracks:
+            self._forward(room, publisher, "video", peer)
+            await self._negotiate(peer)
+
+    def set_presenter(self, room_id: str, presenter):
+        # Presenter changed → they get the high layer everywhere, the old one goes back to low
+        room = self.rooms.get(room_id)
+        if room is None or room.presenter == presenter:
+            return
+        changed = {room.presenter, presenter} - {None}
+        room.presenter = presenter
+        for publisher_id in changed:
+            publisher = room.peers.get(publisher_id)
+            if publisher is None or "video" not in publisher.tracks:
+                continue
+            for peer in room.peers.values():
+                if peer is not publisher:
+                    self._forward(room, publisher, "video", peer)
+                    if peer.needs_offer:
+                        asyncio.ensure_future(self._negotiate(peer))
+
+    # ---------- leaving ----------
+
+    def discard(self, room_id: str, peer_id: str):
+        # Called when a participant leaves the meeting (see ConnectionManager._track)
+        room = self.rooms.get(room_id)
+        if room is not None and peer_id in room.peers:
+            asyncio.ensure_future(self.remove(room_id, peer_id))
+
+    async def remove(self, room_id: str, peer_id: str):
+        room = self.rooms.get(room_id)
+        peer = room.peers.pop(peer_id, None) if room else None
+        if peer is None:
+            return
+
+        # Free this publisher's slots on every subscriber (kept for the next publisher)
+        for other in list(room.peers.values()):
+            changed = False
+            for kind in ("audio", "video"):
+                track = other.outgoing.pop((peer_id, kind), None)
+                if track is not None:
+                    track.switch(None)
+                    other.free[kind].append(track)
+                    changed = True
+            if changed:
+                await other.send({"type": "sfu-tracks", "tracks": other.track_map()})
+
+        for track in peer.outgoing.values():
+            track.stop()
+        for track in peer.layers.values():
+            if isinstance(track, ScaledVideoTrack):
+                track.stop()
+        await peer.blackhole.stop()
+        await peer.pc.close()
+
+        if not room.peers:
+            del self.rooms[room_id]
+
+    # ---------- internals ----------
+
+    def _peer(self, room_id: str, peer_id: str):
+        room = self.rooms.get(room_id)
+        return room.peers.get(peer_id) if room else None
+
+    def _layer(self, room: SfuRoom, publisher: SfuPeer, subscriber: SfuPeer) -> str:
+        choice = subscriber.layer_choice.get(publisher.peer_id)
+        if choice is not None:
+            return choice
+        return "high" if room.presenter == publisher.peer_id else "low"
+
+    def _source(self, room: SfuRoom, publisher: SfuPeer, kind: str, layer):
+        # New relayed copy of a publisher's track (video: of the wanted layer)
+        if kind == "audio":
+            return room.relay.subscribe(publisher.tracks["audio"], buffered=False)
+        if layer not in publisher.layers:
+            original = publisher.tracks["video"]
+            publisher.layers[layer] = original if layer == "high" else ScaledVideoTrack(
+                room.relay.subscribe(original, buffered=False), SFU_LOW_LAYER_HEIGHT
+            )
+        return room.relay.subscribe(publisher.layers[layer], buffered=False)
+
+    def _forward(self, room: SfuRoom, publisher: SfuPeer, kind: str, subscriber: SfuPeer):
+        # Make "subscriber" receive "publisher"'s track (or switch it to the right layer)
+        if subscriber.pc.signalingState == "have-remote-offer":
+            # Subscriber is answering its own offer right now; offer() subscribes it afterwards
+            return
+        layer = self._layer(room, publisher, subscriber) if kind == "video" else None
+        key = (publisher.peer_id, kind)
+        track = subscriber.outgoing.get(key)
+        if track is not None and track.layer == layer and track.source is not None:
+            return
+
+        if track is None:
+            if subscriber.free[kind]:
+                track = subscriber.free[kind].pop()
+            else:
+                # No free slot → new transceiver, needs an offer
+                track = ForwardTrack(kind)
+                subscriber.pc.addTrack(track)
+                subscriber.needs_offer = True
+            subscriber.outgoing[key] = track
+
+        track.switch(self._source(room, publisher, kind, layer), publisher.peer_id, layer)
+
+    async def _publish(self, room: SfuRoom, publisher: SfuPeer, kind: str):
+        # Forward a newly published track to every other participant
+        for peer in list(room.peers.values()):
+            if peer is not publisher and room.peers.get(peer.peer_id) is peer:
+                self._forward(room, publisher, kind, peer)
+                await self._negotiate(peer)
+
+    async def _negotiate(self, peer: SfuPeer):
+        # Send an offer if transceivers were added, otherwise just the new track map
+        async with peer.lock:
+            if peer.pc.signalingState != "stable":
+                # Still waiting for an answer → answer() calls us again
+                return
+            if peer.needs_offer:
+                peer.needs_offer = False
+                offer = await peer.pc.createOffer()
+                await peer.pc.setLocalDescription(offer)
+                metrics.inc("sfu.renegotiations")
+                message = {"type": "sfu-offer", "sdp": peer.pc.localDescription.sdp, "tracks": peer.track_map()}
+            else:
+                message = {"type": "sfu-tracks", "tracks": peer.track_map()}
+        await peer.send(message)
+
+
+# Global SFU used by the signaling WebSocket route
+sfu = SfuManager()
@@ -1,12 +1,271 @@
 # used to generate unique IDs for users
 import uuid
 
+# used to read room lifecycle settings from environment variables
+import os
+
+# used for the room scheduler and delayed teardown timers
+import asyncio
+import datetime
+import time
+
+# used for the LRU meeting cache (keeps most recently used rooms)
+# and the per-peer replay buffer (keeps the most recent messages)
+from collections import OrderedDict, deque
+
+# used to save/restore room state across restarts (compact gzip'd JSON)
+import gzip
+import json
+
 # used for type hinting (better readability & autocomplete)
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 # WebSocket object used to send/receive real-time messages
 from fastapi import WebSocket
 
+# run blocking DB queries without freezing the event loop
+from starlette.concurrency import run_in_threadpool
+
+# and_/or_ → the "upcoming meetings" filter runs in SQL
+from sqlalchemy import and_, or_
+
+# database session + meeting table (rooms are tied to meetings)
+from database import SessionLocal
+from models import Meeting, UserRole
+
+# same JWT check as the HTTP API (auth.get_current_user)
+# encode_token/decode_token also sign resume tokens (same rotating keys)
+from auth import get_user_from_token, encode_token, decode_token
+from jose import JWTError
+
+# per-room rate limit buckets are freed together with the room
+from ratelimit import rate_limiter
+
+# meetings are created/deleted by endpoints running in worker threads
+from events import call_on_loop
+
+# live room counters + batched attendance log (join/leave per user)
+from analytics import RoomStats, attendance_log
+
+# server-side media relay for meetings in "sfu" mode (closed when a participant leaves)
+from sfu import sfu
+
+# active speaker + who sends video (stream priority hints)
+from priority import SpeakerRanking, PRIORITY_MIN_INTERVAL
+
+
+# =====================================
+# ROOM LIFECYCLE SETTINGS
+# =====================================
+
+# How long an empty room is kept (chat, presenter ...) before it is deleted
+# This way a short "everyone dropped" network blip doesn't lose the room
+ROOM_GRACE_SECONDS = int(os.getenv("ROOM_GRACE_SECONDS", "120"))
+
+# Scheduled meetings get their room created this many seconds before start
+ROOM_PREWARM_SECONDS = int(os.getenv("ROOM_PREWARM_SECONDS", "300"))
+
+# How often the scheduler checks for meetings that are about to start
+ROOM_SCHEDULER_INTERVAL = int(os.getenv("ROOM_SCHEDULER_INTERVAL", "30"))
+
+# How many meetings the room_id → meeting cache keeps
+MEETING_CACHE_SIZE = int(os.getenv("MEETING_CACHE_SIZE", "1024"))
+
+# How long an unknown room_id is remembered as "not found" (seconds)
+MEETING_CACHE_MISS_TTL = int(os.getenv("MEETING_CACHE_MISS_TTL", "30"))
+
+# How long a found meeting is trusted before it is read again (seconds)
+# With several workers, a meeting deleted through another worker is refused after this
+MEETING_CACHE_TTL = int(os.getenv("MEETING_CACHE_TTL", "60"))
+
+
+# Where room state is saved when the server drains before a restart
+# (read when used, not at import: each worker of server.py gets its own file)
+def room_snapshot_path() -> str:
+    return os.getenv("ROOM_SNAPSHOT_PATH", "room_snapshot.json.gz")
+
+# How long a resume token can be used to rejoin without the waiting room
+RESUME_TOKEN_SECONDS = int(os.getenv("RESUME_TOKEN_SECONDS", "300"))
+
+# How long an approved peer's slot is kept after their socket drops
+# (reconnecting within this window skips join/leave broadcasts)
+RESUME_WINDOW_SECONDS = int(os.getenv("RESUME_WINDOW_SECONDS", "20"))
+
+# How many messages are kept for a dropped peer to replay on resume
+RESUME_BUFFER_SIZE = int(os.getenv("RESUME_BUFFER_SIZE", "200"))
+
+# Auto-admit policy (comma separated). Example: AUTO_ADMIT_ROLES=tutor AUTO_ADMIT_DOMAINS=school.edu
+# Matching users skip the waiting room; admins can change it per room with "set-auto-admit"
+AUTO_ADMIT_ROLES = [r.strip() for r in os.getenv("AUTO_ADMIT_ROLES", "").split(",") if r.strip()]
+AUTO_ADMIT_DOMAINS = [d.strip().lower() for d in os.getenv("AUTO_ADMIT_DOMAINS", "").split(",") if d.strip()]
+
+# Auto-admitted users arriving within this window are admitted together
+# (one roster update instead of one per student at lecture start)
+AUTO_ADMIT_BATCH_SECONDS = float(os.getenv("AUTO_ADMIT_BATCH_SECONDS", "0.25"))
+
+# Webinars: viewer count + stage changes are sent to everyone at most once per interval
+# (viewers joining/leaving never send anything by themselves)
+AUDIENCE_INTERVAL = float(os.getenv("AUDIENCE_INTERVAL", "2.0"))
+
+
+def utcnow():
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def as_utc(value):
+    # SQLite returns dates without timezone → treat them as UTC
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=datetime.timezone.utc)
+    return value
+
+
+def meeting_to_dict(meeting: Meeting) -> dict:
+    # Plain copy of the meeting row (safe to keep after the DB session closes)
+    return {
+        "id": meeting.id,
+        "title": meeting.title,
+        "room_id": meeting.room_id,
+        "created_by": meeting.created_by,
+        "media_mode": meeting.media_mode,
+        "room_mode": meeting.room_mode,
+        "scheduled_start": as_utc(meeting.scheduled_start),
+        "scheduled_end": as_utc(meeting.scheduled_end)
+    }
+
+
+def load_meeting(room_id: str) -> Optional[dict]:
+    # Find the meeting for a room (blocking → call through run_in_threadpool)
+    db = SessionLocal()
+    try:
+        meeting = db.query(Meeting).filter(Meeting.room_id == room_id).first()
+        return meeting_to_dict(meeting) if meeting else None
+    finally:
+        db.close()
+
+
+def load_identity(token: str) -> Optional[dict]:
+    # Check the JWT from the WebSocket URL (from the token claims: no database query,
+    # except once for tokens issued before the claims had "uid")
+    # Returns the stable user ID (email, same as the frontend uses) and room role
+    user = get_user_from_token(token)
+    if user is None:
+        return None
+    return {
+        "user_id": user.email,
+        # Admins host the room, everyone else goes through the waiting room
+        "role": "admin" if user.role == UserRole.ADMIN else "student",
+        # Real account role (used by the auto-admit policy)
+        "user_role": user.role
+    }
+
+
+# =====================================
+# RESUME TOKENS
+# =====================================
+
+def create_resume_token(room_id: str, user_id: str, approved: bool, session: Optional[str] = None) -> str:
+    # Short-lived signed proof that this user was in this room
+    # "sid" ties the token to one peer slot (only the newest token can re-attach)
+    claims = {
+        "typ": "resume",
+        "room": room_id,
+        "sub": user_id,
+        "approved": approved,
+        "exp": utcnow() + datetime.timedelta(seconds=RESUME_TOKEN_SECONDS)
+    }
+    if session:
+        claims["sid"] = session
+    return encode_token(claims)
+
+
+def read_resume_token(room_id: str, user_id: str, token: Optional[str]) -> Optional[dict]:
+    # Returns the token claims if it is valid for THIS room and THIS user
+    if not token:
+        return None
+    try:
+        claims = decode_token(token)
+    except JWTError:
+        return None
+    if claims.get("typ") != "resume" or claims.get("room") != room_id or claims.get("sub") != user_id:
+        return None
+    return claims
+
+
+# =====================================
+# MEETING LOOKUP CACHE (LRU)
+# =====================================
+
+class MeetingCache:
+    """
+    room_id → meeting dict, keeping only the MEETING_CACHE_SIZE most recently used.
+    Meetings are cached for MEETING_CACHE_TTL seconds. Unknown room IDs are cached
+    as None for MEETING_CACHE_MISS_TTL seconds, so random room IDs can't make us
+    query the DB on every attempt.
+    """
+
+    def __init__(self, maxsize: int = MEETING_CACHE_SIZE, miss_ttl: int = MEETING_CACHE_MISS_TTL,
+                 ttl: int = MEETING_CACHE_TTL):
+        self.maxsize = maxsize
+        self.miss_ttl = miss_ttl
+        self.ttl = ttl
+        # room_id → (meeting or None, expires_at)
+        self.entries = OrderedDict()
+        # Event loop the cache is used from
+        self.loop = None
+
+    async def get(self, room_id: str) -> Optional[dict]:
+        self.loop = asyncio.get_running_loop()
+        entry = self.entries.get(room_id)
+        if entry is not None:
+            meeting, expires_at = entry
+            if expires_at > time.monotonic():
+                self.entries.move_to_end(room_id)
+                return meeting
+            del self.entries[room_id]
+
+        # Not cached → ask the database
+        meeting = await run_in_threadpool(load_meeting, room_id)
+        expires_at = time.monotonic() + (self.ttl if meeting is not None else self.miss_ttl)
+        self.entries[room_id] = (meeting, expires_at)
+        self.entries.move_to_end(room_id)
+
+        # Too many entries → drop the least recently used one
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return meeting
+
+    def invalidate(self, room_id: str):
+        # Call when a meeting is created/deleted so the next lookup is fresh
+        # (on the event loop: lookups there may be using the entries right now)
+        call_on_loop(self.loop, self.entries.pop, room_id, None)
+
+
+# Global cache used by ConnectionManager.get_meeting
+meeting_cache = MeetingCache()
+
+
+def load_upcoming_meetings(window_seconds: int) -> List[dict]:
+    # Meetings that start within the next window_seconds and haven't ended yet
+    # Without an end time a meeting counts as over ROOM_GRACE_SECONDS after its start
+    # (the room is torn down then; it must not be pre-warmed again on the next check)
+    now = utcnow()
+    db = SessionLocal()
+    try:
+        meetings = db.query(Meeting).filter(
+            Meeting.scheduled_start != None,
+            Meeting.scheduled_start <= now + datetime.timedelta(seconds=window_seconds),
+            or_(
+                Meeting.scheduled_end > now,
+                and_(
+                    Meeting.scheduled_end == None,
+                    Meeting.scheduled_start >= now - datetime.timedelta(seconds=ROOM_GRACE_SECONDS)
+                )
+            )
+        ).all()
+        return [meeting_to_dict(meeting) for meeting in meetings]
+    finally:
+        db.close()
+
 
 class ConnectionManager:
     def __init__(self):
@@ -22,24 +281,81 @@ class ConnectionManager:
         #               "role": str
         #           }
         #       },
+        #       (approved peers also get "session" → ID inside their resume token;
+        #        while a peer is dropped: "socket" is None and "buffer" holds missed messages)
         #       "presenter": peer_id,
-        #       "messages": []
+        #       "messages": [],
+        #       "admins": set(),        # peer IDs of admins currently in "peers"
+        #       "meeting": { ... },     # cached meeting row (see meeting_to_dict)
+        #       "teardown": TimerHandle # pending delete while the room is empty
+        #       "resumable": {          # approved users restored from a snapshot
+        #           peer_id: {"username": str, "role": str}
+        #       },
+        #       "auto_admit": {"roles": set(), "domains": set()},
+        #       "auto_pending": [peer_id, ...],
+        #       "speakers": SpeakerRanking,    # active speaker + stream priority
+        #       "viewers": {            # webinar attendees (watch only, not in "peers")
+        #           peer_id: (WebSocket, username)
+        #       },
+        #       "audience": {"scheduled": bool, "last": dict}  # last "audience" update sent
         #   }
         # }
         self.rooms: Dict[str, dict] = {}
 
-    async def connect(self, room_id: str, websocket: WebSocket):
-        # Accept the WebSocket connection
-        await websocket.accept()
-        
-        # If room doesn't exist, create it
+        # True while the server is draining for a restart (no new connections)
+        self.draining = False
+
+        # Global index of every user with a session, in ANY room
+        # sessions = { peer_id: (room_id, WebSocket or None while dropped) }
+        # Kept up to date by move_to_waiting, add_to_peers, disconnect, detach and resume
+        self.sessions: Dict[str, tuple] = {}
+
+        # Counters of rooms that have at least one user (peers or waiting)
+        # live = { room_id: RoomStats }
+        # Updated by _track on every enter/leave, so analytics never scan rooms
+        self.live: Dict[str, RoomStats] = {}
+
+        # CONCURRENCY RULE: rooms, sessions and live are only changed by code that
+        # does not await between reading and writing them (the event loop runs it
+        # as one step, like holding a per-room lock). Sends/closes happen AFTER the
+        # change, using values captured before it. A handler that awaits and then
+        # changes the roster must re-check the state it read before the await.
+        # check_consistency() verifies this (see benchmarks/stress_rooms.py).
+
+    def ensure_room(self, room_id: str, meeting: dict):
+        # Create the room state if it doesn't exist yet (also used for pre-warming)
         if room_id not in self.rooms:
             self.rooms[room_id] = {
                 "peers": {},        # approved users
                 "waiting": {},      # users waiting for approval
                 "presenter": None,
-                "messages": []
+                "messages": [],
+                "admins": set(),
+                "meeting": meeting,
+                "teardown": None,
+                "resumable": {},
+                "auto_admit": {"roles": set(AUTO_ADMIT_ROLES), "domains": set(AUTO_ADMIT_DOMAINS)},
+                "auto_pending": [],     # auto-admitted users waiting for the next batch
+                "speakers": SpeakerRanking(),
+                "viewers": {},
+                "audience": {"scheduled": False, "last": None}
             }
+        else:
+            # Someone is (re)joining → cancel any pending delete
+            self._cancel_teardown(room_id)
+        return self.rooms[room_id]
+
+    async def get_meeting(self, room_id: str) -> Optional[dict]:
+        # Through the cache even when the room is open: a meeting deleted through
+        # another worker can't be joined after MEETING_CACHE_TTL seconds
+        return await meeting_cache.get(room_id)
+
+    async def connect(self, room_id: str, websocket: WebSocket, meeting: dict):
+        # Accept the WebSocket connection
+        await websocket.accept()
+        
+        # Create the room (or keep the existing one alive)
+        self.ensure_room(room_id, meeting)
         
         # We assign a temporary ID until the 'join' message provides the stable ID
         temp_peer_id = str(uuid.uuid4())
@@ -55,70 +371,209 @@ class ConnectionManager:
     async def move_to_waiting(self, room_id: str, peer_id: str, websocket: WebSocket, username: str, role: str):
         # Add user to waiting list, replacing existing session if found
         if room_id in self.rooms:
-            # Check if this user already has a session (anywhere)
-            await self._ensure_single_session(room_id, peer_id)
+            # End any other session of this user (anywhere) - roster only, no I/O yet
+            replaced = self._end_old_session(peer_id)
+            self._cancel_teardown(room_id)
             
+            is_new = peer_id not in self.rooms[room_id]["waiting"]
             self.rooms[room_id]["waiting"][peer_id] = {
                 "socket": websocket,
                 "username": username,
                 "role": role
             }
+            self.sessions[peer_id] = (room_id, websocket)
+            if is_new:
+                self._track(room_id, peer_id, "waiting", 1)
+
+            await self._notify_replaced(room_id, peer_id, replaced)
 
     async def add_to_peers(self, room_id: str, peer_id: str, websocket: WebSocket, username: str, role: str):
         # Add user to approved peers list, replacing existing session if found
         if room_id in self.rooms:
-            # Check if this user already has a session (anywhere)
-            await self._ensure_single_session(room_id, peer_id)
+            # End any other session of this user (anywhere) - roster only, no I/O yet
+            replaced = self._end_old_session(peer_id)
+            self._cancel_teardown(room_id)
             
+            is_new = peer_id not in self.rooms[room_id]["peers"]
             self.rooms[room_id]["peers"][peer_id] = {
                 "socket": websocket,
                 "username": username,
                 "role": role
             }
+            if role == "admin":
+                self.rooms[room_id]["admins"].add(peer_id)
+            self.sessions[peer_id] = (room_id, websocket)
+            if is_new:
+                self._track(room_id, peer_id, "peers", 1)
+                self._schedule_priority(room_id)
 
-    async def _ensure_single_session(self, room_id: str, peer_id: str):
-        """Internal helper to close any existing session for a user ID."""
-        if room_id not in self.rooms:
-            return
+            await self._notify_replaced(room_id, peer_id, replaced)
 
-        # Check peers
-        if peer_id in self.rooms[room_id]["peers"]:
-            old_info = self.rooms[room_id]["peers"][peer_id]
-            
-            # If the session we're replacing was the presenter, clear it
-            if self.rooms[room_id].get("presenter") == peer_id:
-                self.rooms[room_id]["presenter"] = None
+    def _track(self, room_id: str, peer_id: str, status: str, delta: int, moving: bool = False):
+        # Update the live counters when a user enters (+1) or leaves (-1) "peers"/"waiting"/"viewers"
+        # moving=True: webinar stage change (viewer ↔ speaker), not a join/leave of the meeting
+        stats = self.live.get(room_id)
+        if stats is None:
+            if delta < 0:
+                return
+            stats = self.live[room_id] = RoomStats()
 
-            try:
-                await old_info["socket"].send_json({
-                    "type": "kicked",
-                    "reason": "session-replaced",
-                    "message": "You joined from another tab. This session has been disconnected."
-                })
-                await old_info["socket"].close()
-            except Exception:
-                pass
-            del self.rooms[room_id]["peers"][peer_id]
+        if status == "peers":
+            stats.peers += delta
+            if delta > 0:
+                stats.joins += 1
+                stats.peak_peers = max(stats.peak_peers, stats.peers)
+        elif status == "viewers":
+            stats.viewers += delta
+            if delta > 0:
+                stats.peak_viewers = max(stats.peak_viewers, stats.viewers)
+        else:
+            stats.waiting += delta
+
+        if status != "waiting":
+            self._schedule_audience(room_id)
+            if not moving:
+                # Approved participants and viewers are the attendance (waiting room is not)
+                meeting = self.rooms[room_id]["meeting"] or {}
+                attendance_log.record(meeting.get("id"), peer_id, "join" if delta > 0 else "leave")
+                # Left the meeting → close their SFU connection too
+                if delta < 0:
+                    sfu.discard(room_id, peer_id)
+
+        # Last user left → the live session of this room is over
+        if stats.peers <= 0 and stats.waiting <= 0 and stats.viewers <= 0:
+            del self.live[room_id]
+
+    def record_message(self, room_id: str, msg_type):
+        # Count a signaling message for the room's message rate
+        stats = self.live.get(room_id)
+        if stats is not None:
+            stats.record_message(msg_type)
+
+    def _end_old_session(self, peer_id: str) -> Optional[tuple]:
+        """
+        Remove any existing session of a user ID (in ANY room) from the roster.
+        Returns (old room ID, old socket, was removed) for _notify_replaced, or None.
+        """
+        # O(1) lookup in the global index instead of scanning rooms
+        session = self.sessions.get(peer_id)
+        if session is None:
+            return None
+
+        old_room_id, old_socket = session
+        if old_room_id not in self.rooms:
+            del self.sessions[peer_id]
+            return None
+
+        # Remove the old session (also clears presenter/admin state)
+        # A webinar viewer leaving is not announced (see _notify_replaced)
+        was_viewer = peer_id in self.rooms[old_room_id]["viewers"]
+        removed = self.disconnect(old_room_id, peer_id, old_socket) and not was_viewer
+        return old_room_id, old_socket, removed
 
-        # Check waiting
-        if peer_id in self.rooms[room_id]["waiting"]:
-            old_info = self.rooms[room_id]["waiting"][peer_id]
+    async def _notify_replaced(self, room_id: str, peer_id: str, replaced: Optional[tuple]):
+        # Network part of replacing a session (after the roster already changed)
+        if replaced is None:
+            return
+        old_room_id, old_socket, removed = replaced
+
+        # Tell the old tab why it is being disconnected (dropped sessions have no socket)
+        if old_socket is not None:
             try:
-                await old_info["socket"].send_json({
+                await old_socket.send_json({
                     "type": "kicked",
                     "reason": "session-replaced",
                     "message": "You joined from another tab. This session has been disconnected."
                 })
-                await old_info["socket"].close()
+                await old_socket.close()
             except Exception:
                 pass
-            del self.rooms[room_id]["waiting"][peer_id]
+
+        # The old session was in another room → people there must see them leave
+        if removed and old_room_id != room_id:
+            await self.announce_leave(old_room_id, peer_id)
+
+    def holds_slot(self, room_id: str, peer_id: str, websocket: WebSocket) -> bool:
+        # Is this socket still the user's session? (re-check after an await)
+        return self.sessions.get(peer_id) == (room_id, websocket)
+
+    def check_consistency(self) -> list:
+        # Problems in the room state (empty list = consistent). Used by benchmarks/stress_rooms.py
+        problems = []
+        for room_id, room in self.rooms.items():
+            peers, waiting, viewers = room["peers"], room["waiting"], room["viewers"]
+            for peer_id in peers.keys() & waiting.keys():
+                problems.append(f"{room_id}: {peer_id} is both approved and waiting")
+            for peer_id in viewers.keys() & (peers.keys() | waiting.keys()):
+                problems.append(f"{room_id}: {peer_id} is both a viewer and in the meeting")
+            for peer_id in room["admins"] - peers.keys():
+                problems.append(f"{room_id}: admin {peer_id} is not a peer")
+            if room["presenter"] is not None and room["presenter"] not in peers:
+                problems.append(f"{room_id}: presenter {room['presenter']} is not a peer")
+            for status, users in (("peers", peers), ("waiting", waiting)):
+                for peer_id, info in users.items():
+                    if self.sessions.get(peer_id) != (room_id, info["socket"]):
+                        problems.append(f"{room_id}: {peer_id} ({status}) is missing from the session index")
+            for peer_id, (socket, _) in viewers.items():
+                if self.sessions.get(peer_id) != (room_id, socket):
+                    problems.append(f"{room_id}: {peer_id} (viewers) is missing from the session index")
+            stats = self.live.get(room_id)
+            counts = (stats.peers, stats.waiting, stats.viewers) if stats else (0, 0, 0)
+            if counts != (len(peers), len(waiting), len(viewers)):
+                problems.append(f"{room_id}: live counters {counts} != ({len(peers)}, {len(waiting)}, {len(viewers)})")
+        for peer_id, (room_id, socket) in self.sessions.items():
+            # (False never matches: dropped peers keep their slot with socket None)
+            if self._socket_of(room_id, peer_id, default=False) is not socket:
+                problems.append(f"session of {peer_id} points to a missing slot in {room_id}")
+        for room_id in self.live.keys() - self.rooms.keys():
+            problems.append(f"{room_id}: live counters for a deleted room")
+        return problems
+
+    def _socket_of(self, room_id: str, peer_id: str, default=None):
+        # Socket of a user's slot in a room (peers, waiting or viewers), or default if there is none
+        room = self.rooms.get(room_id)
+        if room is None:
+            return default
+        info = room["peers"].get(peer_id) or room["waiting"].get(peer_id)
+        if info is not None:
+            return info["socket"]
+        viewer = room["viewers"].get(peer_id)
+        return viewer[0] if viewer is not None else default
+
+    def locate(self, peer_id: str) -> Optional[dict]:
+        # Where is this user right now? (admin "find user" query)
+        session = self.sessions.get(peer_id)
+        if session is None or session[0] not in self.rooms:
+            return None
+        room_id, socket = session
+        room = self.rooms[room_id]
+        if peer_id in room["peers"]:
+            status = "connected" if socket is not None else "reconnecting"
+        elif peer_id in room["viewers"]:
+            status = "viewing"
+        else:
+            status = "waiting"
+        return {"userId": peer_id, "room_id": room_id, "status": status}
+
+    async def kick_session(self, peer_id: str) -> Optional[str]:
+        # Server-initiated kick wherever the user is; returns the room ID (or None)
+        location = self.locate(peer_id)
+        if location is None:
+            return None
+        room_id = location["room_id"]
+        if await self.kick_user(room_id, peer_id):
+            await self.announce_leave(room_id, peer_id)
+        return room_id
 
     def update_user_info(self, room_id: str, peer_id: str, username: str, role: str = "student"):
         # Update username and role after user joins (for already approved peers)
         if room_id in self.rooms and peer_id in self.rooms[room_id]["peers"]:
             self.rooms[room_id]["peers"][peer_id]["username"] = username
             self.rooms[room_id]["peers"][peer_id]["role"] = role
+            if role == "admin":
+                self.rooms[room_id]["admins"].add(peer_id)
+            else:
+                self.rooms[room_id]["admins"].discard(peer_id)
 
     def get_participants(self, room_id: str):
         # Return list of APPROVED users in a room
@@ -149,16 +604,45 @@ class ConnectionManager:
             ]
         return []
 
+    def occupancy(self) -> dict:
+        # Live head count per room with users (used by the dashboard live updates)
+        return {
+            room_id: {
+                "peers": stats.peers,
+                "waiting": stats.waiting,
+                "viewers": stats.viewers,
+                "presenter": self.rooms[room_id]["presenter"]
+            }
+            for room_id, stats in self.live.items()
+        }
+
+    def room_analytics(self) -> list:
+        # Counters of every live room + its meeting (admin analytics endpoint)
+        result = []
+        for room_id, stats in self.live.items():
+            room = self.rooms[room_id]
+            meeting = room["meeting"] or {}
+            result.append({
+                "room_id": room_id,
+                "meeting_id": meeting.get("id"),
+                "title": meeting.get("title"),
+                "presenter": room["presenter"],
+                **stats.to_dict()
+            })
+        return result
+
     def get_admins(self, room_id: str):
         # Get list of admin peer IDs in the room
         if room_id in self.rooms:
-            return [pid for pid, info in self.rooms[room_id]["peers"].items() if info.get("role") == "admin"]
+            return list(self.rooms[room_id]["admins"])
         return []
 
     def set_presenter(self, room_id: str, peer_id: str):
         # Set who is sharing screen
         if room_id in self.rooms:
             self.rooms[room_id]["presenter"] = peer_id
+            self._schedule_priority(room_id)
+            self._schedule_audience(room_id)
 
     def add_message(self, room_id: str, message: dict):
         # Save chat message to room history
@@ -171,68 +655,641 @@ class ConnectionManager:
             return self.rooms[room_id]["messages"]
         return []
 
-    def disconnect(self, room_id: str, peer_id: str, websocket: WebSocket = None):
+    def disconnect(self, room_id: str, peer_id: str, websocket: WebSocket = None) -> bool:
         # Remove user when they leave (check both peers and waiting)
+        # Returns True if someone was actually removed
+        removed = False
         if room_id in self.rooms:
             # check peers
             if peer_id in self.rooms[room_id]["peers"]:
                 # ONLY disconnect if the websocket matches (to avoid race conditions)
                 if websocket and self.rooms[room_id]["peers"][peer_id]["socket"] != websocket:
-                    return
+                    return False
 
-                del self.rooms[room_id]["peers"][peer_id]
-                # if presenter left → remove presenter
-                if self.rooms[room_id]["presenter"] == peer_id:
-                    self.rooms[room_id]["presenter"] = None
+                self._remove_peer(room_id, peer_id)
+                removed = True
             
             # check waiting
             elif peer_id in self.rooms[room_id]["waiting"]:
                 # ONLY disconnect if the websocket matches
                 if websocket and self.rooms[room_id]["waiting"][peer_id]["socket"] != websocket:
-                    return
+                    return False
 
                 del self.rooms[room_id]["waiting"][peer_id]
+                self._track(room_id, peer_id, "waiting", -1)
+                removed = True
+
+            # check webinar viewers
+            elif peer_id in self.rooms[room_id]["viewers"]:
+                if websocket and self.rooms[room_id]["viewers"][peer_id][0] != websocket:
+                    return False
+
+                del self.rooms[room_id]["viewers"][peer_id]
+                self._track(room_id, peer_id, "viewers", -1)
+                removed = True
 
-            # if no one left (neither peers nor waiting) → delete the room
-            if not self.rooms[room_id]["peers"] and not self.rooms[room_id]["waiting"]:
-                del self.rooms[room_id]
+            # Keep the global session index in sync
+            if removed and self.sessions.get(peer_id, (None,))[0] == room_id:
+                del self.sessions[peer_id]
+
+            # if no one left (peers, waiting or viewers) → delete the room later
+            # (kept for a grace period so a short network blip doesn't lose it)
+            if self._is_empty(self.rooms[room_id]):
+                self._schedule_teardown(room_id)
+        return removed
+
+    def _remove_peer(self, room_id: str, peer_id: str, moving: bool = False):
+        # Take an approved user out of "peers" (and everything that refers to them)
+        room = self.rooms[room_id]
+        del room["peers"][peer_id]
+        room["admins"].discard(peer_id)
+        # if presenter left → remove presenter
+        if room["presenter"] == peer_id:
+            room["presenter"] = None
+        room["speakers"].forget(peer_id)
+        self._schedule_priority(room_id)
+        self._track(room_id, peer_id, "peers", -1, moving)
+
+    @staticmethod
+    def _is_empty(room: dict) -> bool:
+        return not room["peers"] and not room["waiting"] and not room["viewers"]
+
+    async def announce_leave(self, room_id: str, peer_id: str):
+        # Tell everyone the new participant list and that this peer left
+        users, presenter = self.get_participants(room_id)
+        await self.broadcast(room_id, {
+            "type": "participants",
+            "users": users,
+            "presenter": presenter
+        })
+        await self.broadcast(room_id, {
+            "type": "leave",
+            "sender_id": peer_id,
+            "message": f"User {peer_id} has left the room"
+        })
+
+    # =====================================
+    # SESSION RESUME (fast reconnects)
+    # =====================================
+
+    def issue_resume_token(self, room_id: str, peer_id: str) -> str:
+        # New resume token for an approved peer (older tokens stop working)
+        info = self.rooms[room_id]["peers"][peer_id]
+        info["session"] = uuid.uuid4().hex
+        return create_resume_token(room_id, peer_id, True, session=info["session"])
+
+    def detach(self, room_id: str, peer_id: str, websocket: WebSocket) -> bool:
+        # Socket of an approved peer dropped → keep their slot for RESUME_WINDOW_SECONDS
+        # Nobody is told they left; messages for them are buffered for replay
+        room = self.rooms.get(room_id)
+        info = room["peers"].get(peer_id) if room else None
+        if info is None or info["socket"] is not websocket or not info.get("session") or self.draining:
+            return False
+
+        info["socket"] = None
+        self.sessions[peer_id] = (room_id, None)
+        info["buffer"] = deque(maxlen=RESUME_BUFFER_SIZE)
+        info["buffer_overflow"] = False
+        info["expire"] = asyncio.get_running_loop().call_later(
+            RESUME_WINDOW_SECONDS, self._expire_detached, room_id, peer_id, info
+        )
+        return True
+
+    def _expire_detached(self, room_id: str, peer_id: str, info: dict):
+        # Resume window is over → now it is a real leave
+        asyncio.ensure_future(self._drop_detached(room_id, peer_id, info))
+
+    async def _drop_detached(self, room_id: str, peer_id: str, info: dict):
+        room = self.rooms.get(room_id)
+        # Only if it is still the SAME dropped slot (not a newer session)
+        if room is None or room["peers"].get(peer_id) is not info or info["socket"] is not None:
+            return
+        self.disconnect(room_id, peer_id)
+        await self.announce_leave(room_id, peer_id)
+
+    async def resume(self, room_id: str, peer_id: str, websocket: WebSocket, resume_token: Optional[str]) -> bool:
+        # Re-attach a reconnecting peer to its existing slot and replay what it missed
+        room = self.rooms.get(room_id)
+        info = room["peers"].get(peer_id) if room else None
+        claims = read_resume_token(room_id, peer_id, resume_token)
+        if info is None or claims is None or not info.get("session") or claims.get("sid") != info["session"]:
+            return False
+
+        # Too many missed messages → can't replay safely, do a normal rejoin instead
+        if info["socket"] is None and info.get("buffer_overflow"):
+            return False
+
+        # Take the slot over first (no await before this point)
+        old_socket = info["socket"]
+        handle = info.pop("expire", None)
+        if handle is not None:
+            handle.cancel()
+        missed = info.pop("buffer", None) or []
+        info.pop("buffer_overflow", None)
+        info["socket"] = websocket
+        self.sessions[peer_id] = (room_id, websocket)
+
+        # Old connection still looks open (half-open TCP) → close it quietly
+        if old_socket is not None and old_socket is not websocket:
+            try:
+                await old_socket.close(code=4000)
+            except Exception:
+                pass
+
+        await websocket.send_json({
+            "type": "resumed",
+            "resumeToken": self.issue_resume_token(room_id, peer_id),
+            "missed": len(missed)
+        })
+        for message in missed:
+            await websocket.send_json(message)
+        return True
+
+    async def _deliver(self, info: dict, message: dict):
+        # Send to a peer, or buffer it if the peer is dropped and may resume
+        if info["socket"] is None and "buffer" in info:
+            if len(info["buffer"]) == info["buffer"].maxlen:
+                info["buffer_overflow"] = True
+            info["buffer"].append(message)
+            return
+        try:
+            await info["socket"].send_json(message)
+        except Exception:
+            pass
+
+    def _teardown_delay(self, room_id: str) -> float:
+        # Empty rooms live for ROOM_GRACE_SECONDS, but a scheduled meeting
+        # keeps its room until its end (or start) time + the grace period
+        meeting = self.rooms[room_id]["meeting"] or {}
+        keep_until = meeting.get("scheduled_end") or meeting.get("scheduled_start")
+        if keep_until is None:
+            return ROOM_GRACE_SECONDS
+        return max(ROOM_GRACE_SECONDS, (keep_until - utcnow()).total_seconds() + ROOM_GRACE_SECONDS)
+
+    def _schedule_teardown(self, room_id: str):
+        # Start (or restart) the timer that deletes an empty room
+        self._cancel_teardown(room_id)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Not inside the server (e.g. a script) → delete right away
+            del self.rooms[room_id]
+            rate_limiter.forget_room(room_id)
+            return
+        self.rooms[room_id]["teardown"] = loop.call_later(
+            self._teardown_delay(room_id), self._teardown_if_empty, room_id
+        )
+
+    def _cancel_teardown(self, room_id: str):
+        handle = self.rooms[room_id].get("teardown")
+        if handle is not None:
+            handle.cancel()
+            self.rooms[room_id]["teardown"] = None
+
+    def _teardown_if_empty(self, room_id: str):
+        # Timer fired → delete the room only if it is still empty
+        room = self.rooms.get(room_id)
+        if room and self._is_empty(room):
+            del self.rooms[room_id]
+            rate_limiter.forget_room(room_id)
+
+    async def prewarm_upcoming(self):
+        # Create rooms for meetings starting soon (cached meeting row, admin set, chat store)
+        meetings = await run_in_threadpool(load_upcoming_meetings, ROOM_PREWARM_SECONDS)
+        for meeting in meetings:
+            room_id = meeting["room_id"]
+            if room_id not in self.rooms:
+                self.ensure_room(room_id, meeting)
+                # Nobody is in it yet → it is deleted if nobody comes
+                self._schedule_teardown(room_id)
+
+    async def run_scheduler(self):
+        # Background task (started in main.py) that pre-warms scheduled rooms
+        while True:
+            try:
+                await self.prewarm_upcoming()
+            except Exception as e:
+                print(f"Room scheduler error: {e}")
+            await asyncio.sleep(ROOM_SCHEDULER_INTERVAL)
+
+    def can_resume(self, room_id: str, peer_id: str, resume_token: Optional[str]) -> bool:
+        # True if this user was already approved (valid resume token or restored snapshot)
+        room = self.rooms.get(room_id)
+        restored = room["resumable"].pop(peer_id, None) if room else None
+        if restored is not None:
+            return True
+        claims = read_resume_token(room_id, peer_id, resume_token)
+        # Slot-bound tokens ("sid") only work through resume(), so a kicked user can't reuse one
+        return bool(claims and claims.get("approved") and "sid" not in claims)
+
+    # =====================================
+    # BATCH ADMISSION (waiting room → peers)
+    # =====================================
+
+    async def admit(self, room_id: str, user_ids: list) -> list:
+        """
+        Move many users from waiting to peers in ONE step.
+        Sends a single "participants" update instead of one per user.
+        Returns the IDs that were admitted.
+        """
+        room = self.rooms.get(room_id)
+        if room is None:
+            return []
+
+        # 1. Move everyone first (no network I/O in between)
+        admitted = []
+        for user_id in user_ids:
+            info = room["waiting"].pop(user_id, None)
+            if info is None:
+                continue
+            if user_id in room["peers"]:
+                self._track(room_id, user_id, "waiting", -1)
+                continue
+            room["peers"][user_id] = info
+            if info.get("role") == "admin":
+                room["admins"].add(user_id)
+            self._track(room_id, user_id, "peers", 1)
+            self._track(room_id, user_id, "waiting", -1)
+            admitted.append(user_id)
+
+        if not admitted:
+            return []
+        self._schedule_priority(room_id)
+
+        await self._announce_admitted(room_id, admitted)
+        return admitted
+
+    async def _announce_admitted(self, room_id: str, admitted: list, approved_type: str = "join-approved"):
+        # Network part of admitting users that were just added to "peers" (see admit/promote)
+        room = self.rooms[room_id]
+
+        # 2. Tell each admitted user (with a resume token) and send them the chat history
+        # and who currently sends video
+        history = room["messages"]
+        hint = self.priority_hint(room_id)
+        for user_id in admitted:
+            info = room["peers"].get(user_id)
+            if info is None:
+                continue
+            await self._deliver(info, {
+                "type": approved_type,
+                "resumeToken": self.issue_resume_token(room_id, user_id)
+            })
+            if history:
+                await self._deliver(info, {"type": "chat-history", "history": history})
+            await self._deliver(info, hint)
+
+        # 3. ONE roster update for the whole room
+        users, presenter = self.get_participants(room_id)
+        await self.broadcast(room_id, {
+            "type": "participants",
+            "users": users,
+            "presenter": presenter
+        })
+
+        # 4. Tell peers who to connect to (starts WebRTC)
+        names = {user_id: room["peers"][user_id]["username"] for user_id in admitted if user_id in room["peers"]}
+        if len(admitted) == 1:
+            user_id = admitted[0]
+            await self.broadcast(room_id, {
+                "type": "join",
+                "sender_id": user_id,
+                "username": names.get(user_id, "Guest")
+            }, sender_id=user_id)
+        else:
+            # Existing peers get the whole batch; a new peer only gets the ones admitted
+            # after it (same "who calls whom" order as approving them one by one)
+            batch = [{"sender_id": user_id, "username": name} for user_id, name in names.items()]
+            position = {entry["sender_id"]: i for i, entry in enumerate(batch)}
+            for peer_id in list(room["peers"]):
+                info = room["peers"].get(peer_id)
+                i = position.get(peer_id)
+                joined = batch if i is None else batch[i + 1:]
+                if info is not None and joined:
+                    await self._deliver(info, {"type": "joins", "users": joined})
+
+    async def reject(self, room_id: str, user_ids: list) -> list:
+        # Remove many waiting users at once; returns the IDs that were rejected
+        room = self.rooms.get(room_id)
+        if room is None:
+            return []
+        rejected = []
+        for user_id in user_ids:
+            if user_id in room["waiting"] and await self.kick_user(room_id, user_id):
+                rejected.append(user_id)
+        return rejected
+
+    def set_auto_admit(self, room_id: str, roles: list, domains: list):
+        # Change the auto-admit policy of one room (admin message "set-auto-admit")
+        if room_id in self.rooms:
+            self.rooms[room_id]["auto_admit"] = {
+                "roles": {str(r) for r in roles},
+                "domains": {str(d).lower() for d in domains}
+            }
+
+    def should_auto_admit(self, room_id: str, identity: dict) -> bool:
+        # True if this user matches the room's auto-admit policy (role or email domain)
+        room = self.rooms.get(room_id)
+        if room is None:
+            return False
+        policy = room["auto_admit"]
+        if identity.get("user_role") in policy["roles"]:
+            return True
+        domain = identity["user_id"].rpartition("@")[2].lower()
+        return domain in policy["domains"]
+
+    def queue_auto_admit(self, room_id: str, user_id: str):
+        # Admit this (already waiting) user with the next batch
+        room = self.rooms[room_id]
+        room["auto_pending"].append(user_id)
+        # First user of a batch starts the timer
+        if len(room["auto_pending"]) == 1:
+            asyncio.get_running_loop().call_later(
+                AUTO_ADMIT_BATCH_SECONDS, self._flush_auto_admit, room_id
+            )
+
+    def _flush_auto_admit(self, room_id: str):
+        room = self.rooms.get(room_id)
+        if room is None or not room["auto_pending"]:
+            return
+        pending, room["auto_pending"] = room["auto_pending"], []
+        asyncio.ensure_future(self.admit(room_id, pending))
+
+    # =====================================
+    # WEBINAR (stage + viewers)
+    # =====================================
+
+    def is_webinar(self, room_id: str) -> bool:
+        room = self.rooms.get(room_id)
+        return room is not None and (room["meeting"] or {}).get("room_mode") == "webinar"
+
+    def is_viewer(self, room_id: str, peer_id: str) -> bool:
+        room = self.rooms.get(room_id)
+        return room is not None and peer_id in room["viewers"]
+
+    async def add_viewer(self, room_id: str, peer_id: str, websocket: WebSocket, username: str):
+        # Webinar attendee: one small entry, no waiting room, no roster broadcast
+        if room_id in self.rooms:
+            replaced = self._end_old_session(peer_id)
+            self._cancel_teardown(room_id)
+
+            self.rooms[room_id]["viewers"][peer_id] = (websocket, username)
+            self.sessions[peer_id] = (room_id, websocket)
+            self._track(room_id, peer_id, "viewers", 1)
+
+            await self._notify_replaced(room_id, peer_id, replaced)
+
+    async def promote(self, room_id: str, peer_id: str) -> bool:
+        # Viewer → speaker on stage (becomes a normal approved peer on the same socket)
+        room = self.rooms.get(room_id)
+        viewer = room["viewers"].pop(peer_id, None) if room else None
+        if viewer is None:
+            return False
+        socket, username = viewer
+        room["peers"][peer_id] = {"socket": socket, "username": username, "role": "student"}
+        self._track(room_id, peer_id, "viewers", -1, moving=True)
+        self._track(room_id, peer_id, "peers", 1, moving=True)
+        self._schedule_priority(room_id)
+
+        # Same messages as an admission (stage peers start WebRTC with them)
+        await self._announce_admitted(room_id, [peer_id], "promoted")
+        return True
+
+    async def demote(self, room_id: str, peer_id: str) -> bool:
+        # Speaker → back to the audience (hosts stay on stage)
+        room = self.rooms.get(room_id)
+        info = room["peers"].get(peer_id) if room else None
+        if info is None or info.get("role") == "admin" or info["socket"] is None:
+            return False
+        socket = info["socket"]
+        self._remove_peer(room_id, peer_id, moving=True)
+        room["viewers"][peer_id] = (socket, info["username"])
+        self._track(room_id, peer_id, "viewers", 1, moving=True)
+        # Stop forwarding their camera/mic now (the client reconnects as a viewer)
+        sfu.discard(room_id, peer_id)
+
+        try:
+            await socket.send_json({"type": "demoted"})
+        except Exception:
+            pass
+        await self.announce_leave(room_id, peer_id)
+        return True
+
+    def audience_message(self, room_id: str) -> dict:
+        # What viewers see of the room: who is on stage and how many are watching
+        users, presenter = self.get_participants(room_id)
+        return {
+            "type": "audience",
+            "viewers": len(self.rooms[room_id]["viewers"]),
+            "stage": users,
+            "presenter": presenter
+        }
+
+    def _schedule_audience(self, room_id: str):
+        # Webinars only: many viewer joins/leaves become ONE update per AUDIENCE_INTERVAL
+        audience = self.rooms[room_id]["audience"]
+        if audience["scheduled"] or not self.is_webinar(room_id):
+            return
+        audience["scheduled"] = True
+        asyncio.get_running_loop().call_later(AUDIENCE_INTERVAL, self._flush_audience, room_id)
+
+    def _flush_audience(self, room_id: str):
+        room = self.rooms.get(room_id)
+        if room is None:
+            return
+        audience = room["audience"]
+        audience["scheduled"] = False
+        message = self.audience_message(room_id)
+        if message == audience["last"]:
+            return
+        audience["last"] = message
+        asyncio.ensure_future(self._send_audience(room_id, message))
+
+    async def _send_audience(self, room_id: str, message: dict):
+        await self.broadcast(room_id, message)
+        room = self.rooms.get(room_id)
+        if room is None:
+            return
+        for socket, _ in list(room["viewers"].values()):
+            try:
+                await socket.send_json(message)
+            except Exception:
+                pass
+
+    # =====================================
+    # STREAM PRIORITY (active speaker, who sends video)
+    # =====================================
+
+    def report_audio_level(self, room_id: str, peer_id: str, level: float):
+        # Audio level sent by a participant's client ("audio-level" message)
+        room = self.rooms.get(room_id)
+        if room is None or peer_id not in room["peers"]:
+            return
+        if room["speakers"].report(peer_id, level):
+            self._schedule_priority(room_id)
+
+    def priority_hint(self, room_id: str) -> dict:
+        room = self.rooms[room_id]
+        return room["speakers"].hint(room["presenter"], room["peers"])
+
+    def _schedule_priority(self, room_id: str):
+        # Send the new hint soon, but at most once per PRIORITY_MIN_INTERVAL per room
+        speakers = self.rooms[room_id]["speakers"]
+        if speakers.scheduled:
+            return
+        speakers.scheduled = True
+        delay = max(0.0, speakers.last_sent + PRIORITY_MIN_INTERVAL - time.monotonic())
+        asyncio.get_running_loop().call_later(delay, self._flush_priority, room_id)
+
+    def _flush_priority(self, room_id: str):
+        room = self.rooms.get(room_id)
+        if room is None:
+            return
+        speakers = room["speakers"]
+        speakers.scheduled = False
+        hint = self.priority_hint(room_id)
+        if hint == speakers.last_hint:
+            return
+        speakers.last_hint = hint
+        speakers.last_sent = time.monotonic()
+        asyncio.ensure_future(self.broadcast(room_id, hint))
+
+    # =====================================
+    # DRAIN + SNAPSHOT (zero-downtime restarts)
+    # =====================================
+
+    def snapshot(self) -> dict:
+        # Plain-JSON copy of every room (sockets and timers are left out)
+        rooms = {}
+        for room_id, room in self.rooms.items():
+            meeting = dict(room["meeting"] or {})
+            for key in ("scheduled_start", "scheduled_end"):
+                if meeting.get(key) is not None:
+                    meeting[key] = meeting[key].isoformat()
+
+            # Approved users: the ones connected now + restored ones that haven't come back yet
+            approved = dict(room["resumable"])
+            for peer_id, info in room["peers"].items():
+                approved[peer_id] = {"username": info["username"], "role": info.get("role", "student")}
+
+            rooms[room_id] = {
+                "meeting": meeting,
+                "presenter": room["presenter"],
+                "messages": room["messages"],
+                "peers": approved
+            }
+        return {"saved_at": utcnow().isoformat(), "rooms": rooms}
+
+    def save_snapshot(self, path: Optional[str] = None) -> int:
+        # Write the snapshot atomically (temp file + rename)
+        path = path or room_snapshot_path()
+        data = self.snapshot()
+        tmp_path = path + ".tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        return len(data["rooms"])
+
+    def restore_snapshot(self, path: Optional[str] = None) -> int:
+        # Load rooms saved by a previous process (called once at startup)
+        path = path or room_snapshot_path()
+        if not os.path.exists(path):
+            return 0
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"Could not read room snapshot: {e}")
+            return 0
+        finally:
+            # Only restore once
+            os.remove(path)
+
+        for room_id, saved in data.get("rooms", {}).items():
+            meeting = saved["meeting"]
+            for key in ("scheduled_start", "scheduled_end"):
+                if meeting.get(key) is not None:
+                    meeting[key] = datetime.datetime.fromisoformat(meeting[key])
+
+            room = self.ensure_room(room_id, meeting)
+            room["presenter"] = saved.get("presenter")
+            room["messages"] = saved.get("messages", [])
+            room["resumable"] = saved.get("peers", {})
+
+            # Nobody is connected yet → normal grace period applies
+            self._schedule_teardown(room_id)
+
+        return len(data.get("rooms", {}))
+
+    async def drain(self, retry_after_ms: int = 3000) -> int:
+        # Stop new connections, save state, and ask every client to reconnect
+        self.draining = True
+        saved = self.save_snapshot()
+
+        for room_id, room in list(self.rooms.items()):
+            sockets = [
+                (peer_id, info["socket"], status == "peers")
+                for status in ("peers", "waiting")
+                for peer_id, info in room[status].items()
+            ] + [(peer_id, socket, False) for peer_id, (socket, _) in room["viewers"].items()]
+            for peer_id, socket, approved in sockets:
+                try:
+                    await socket.send_json({
+                        "type": "reconnect",
+                        "reason": "server-restart",
+                        "resumeToken": create_resume_token(room_id, peer_id, approved),
+                        "retryAfter": retry_after_ms
+                    })
+                    # 1012 = "service restart"
+                    await socket.close(code=1012)
+                except Exception:
+                    pass
+
+        return saved
 
     async def send_to_target(self, room_id: str, target_id: str, message: dict):
         # Send message to a specific user (check both lists)
         if room_id in self.rooms:
             info = self.rooms[room_id]["peers"].get(target_id) or self.rooms[room_id]["waiting"].get(target_id)
             if info:
+                await self._deliver(info, message)
+            elif target_id in self.rooms[room_id]["viewers"]:
                 try:
-                    await info["socket"].send_json(message)
+                    await self.rooms[room_id]["viewers"][target_id][0].send_json(message)
                 except Exception:
                     pass
 
     async def broadcast(self, room_id: str, message: dict, sender_id: str = None, only_admins: bool = False):
         # Send message to EVERYONE APPROVED in the room
         if room_id in self.rooms:
-            for peer_id, info in self.rooms[room_id]["peers"].items():
-                if peer_id != sender_id:
-                    if only_admins and info.get("role") != "admin":
-                        continue
+            peers = self.rooms[room_id]["peers"]
+            # Admin-only messages go straight to the admin set (no full scan)
+            targets = [pid for pid in self.rooms[room_id]["admins"] if pid in peers] if only_admins else list(peers)
+            for peer_id in targets:
+                info = peers.get(peer_id)
+                if info is not None and peer_id != sender_id:
+                    await self._deliver(info, message)
+
+    async def kick_user(self, room_id: str, target_id: str) -> bool:
+        # Remove a user from the room (works for peers, waiting and webinar viewers)
+        # Returns True if the user was removed
+        if room_id in self.rooms:
+            # False = not in this room (None = dropped peer waiting to resume)
+            socket = self._socket_of(room_id, target_id, default=False)
+            if socket is not False:
+                # Remove first, then tell the socket (it may rejoin while we are sending)
+                removed = self.disconnect(room_id, target_id, socket)
+                if removed and socket is not None:
                     try:
-                        await info["socket"].send_json(message)
+                        await socket.send_json({
+                            "type": "kicked",
+                            "message": "You were removed or rejected by the host"
+                        })
+                        await socket.close()
                     except Exception:
                         pass
-
-    async def kick_user(self, room_id: str, target_id: str):
-        # Remove a user from the room (works for both peers and waiting)
-        if room_id in self.rooms:
-            info = self.rooms[room_id]["peers"].get(target_id) or self.rooms[room_id]["waiting"].get(target_id)
-            if info:
-                try:
-                    await info["socket"].send_json({
-                        "type": "kicked",
-                        "message": "You were removed or rejected by the host"
-                    })
-                    await info["socket"].close()
-                except Exception:
-                    pass
-                self.disconnect(room_id, target_id)
+                return removed
+        return False
 
 # Create a global manager instance used by websocket routes
 manager = ConnectionManager()
\ No newline at end of file
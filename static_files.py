@@ -0,0 +1,234 @@
+# Used to build file paths and walk the frontend build folder
+import os
+
+# Used to create .gz copies of the build files and ETags for index.html
+import gzip
+import hashlib
+
+# Used to find the Content-Type of a file from its name
+import mimetypes
+
+# Response types used to send files / in-memory pages to the browser
+from fastapi import Request
+from fastapi.responses import Response, FileResponse
+
+# StaticFiles → Starlette's static folder server (we extend it below)
+from starlette.staticfiles import StaticFiles, NotModifiedResponse
+from starlette.datastructures import Headers
+
+# Brotli is optional: if it is not installed we only use gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# =====================================
+# PATHS (resolved once at startup)
+# =====================================
+
+# Absolute path to the frontend/dist folder created by "npm run build"
+FRONTEND_DIST = os.path.join(os.getcwd(), "frontend", "dist")
+
+# Folder with the hashed JS/CSS files created by Vite
+ASSETS_DIR = os.path.join(FRONTEND_DIST, "assets")
+
+# The single page that React uses for every route
+INDEX_PATH = os.path.join(FRONTEND_DIST, "index.html")
+
+
+# =====================================
+# CACHE + COMPRESSION SETTINGS
+# =====================================
+
+# Vite puts a content hash in every file name inside /assets,
+# so the browser can keep them forever (a new build = new file names)
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+# index.html must always be re-checked so a new build is picked up
+INDEX_CACHE = "no-cache"
+
+# Supported encodings in order of preference, with the file suffix used on disk
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+# Only text-like files are worth compressing (images/fonts are already compressed)
+COMPRESSIBLE_SUFFIXES = (".js", ".mjs", ".css", ".html", ".svg", ".json", ".txt", ".map", ".wasm")
+
+# Files smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 1024
+
+
+def accepted_encodings(headers) -> set:
+    # Read the "Accept-Encoding" header and return the encodings the browser allows
+    # Example: "gzip, deflate, br;q=0.9" → {"gzip", "deflate", "br"}
+    accepted = set()
+    for part in headers.get("accept-encoding", "").split(","):
+        name, _, params = part.strip().partition(";")
+        # "q=0" means the browser explicitly refuses this encoding
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        if name:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+# =====================================
+# /assets SERVER WITH PRECOMPRESSED FILES
+# =====================================
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles that serves "file.js.br" / "file.js.gz" (if present)
+    instead of "file.js" when the browser supports it, and marks
+    every asset as immutable.
+    """
+
+    def __init__(self, directory: str):
+        super().__init__(directory=directory)
+
+        # Scan the folder ONCE and remember which compressed copies exist
+        # Structure:
+        # variants = {
+        #   "index-abc123.js": {
+        #       "br": (full_path, stat_result),
+        #       "gzip": (full_path, stat_result)
+        #   }
+        # }
+        self.variants = {}
+        for root, _, files in os.walk(directory):
+            for name in files:
+                for encoding, suffix in ENCODINGS:
+                    if name.endswith(suffix):
+                        full_path = os.path.join(root, name)
+                        original = os.path.relpath(full_path[: -len(suffix)], directory)
+                        self.variants.setdefault(original, {})[encoding] = (full_path, os.stat(full_path))
+
+    async def get_response(self, path: str, scope):
+        variants = self.variants.get(path)
+
+        # If we have a compressed copy the browser accepts → send it
+        if variants:
+            request_headers = Headers(scope=scope)
+            accepted = accepted_encodings(request_headers)
+
+            for encoding, _ in ENCODINGS:
+                if encoding in variants and encoding in accepted:
+                    full_path, stat_result = variants[encoding]
+
+                    # Content-Type must be the ORIGINAL file type (e.g. JavaScript)
+                    media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+                    response = FileResponse(full_path, stat_result=stat_result, media_type=media_type)
+                    response.headers["Content-Encoding"] = encoding
+                    response.headers["Vary"] = "Accept-Encoding"
+                    response.headers["Cache-Control"] = IMMUTABLE_CACHE
+
+                    # Browser already has this exact file → 304 Not Modified
+                    if self.is_not_modified(response.headers, request_headers):
+                        return NotModifiedResponse(response.headers)
+                    return response
+
+        # Otherwise serve the normal (uncompressed) file
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE
+            if variants:
+                response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+
+# =====================================
+# index.html KEPT IN MEMORY
+# =====================================
+
+class IndexPage:
+    """
+    Holds index.html (and its compressed versions) in memory
+    so SPA navigations never touch the disk.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self.body = f.read()
+
+        # ETag = hash of the file content (changes on every new build)
+        self.etag = '"' + hashlib.md5(self.body).hexdigest() + '"'
+
+        # Compress once now instead of on every request
+        self.encoded = {"gzip": gzip.compress(self.body, compresslevel=9)}
+        if brotli is not None:
+            self.encoded["br"] = brotli.compress(self.body)
+
+    def response(self, request: Request) -> Response:
+        headers = {
+            "ETag": self.etag,
+            "Cache-Control": INDEX_CACHE,
+            "Vary": "Accept-Encoding"
+        }
+
+        # Browser already has this version → 304 Not Modified (no body)
+        if_none_match = request.headers.get("if-none-match", "")
+        if if_none_match:
+            tags = [tag.strip().replace("W/", "", 1) for tag in if_none_match.split(",")]
+            if "*" in tags or self.etag in tags:
+                return Response(status_code=304, headers=headers)
+
+        # Send the best compressed copy the browser supports
+        accepted = accepted_encodings(request.headers)
+        for encoding, _ in ENCODINGS:
+            if encoding in self.encoded and encoding in accepted:
+                headers["Content-Encoding"] = encoding
+                return Response(self.encoded[encoding], media_type="text/html", headers=headers)
+
+        return Response(self.body, media_type="text/html", headers=headers)
+
+
+def load_index_page():
+    # Return the in-memory index page, or None if the frontend was not built
+    if os.path.exists(INDEX_PATH):
+        return IndexPage(INDEX_PATH)
+    return None
+
+
+# =====================================
+# BUILD STEP: CREATE .gz / .br FILES
+# =====================================
+
+def compress_dist(directory: str = FRONTEND_DIST):
+    """
+    Create "file.gz" (and "file.br" if brotli is installed) next to every
+    compressible file in frontend/dist. Run after "npm run build".
+    """
+    created = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if not name.endswith(COMPRESSIBLE_SUFFIXES):
+                continue
+
+            full_path = os.path.join(root, name)
+            with open(full_path, "rb") as f:
+                data = f.read()
+
+            # Tiny files gain nothing from compression
+            if len(data) < MIN_COMPRESS_SIZE:
+                continue
+
+            compressed = {"gzip": gzip.compress(data, compresslevel=9)}
+            if brotli is not None:
+                compressed["br"] = brotli.compress(data, quality=11)
+
+            for encoding, suffix in ENCODINGS:
+                # Only keep the copy if it is actually smaller
+                if encoding in compressed and len(compressed[encoding]) < len(data):
+                    with open(full_path + suffix, "wb") as f:
+                        f.write(compressed[encoding])
+                    created += 1
+
+    return created
+
+
+# Run directly: python static_files.py
+if __name__ == "__main__":
+    count = compress_dist()
+    print(f"Created {count} precompressed files in {FRONTEND_DIST}")
+    if brotli is None:
+        print("Tip: pip install brotli to also create .br files")
@@ -0,0 +1,141 @@
+# used to read recorder settings from environment variables
+import os
+
+# used for the background flush task, frame timestamps and unique connection IDs
+import asyncio
+import time
+import uuid
+
+# recordings are gzip'd JSON lines; each flush appends one gzip member
+# (a file made of several members is still one valid .gz file)
+import gzip
+import json
+
+# used for type hinting
+from typing import Iterator, Optional
+
+# run blocking file writes without freezing the event loop
+from starlette.concurrency import run_in_threadpool
+
+# frames are encoded when they arrive (handlers change the dict afterwards)
+from serializers import dumps
+
+# counters for recorded/dropped frames
+import metrics
+
+
+# =====================================
+# TRAFFIC RECORDER SETTINGS
+# =====================================
+
+# "1" = record inbound signaling frames (opt-in: frames contain chat text and SDP)
+TRAFFIC_RECORDING = os.getenv("TRAFFIC_RECORDING", "0") == "1"
+
+# Where recordings are written: one <room_id>.jsonl.gz per room
+TRAFFIC_DIR = os.getenv("TRAFFIC_DIR", "traffic")
+
+# Only record these rooms (comma separated room IDs, empty = every room)
+TRAFFIC_ROOMS = {r.strip() for r in os.getenv("TRAFFIC_ROOMS", "").split(",") if r.strip()}
+
+# Frames are appended to the files every N seconds
+TRAFFIC_FLUSH_SECONDS = float(os.getenv("TRAFFIC_FLUSH_SECONDS", "2"))
+
+# If the disk is slow, keep at most this many frames in memory (newer ones are dropped)
+TRAFFIC_MAX_PENDING = int(os.getenv("TRAFFIC_MAX_PENDING", "100000"))
+
+# Event kinds (one JSON line per event: [unix time, connection ID, kind, payload])
+OPEN = "o"          # payload: {"meeting": ..., "identity": ...}
+MESSAGE = "m"       # payload: the frame as received
+CLOSE = "c"         # payload: null
+
+
+def traffic_path(directory: str, room_id: str) -> str:
+    # Room IDs are server generated, but never trust them as file names
+    safe = "".join(c for c in room_id if c.isalnum() or c in "-_")
+    return os.path.join(directory, f"{safe}.jsonl.gz")
+
+
+def write_traffic(directory: str, batch: dict) -> int:
+    # Append each room's lines to its file (blocking → call through run_in_threadpool)
+    os.makedirs(directory, exist_ok=True)
+    written = 0
+    for room_id, lines in batch.items():
+        with gzip.open(traffic_path(directory, room_id), "ab", compresslevel=6) as f:
+            f.write(b"".join(lines))
+        written += len(lines)
+    return written
+
+
+def read_traffic(path: str) -> Iterator[list]:
+    # Events of one recording in the order they were written
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class TrafficRecorder:
+    """
+    Opt-in log of every inbound signaling frame, for replaying real traffic
+    (see benchmarks/replay_traffic.py). The WebSocket path only encodes the frame
+    and appends it to a list; a background task (started in main.py) writes them.
+    """
+
+    def __init__(self, enabled: bool = TRAFFIC_RECORDING, directory: str = TRAFFIC_DIR):
+        self.enabled = enabled
+        self.directory = directory
+        # room_id → [encoded lines]
+        self.pending = {}
+        self.pending_count = 0
+        # Connection IDs are "<process>.<n>", so restarts never reuse one in the same file
+        self.process = uuid.uuid4().hex[:6]
+        self.connections = 0
+
+    def open(self, room_id: str, meeting: dict, identity: dict) -> Optional[str]:
+        # New connection → its recording ID (None = this room is not recorded)
+        if not self.enabled or (TRAFFIC_ROOMS and room_id not in TRAFFIC_ROOMS):
+            return None
+        self.connections += 1
+        connection_id = f"{self.process}.{self.connections}"
+        self._add(room_id, connection_id, OPEN, {"meeting": meeting, "identity": identity})
+        return connection_id
+
+    def message(self, room_id: str, connection_id: Optional[str], data):
+        if connection_id is not None:
+            self._add(room_id, connection_id, MESSAGE, data)
+
+    def close(self, room_id: str, connection_id: Optional[str]):
+        if connection_id is not None:
+            self._add(room_id, connection_id, CLOSE, None)
+
+    def _add(self, room_id: str, connection_id: str, kind: str, payload):
+        if self.pending_count >= TRAFFIC_MAX_PENDING:
+            metrics.inc("traffic.dropped")
+            return
+        line = dumps([round(time.time(), 3), connection_id, kind, payload]) + b"\n"
+        self.pending.setdefault(room_id, []).append(line)
+        self.pending_count += 1
+
+    async def flush(self) -> int:
+        # Write everything waiting right now; returns how many frames were written
+        if not self.pending:
+            return 0
+        batch, self.pending, self.pending_count = self.pending, {}, 0
+        try:
+            written = await run_in_threadpool(write_traffic, self.directory, batch)
+        except Exception as e:
+            print(f"Traffic recording write failed: {e}")
+            metrics.inc("traffic.dropped", sum(len(lines) for lines in batch.values()))
+            return 0
+        metrics.inc("traffic.frames", written)
+        return written
+
+    async def run(self):
+        # Background task: flush every TRAFFIC_FLUSH_SECONDS (does nothing when recording is off)
+        while self.enabled:
+            await asyncio.sleep(TRAFFIC_FLUSH_SECONDS)
+            await self.flush()
+
+
+# Global recorder used by the signaling WebSocket route
+traffic_recorder = TrafficRecorder()